@@ -3,11 +3,12 @@
 处理疲劳状态的声音警报
 """
 
+import sys
 import time
 import threading
-import winsound
 
 import config
+from events import ProlongedClosure, ProlongedClosureEnd, YawnStart, YawnEnd, HeadDown, HeadDownEnd
 
 
 class AlarmManager:
@@ -23,6 +24,10 @@ class AlarmManager:
         self.last_alarm_time = 0
         self.alarm_cooldown = config.ALARM_COOLDOWN
         self.alarm_enabled = True
+        self._backend = None
+        
+        # 通过事件订阅得到的进行中的报警条件：{(事件来源, 条件类型)}
+        self.active = set()
     
     def check_and_trigger(self, is_fatigued, is_yawning):
         """
@@ -49,6 +54,51 @@ class AlarmManager:
         
         return False
     
+    def handle_event(self, event):
+        """
+        事件总线回调：长时间闭眼、打哈欠或长时间低头开始时立即报警，结束时解除
+        
+        Args:
+            event: FatigueEvent实例
+        """
+        if isinstance(event, ProlongedClosure):
+            self.active.add((event.source, 'closure'))
+        elif isinstance(event, YawnStart):
+            self.active.add((event.source, 'yawn'))
+        elif isinstance(event, HeadDown):
+            self.active.add((event.source, 'head_down'))
+        elif isinstance(event, ProlongedClosureEnd):
+            self.active.discard((event.source, 'closure'))
+            return
+        elif isinstance(event, YawnEnd):
+            self.active.discard((event.source, 'yawn'))
+            return
+        elif isinstance(event, HeadDownEnd):
+            self.active.discard((event.source, 'head_down'))
+            return
+        self.update()
+    
+    def update(self):
+        """
+        报警条件持续期间按冷却时间重复报警
+        
+        Returns:
+            should_alarm: 本次是否发出警报
+        """
+        return self.check_and_trigger(bool(self.active), False)
+    
+    def clear(self, source=None):
+        """
+        解除报警条件（如人脸轨迹被移除时）
+        
+        Args:
+            source: 只解除该来源的条件，None表示全部
+        """
+        if source is None:
+            self.active.clear()
+        else:
+            self.active = {key for key in self.active if key[0] != source}
+    
     def _play_alarm(self):
         """
         播放警报声音（在独立线程中运行）
@@ -58,12 +108,33 @@ class AlarmManager:
         except Exception as e:
             print(f"Error playing alarm: {e}")
     
+    def _get_backend(self):
+        """
+        获取声音后端（首次报警时才导入）
+        
+        Returns:
+            backend: winsound模块，非Windows系统返回None
+        """
+        if self._backend is None:
+            try:
+                import winsound
+                self._backend = winsound
+            except ImportError:
+                self._backend = False
+        return self._backend or None
+    
     def _beep(self):
         """
         播放蜂鸣声
         """
         try:
-            winsound.Beep(1000, 500)  # 频率1000Hz，持续500ms
+            backend = self._get_backend()
+            if backend is not None:
+                backend.Beep(1000, 500)  # 频率1000Hz，持续500ms
+            else:
+                # 非Windows系统使用终端响铃
+                sys.stdout.write('\a')
+                sys.stdout.flush()
         except Exception as e:
             print(f"Error in beep: {e}")
     
@@ -96,4 +167,5 @@ class AlarmManager:
         重置警报状态
         """
         self.last_alarm_time = 0
+        self.active.clear()
         print("Alarm reset")
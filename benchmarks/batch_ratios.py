@@ -0,0 +1,128 @@
+"""
+批量EAR/MAR基准测试
+模拟离线分析一整段录像：对 (T, K, 2) 的紧凑特征点张量分块调用 utils.calculate_ratios_batch，
+与逐帧调用原实现的循环对比（原实现只测一部分帧，按帧数外推），同时检查结果误差
+
+用法:
+    python -m benchmarks.batch_ratios
+    python -m benchmarks.batch_ratios --hours 24 --fps 30 --chunk 108000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import config
+from utils import calculate_ratios_batch, compact_landmarks
+from benchmarks.synthetic import make_landmarks
+
+
+def legacy_calculate_ear(eye_indices, landmarks):
+    """
+    原实现：逐帧计算单眼EAR
+
+    Args:
+        eye_indices: 眼睛特征点索引列表
+        landmarks: 所有面部特征点坐标
+
+    Returns:
+        ear: 眼睛纵横比
+    """
+    points = landmarks[np.array(eye_indices)]
+    v1 = np.linalg.norm(points[1] - points[5])
+    v2 = np.linalg.norm(points[2] - points[4])
+    h = np.linalg.norm(points[0] - points[3])
+    return (v1 + v2) / (2.0 * h)
+
+
+def legacy_calculate_mar(mouth_indices, landmarks):
+    """
+    原实现：逐帧计算MAR
+
+    Args:
+        mouth_indices: 嘴部特征点索引列表
+        landmarks: 所有面部特征点坐标
+
+    Returns:
+        mar: 嘴部纵横比
+    """
+    points = landmarks[np.array(mouth_indices)]
+    v = np.linalg.norm(points[0] - points[1])
+    h = np.linalg.norm(points[2] - points[3])
+    return v / h
+
+
+def make_sequence(num_frames, seed=0):
+    """
+    生成带逐帧抖动的特征点序列
+
+    Args:
+        num_frames: 帧数
+        seed: 随机种子
+
+    Returns:
+        landmarks: (T, N, 2) float32 特征点张量
+    """
+    rng = np.random.default_rng(seed)
+    base = make_landmarks(seed=seed).astype(np.float32)
+    jitter = rng.normal(0.0, 0.5, size=(num_frames,) + base.shape).astype(np.float32)
+    return base + jitter
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='批量EAR/MAR基准测试')
+    parser.add_argument('--hours', type=float, default=24.0,
+                       help='模拟的录像时长（小时，默认：24）')
+    parser.add_argument('--fps', type=float, default=30.0,
+                       help='录像帧率（默认：30）')
+    parser.add_argument('--chunk', type=int, default=108000,
+                       help='每次批量计算的帧数（默认：108000，即30fps下1小时）')
+    parser.add_argument('--legacy-frames', type=int, default=20000,
+                       help='原实现实际计算的帧数，其余按比例外推（默认：20000）')
+    args = parser.parse_args()
+
+    total_frames = int(args.hours * 3600 * args.fps)
+    chunk = min(args.chunk, total_frames)
+    full = make_sequence(chunk)
+    compact = np.ascontiguousarray(compact_landmarks(full))
+
+    # 检查与原实现的误差
+    sample = full[:min(args.legacy_frames, chunk)].astype(np.float64)
+    batch = np.stack(calculate_ratios_batch(compact[:len(sample)], compact=True), axis=1)
+    start = time.perf_counter()
+    legacy = np.array([
+        (legacy_calculate_ear(config.LEFT_EYE_INDICES, frame),
+         legacy_calculate_ear(config.RIGHT_EYE_INDICES, frame),
+         legacy_calculate_mar(config.MOUTH_INDICES, frame))
+        for frame in sample
+    ])
+    legacy_s = (time.perf_counter() - start) / len(sample) * total_frames
+    max_error = np.abs(batch - legacy).max()
+
+    # 整段录像按块计算，所有块复用同一份合成数据
+    num_chunks, remainder = divmod(total_frames, chunk)
+    start = time.perf_counter()
+    for _ in range(num_chunks):
+        calculate_ratios_batch(compact, compact=True)
+    if remainder:
+        calculate_ratios_batch(compact[:remainder], compact=True)
+    batch_s = time.perf_counter() - start
+
+    print(f"Footage: {args.hours:g} h at {args.fps:g} fps = {total_frames} frames, "
+          f"{compact.shape[1]} landmarks per frame, chunk {chunk} frames")
+    print("=" * 60)
+    print(f"{'implementation':<28} {'total s':>10} {'ns/frame':>10} {'speedup':>9}")
+    print(f"{'legacy per-frame (extrap.)':<28} {legacy_s:>10.2f} "
+          f"{legacy_s / total_frames * 1e9:>10.1f} {1.0:>8.1f}x")
+    print(f"{'calculate_ratios_batch':<28} {batch_s:>10.2f} "
+          f"{batch_s / total_frames * 1e9:>10.1f} {legacy_s / batch_s:>8.1f}x")
+    print("=" * 60)
+    print(f"Max abs error vs legacy: {max_error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+批量评分基准测试
+为大量对象随机生成眨眼频率、打哈欠次数、闭眼时长、PERCLOS、点头频率和低头时长（含恰好落在分段断点上的值），
+比较 FatigueLevelCalculator.score() 逐个计算与 score_batch() 一次批量计算的耗时，并检查结果逐项一致。
+结果不一致或批量耗时超过目标时返回非零状态
+
+用法:
+    python -m benchmarks.batch_scoring
+    python -m benchmarks.batch_scoring --subjects 100000 --target-ms 50
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import config
+from fatigue_level import FatigueLevelCalculator
+
+
+def make_metrics(num_subjects, rng):
+    """
+    生成随机指标，约四分之一取自分段表的断点或0
+
+    Args:
+        num_subjects: 对象数量
+        rng: NumPy随机数生成器
+
+    Returns:
+        metrics: {参数名: (F,) 数组}，参数名与 score_batch() 一致
+    """
+    def sample(high, table, integer=False):
+        values = rng.integers(0, high + 1, num_subjects) if integer else rng.uniform(0.0, high, num_subjects)
+        edges = np.array((0,) + tuple(config.SCORE_TABLES[table][0]), dtype=values.dtype)
+        pick = rng.random(num_subjects) < 0.25
+        values[pick] = rng.choice(edges, pick.sum())
+        return values
+
+    return {
+        'blink_rate': sample(30.0, 'blink_rate'),
+        'yawn_count': sample(8, 'yawn_count', integer=True),
+        'eye_closed_duration': sample(4.0, 'eye_closed'),
+        'perclos': sample(0.6, 'perclos'),
+        'nod_rate': sample(8.0, 'nod_rate'),
+        'head_down_duration': sample(4.0, 'eye_closed'),
+    }
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='批量评分基准测试')
+    parser.add_argument('--subjects', type=int, default=100000,
+                       help='对象数量（默认：100000）')
+    parser.add_argument('--repeat', type=int, default=20,
+                       help='批量计算重复次数，取中位数（默认：20）')
+    parser.add_argument('--target-ms', type=float, default=50.0,
+                       help='批量计算耗时目标（毫秒，默认：50）')
+    args = parser.parse_args()
+
+    calculator = FatigueLevelCalculator()
+    metrics = make_metrics(args.subjects, np.random.default_rng(0))
+
+    # 逐个计算（转换为Python标量，与实时检测中的输入类型一致）
+    columns = [metrics[name].tolist() for name in metrics]
+    start = time.perf_counter()
+    results = [calculator.score(*values) for values in zip(*columns)]
+    scalar_s = time.perf_counter() - start
+    scalar_levels = np.array([level.value for level, _ in results])
+    scalar_scores = np.array([score for _, score in results])
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        levels, scores = calculator.score_batch(**metrics)
+        timings.append(time.perf_counter() - start)
+    batch_s = float(np.median(timings))
+
+    levels_match = np.array_equal(levels, scalar_levels)
+    scores_match = np.array_equal(scores, scalar_scores)
+
+    print(f"Subjects: {args.subjects}")
+    print("=" * 60)
+    print(f"{'implementation':<28} {'total ms':>12} {'ns/subject':>12}")
+    print(f"{'score() per subject':<28} {scalar_s * 1e3:>12.1f} {scalar_s / args.subjects * 1e9:>12.0f}")
+    print(f"{'score_batch()':<28} {batch_s * 1e3:>12.2f} {batch_s / args.subjects * 1e9:>12.0f}")
+    print("=" * 60)
+    print(f"Speedup: {scalar_s / batch_s:.0f}x")
+    print(f"Match vs score(): levels {'ok' if levels_match else 'DIFF'}, scores {'ok' if scores_match else 'DIFF'}")
+    print("Level distribution: " + ", ".join(
+        f"{name} {count}" for name, count in zip(('normal', 'mild', 'moderate', 'severe'),
+                                                 np.bincount(levels, minlength=4))))
+
+    within_target = batch_s * 1e3 <= args.target_ms
+    print(f"Batch target {args.target_ms:g} ms: {'met' if within_target else 'EXCEEDED'}")
+    sys.exit(0 if within_target and levels_match and scores_match else 1)
+
+
+if __name__ == "__main__":
+    main()
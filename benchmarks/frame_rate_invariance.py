@@ -0,0 +1,242 @@
+"""
+帧率无关性检查
+按同一段眼睛/嘴部动作脚本以多种帧率（包括帧间隔随机变化的可变帧率）生成EAR/MAR序列，
+送入 FatigueDetector，检查各帧率下输出的事件序列是否一致，事件时间误差不超过两个帧间隔。
+同时列出按帧计数的原实现（60帧闭眼、30帧打哈欠）在各帧率下的结果作为对比
+
+也可以用 --input 指定包含人脸的录像：先以原始帧率检测一次得到逐帧EAR/MAR，再按各帧率抽帧比较
+
+用法:
+    python -m benchmarks.frame_rate_invariance
+    python -m benchmarks.frame_rate_invariance --fps 30 15 10 --duration 120
+    python -m benchmarks.frame_rate_invariance --input recordings/cab_01.mp4
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from fatigue_detector import FatigueDetector
+from utils import calculate_ratios_batch
+from benchmarks.synthetic import make_landmarks
+
+
+# 动作脚本（每20秒循环一次）：(开始秒, 结束秒, 动作)
+SCRIPT = [
+    (1.0, 1.2, 'eyes'),    # 短眨眼
+    (4.0, 4.3, 'eyes'),    # 眨眼
+    (7.0, 9.5, 'eyes'),    # 长时间闭眼（疲劳）
+    (12.0, 14.0, 'mouth'),  # 打哈欠
+    (16.0, 16.5, 'mouth'),  # 短暂张嘴（不计为打哈欠）
+    (18.0, 18.25, 'eyes'),  # 眨眼
+]
+SCRIPT_PERIOD = 20.0
+
+# 按帧计数的原实现阈值
+LEGACY_EYE_AR_CONSEC_FRAMES = 60
+LEGACY_YAWN_CONSEC_FRAMES = 30
+
+
+def make_timestamps(duration, fps, jitter=False, seed=0):
+    """
+    生成帧时间戳
+
+    Args:
+        duration: 时长（秒）
+        fps: 帧率；jitter为True时表示最低帧率
+        jitter: 是否使用随机帧间隔（在1/30秒和1/fps秒之间均匀分布）
+        seed: 随机种子
+
+    Returns:
+        timestamps: 帧时间戳数组（秒）
+    """
+    if not jitter:
+        return np.arange(int(duration * fps)) / fps
+    rng = np.random.default_rng(seed)
+    intervals = rng.uniform(1.0 / 30.0, 1.0 / fps, size=int(duration * 30) + 1)
+    timestamps = np.concatenate([[0.0], np.cumsum(intervals)])
+    return timestamps[timestamps < duration]
+
+
+def scripted_ratios(timestamps):
+    """
+    按动作脚本生成逐帧EAR和MAR
+
+    Args:
+        timestamps: 帧时间戳数组（秒，任意形状）
+
+    Returns:
+        ear: 与timestamps形状相同的双眼平均纵横比数组
+        mar: 与timestamps形状相同的嘴部纵横比数组
+    """
+    templates = np.stack([make_landmarks(), make_landmarks(eye_open=0.2), make_landmarks(mouth_open=1.0)])
+    ear_left, ear_right, mar = calculate_ratios_batch(templates)
+    ear = (ear_left + ear_right) / 2.0
+
+    phase = timestamps % SCRIPT_PERIOD
+    state = np.zeros(np.shape(timestamps), dtype=np.intp)
+    for start, end, action in SCRIPT:
+        state[(phase >= start) & (phase < end)] = 1 if action == 'eyes' else 2
+    return ear[state], mar[state]
+
+
+def recorded_ratios(source):
+    """
+    以原始帧率检测录像，得到逐帧EAR和MAR
+
+    Args:
+        source: 视频文件、图片目录或通配符路径
+
+    Returns:
+        timestamps: 检测到人脸的帧时间戳数组（秒）
+        ear: 双眼平均纵横比数组
+        mar: 嘴部纵横比数组
+    """
+    from pipeline import DetectionPipeline
+    from replay import iter_input_frames
+
+    pipeline = DetectionPipeline(tracking=False)
+    rows = []
+    for img, timestamp in iter_input_frames(source):
+        result = pipeline.process(img, timestamp)
+        if result.face_detected:
+            rows.append((timestamp, result.ear, result.mar))
+    rows = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+def detect_events(timestamps, ear, mar):
+    """
+    将EAR/MAR序列送入FatigueDetector并记录事件
+
+    Args:
+        timestamps: 帧时间戳数组（秒）
+        ear: 双眼平均纵横比数组
+        mar: 嘴部纵横比数组
+
+    Returns:
+        events: [(事件类型, 时间戳)] 列表，事件类型为 'blink'、'eyes_closed' 或 'yawn'
+    """
+    detector = FatigueDetector()
+    events = []
+    blinks, fatigued, yawning = 0, False, False
+    for timestamp, frame_ear, frame_mar in zip(timestamps, ear, mar):
+        detector.update(frame_ear, frame_mar, timestamp)
+        if detector.total_blinks > blinks:
+            events.append(('blink', timestamp))
+        if detector.is_fatigued and not fatigued:
+            events.append(('eyes_closed', timestamp))
+        if detector.is_yawning and not yawning:
+            events.append(('yawn', timestamp))
+        blinks, fatigued, yawning = detector.total_blinks, detector.is_fatigued, detector.is_yawning
+    return events
+
+
+def legacy_event_counts(ear, mar):
+    """
+    按帧计数的原实现统计事件数
+
+    Args:
+        ear: 双眼平均纵横比数组
+        mar: 嘴部纵横比数组
+
+    Returns:
+        counts: {'blink', 'eyes_closed', 'yawn'} 事件数
+    """
+    import config
+
+    counts = {'blink': 0, 'eyes_closed': 0, 'yawn': 0}
+    closed_frames = yawn_frames = 0
+    for frame_ear, frame_mar in zip(ear, mar):
+        if frame_ear < config.EAR_THRESHOLD:
+            closed_frames += 1
+            counts['eyes_closed'] += closed_frames == LEGACY_EYE_AR_CONSEC_FRAMES
+        else:
+            counts['blink'] += 0 < closed_frames < LEGACY_EYE_AR_CONSEC_FRAMES
+            closed_frames = 0
+        if frame_mar > config.MOUTH_AR_THRESHOLD:
+            yawn_frames += 1
+            counts['yawn'] += yawn_frames == LEGACY_YAWN_CONSEC_FRAMES
+        else:
+            yawn_frames = 0
+    return counts
+
+
+def compare_events(reference, events, tolerance):
+    """
+    比较两组事件
+
+    Args:
+        reference: 参考事件列表
+        events: 待比较事件列表
+        tolerance: 允许的时间误差（秒）
+
+    Returns:
+        max_delay: 最大时间误差（秒），事件类型序列不一致时为None
+    """
+    if [kind for kind, _ in reference] != [kind for kind, _ in events]:
+        return None
+    if not events:
+        return 0.0
+    delays = [abs(a - b) for (_, a), (_, b) in zip(reference, events)]
+    return max(delays) if max(delays) <= tolerance else None
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='帧率无关性检查')
+    parser.add_argument('--fps', type=float, nargs='+', default=[30.0, 25.0, 15.0, 12.0, 10.0],
+                       help='比较的帧率，第一个作为参考（默认：30 25 15 12 10）')
+    parser.add_argument('--duration', type=float, default=120.0,
+                       help='合成序列时长（秒，默认：120）')
+    parser.add_argument('--input', default=None,
+                       help='使用录像代替合成动作脚本（可选）')
+    args = parser.parse_args()
+
+    if args.input:
+        source_timestamps, source_ear, source_mar = recorded_ratios(args.input)
+        source_fps = (len(source_timestamps) - 1) / max(source_timestamps[-1] - source_timestamps[0], 1e-9)
+        runs = []
+        for fps in args.fps:
+            step = max(int(round(source_fps / fps)), 1)
+            runs.append((f"{source_fps / step:.1f} fps", step / source_fps, source_timestamps[::step],
+                         source_ear[::step], source_mar[::step]))
+    else:
+        runs = []
+        for fps in args.fps:
+            timestamps = make_timestamps(args.duration, fps)
+            runs.append((f"{fps:g} fps", 1.0 / fps, timestamps, *scripted_ratios(timestamps)))
+        timestamps = make_timestamps(args.duration, min(args.fps), jitter=True)
+        runs.append((f"variable {min(args.fps):g}-30 fps", 1.0 / min(args.fps), timestamps,
+                     *scripted_ratios(timestamps)))
+
+    reference = None
+    passed = True
+    print(f"{'frame rate':<20} {'blinks':>7} {'closed':>7} {'yawns':>6} {'max delay s':>12}  "
+          f"{'legacy b/c/y':>13}  status")
+    print("=" * 80)
+    for name, interval, timestamps, ear, mar in runs:
+        events = detect_events(timestamps, ear, mar)
+        counts = {kind: sum(1 for k, _ in events if k == kind) for kind in ('blink', 'eyes_closed', 'yawn')}
+        legacy = legacy_event_counts(ear, mar)
+        if reference is None:
+            reference, max_delay = events, 0.0
+        else:
+            max_delay = compare_events(reference, events, 2.0 * interval)
+        ok = max_delay is not None
+        passed = passed and ok
+        legacy_text = f"{legacy['blink']}/{legacy['eyes_closed']}/{legacy['yawn']}"
+        delay_text = f"{max_delay:.3f}" if ok else "-"
+        print(f"{name:<20} {counts['blink']:>7} {counts['eyes_closed']:>7} {counts['yawn']:>6} "
+              f"{delay_text:>12}  {legacy_text:>13}  {'ok' if ok else 'MISMATCH'}")
+    print("=" * 80)
+    print("Event outputs are identical across frame rates" if passed
+          else "Event outputs differ between frame rates")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
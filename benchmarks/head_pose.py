@@ -0,0 +1,102 @@
+"""
+头部姿态基准测试
+在合成的头部运动序列上测量 HeadPoseEstimator 每帧耗时和角度误差，
+比较沿用上一帧解作为迭代初值与每帧重新求解两种方式，并检查点头和长时间低头的检测结果。
+每帧耗时超过目标时返回非零状态
+
+用法:
+    python -m benchmarks.head_pose
+    python -m benchmarks.head_pose --seconds 120 --target-us 1000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import config
+from fatigue_detector import FatigueDetector
+from head_pose import HeadPoseEstimator
+from benchmarks.synthetic import make_head_pose_sequence
+
+
+def run_estimator(frames, angles, img_shape, reuse_guess):
+    """
+    逐帧估计头部姿态
+
+    Args:
+        frames: [(时间戳, 特征点数组)] 列表
+        angles: (N, 3) 真实角度（度）
+        img_shape: 图像形状 (h, w, c)
+        reuse_guess: 是否沿用上一帧的解作为初值
+
+    Returns:
+        per_frame_us: 每帧耗时（微秒）数组
+        max_error: 最大角度误差（度）
+        failures: 求解失败的帧数
+    """
+    estimator = HeadPoseEstimator()
+    per_frame_us = np.empty(len(frames))
+    errors = []
+    failures = 0
+    for i, (timestamp, landmarks) in enumerate(frames):
+        if not reuse_guess:
+            estimator.reset()
+        start = time.perf_counter()
+        pose = estimator.estimate(landmarks, img_shape, timestamp)
+        per_frame_us[i] = (time.perf_counter() - start) * 1e6
+        if pose is None:
+            failures += 1
+        else:
+            errors.append(np.abs(np.subtract(pose, angles[i])).max())
+    return per_frame_us, max(errors, default=0.0), failures
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='头部姿态基准测试')
+    parser.add_argument('--seconds', type=float, default=60.0,
+                       help='合成序列时长（秒，默认：60）')
+    parser.add_argument('--fps', type=float, default=30.0,
+                       help='帧率（默认：30）')
+    parser.add_argument('--target-us', type=float, default=1000.0,
+                       help='每帧耗时目标（微秒，默认：1000）')
+    args = parser.parse_args()
+
+    img_shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+    frames, angles = make_head_pose_sequence(int(args.seconds * args.fps), args.fps)
+
+    print(f"Head pose: {len(frames)} frames ({args.seconds:g} s at {args.fps:g} fps)")
+    print("=" * 72)
+    print(f"{'mode':<26} {'median us':>10} {'p99 us':>10} {'max err deg':>12} {'failures':>9}")
+    warm_median = None
+    for name, reuse_guess in (('extrinsic guess (reuse)', True), ('solve from scratch', False)):
+        per_frame_us, max_error, failures = run_estimator(frames, angles, img_shape, reuse_guess)
+        median = float(np.median(per_frame_us))
+        if reuse_guess:
+            warm_median = median
+        print(f"{name:<26} {median:>10.1f} {np.percentile(per_frame_us, 99):>10.1f} "
+              f"{max_error:>12.2f} {failures:>9}")
+    print("=" * 72)
+
+    # 点头与长时间低头检测（每10秒一次点头、一次长时间低头）
+    detector = FatigueDetector()
+    kinds = {}
+    for timestamp, landmarks in frames:
+        detector.detect(landmarks, timestamp, img_shape)
+        for event in detector.events:
+            kinds[event.kind] = kinds.get(event.kind, 0) + 1
+    cycles = int(args.seconds // 10)
+    print(f"Detected: {kinds.get('head_nod', 0)} nods, {kinds.get('head_down', 0)} head-down periods "
+          f"(scripted: {cycles} and {cycles})")
+
+    within_target = warm_median <= args.target_us
+    print(f"Per-frame target {args.target_us:g} us: {'met' if within_target else 'EXCEEDED'}")
+    sys.exit(0 if within_target else 1)
+
+
+if __name__ == "__main__":
+    main()
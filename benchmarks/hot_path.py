@@ -0,0 +1,322 @@
+"""
+检测热路径基准测试
+使用合成特征点和合成画面，在无摄像头的CPU环境下测量各阶段耗时，
+结果写入JSON并与基线比较，超出阈值时以非零状态退出
+
+用法:
+    python -m benchmarks.hot_path                       # 运行并与基线比较
+    python -m benchmarks.hot_path --output result.json  # 同时保存本次结果
+    python -m benchmarks.hot_path --update-baseline     # 用本次结果覆盖基线
+    python -m benchmarks.hot_path --only ear mar        # 只运行名称包含指定关键字的基准
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+import cv2
+import numpy as np
+
+import config
+from benchmarks.synthetic import (make_landmarks, make_landmark_sequence, make_head_pose_sequence,
+                                  to_normalized_landmark_list, make_frame)
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def bench_calculate_ear():
+    """utils.calculate_ear：单眼EAR"""
+    from utils import calculate_ear
+    landmarks = make_landmarks()
+    return lambda: calculate_ear(config.LEFT_EYE_INDICES, landmarks)
+
+
+def bench_calculate_mar():
+    """utils.calculate_mar：嘴部MAR"""
+    from utils import calculate_mar
+    landmarks = make_landmarks()
+    return lambda: calculate_mar(config.MOUTH_INDICES, landmarks)
+
+
+def bench_get_landmarks_array():
+    """FaceDetector.get_landmarks_array：478个特征点转换为数组"""
+    from face_detector import FaceDetector
+    detector = FaceDetector(roi_mode=False)
+    face_landmarks = to_normalized_landmark_list(make_landmarks())
+    shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+    return lambda: detector.get_landmarks_array(face_landmarks, shape)
+
+
+def bench_get_landmarks_subset():
+    """FaceDetector.get_landmarks_array：只提取检测用到的特征点"""
+    from face_detector import FaceDetector
+    detector = FaceDetector(roi_mode=False)
+    face_landmarks = to_normalized_landmark_list(make_landmarks())
+    shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+    return lambda: detector.get_landmarks_array(face_landmarks, shape,
+                                                indices=config.LANDMARK_SUBSET_INDICES)
+
+
+def bench_fatigue_detect():
+    """FatigueDetector.detect：循环回放包含眨眼、闭眼、哈欠的序列"""
+    from fatigue_detector import FatigueDetector
+    detector = FatigueDetector()
+    sequence = make_landmark_sequence(900)
+    state = {'i': 0}
+
+    def run():
+        timestamp, landmarks = sequence[state['i'] % len(sequence)]
+        state['i'] += 1
+        detector.detect(landmarks, timestamp)
+    return run
+
+
+def bench_fatigue_level_calculate():
+    """FatigueLevelCalculator.calculate：检测器已积累眨眼历史，每次完整计算"""
+    from fatigue_detector import FatigueDetector
+    from fatigue_level import FatigueLevelCalculator
+    detector = FatigueDetector()
+    for timestamp, landmarks in make_landmark_sequence(900):
+        detector.detect(landmarks, timestamp)
+    # 检测器状态不变，增量评分会一直沿用缓存，因此测量完整计算
+    calculator = FatigueLevelCalculator(incremental=False)
+    return lambda: calculator.calculate(detector)
+
+
+def bench_head_pose_estimate():
+    """HeadPoseEstimator.estimate：连续帧沿用上一帧的解作为初值"""
+    from head_pose import HeadPoseEstimator
+    estimator = HeadPoseEstimator()
+    frames, _ = make_head_pose_sequence(300)
+    shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+    state = {'i': 0}
+
+    def run():
+        timestamp, landmarks = frames[state['i'] % len(frames)]
+        state['i'] += 1
+        estimator.estimate(landmarks, shape, timestamp)
+    return run
+
+
+def bench_ui_draw_all():
+    """UIDrawer.draw_all：在1280x720画面上绘制全部UI"""
+    from ui import UIDrawer
+    from fatigue_detector import FatigueDetector
+    from fatigue_level import FatigueLevelCalculator
+    from metrics import FrameMetrics
+    drawer = UIDrawer()
+    detector = FatigueDetector()
+    calculator = FatigueLevelCalculator()
+    landmarks = make_landmarks()
+    detector.detect(landmarks, 0.0)
+    calculator.calculate(detector)
+    metrics = FrameMetrics.capture(detector, calculator)
+    frame = make_frame()
+    img = frame.copy()
+
+    def run():
+        np.copyto(img, frame)
+        drawer.draw_all(img, landmarks, metrics)
+    return run
+
+
+def bench_frame_metrics():
+    """FrameMetrics.capture + to_json：每帧生成快照并序列化一次（Web接口轮询时）"""
+    from fatigue_detector import FatigueDetector
+    from fatigue_level import FatigueLevelCalculator
+    from metrics import FrameMetrics
+    detector = FatigueDetector()
+    calculator = FatigueLevelCalculator()
+    for timestamp, landmarks in make_landmark_sequence(900):
+        detector.detect(landmarks, timestamp)
+    calculator.calculate(detector)
+    return lambda: FrameMetrics.capture(detector, calculator).to_json()
+
+
+def bench_draw_face_mesh():
+    """FaceDetector.draw_face_mesh：绘制完整三角网格"""
+    from face_detector import FaceDetector
+    detector = FaceDetector(roi_mode=False)
+    face_landmarks = to_normalized_landmark_list(make_landmarks())
+    frame = make_frame()
+    img = frame.copy()
+
+    def run():
+        np.copyto(img, frame)
+        detector.draw_face_mesh(img, face_landmarks)
+    return run
+
+
+def bench_mjpeg_encode():
+    """web_server.encode_frame：1280x720画面JPEG编码"""
+    from web_server import encode_frame
+    frame = make_frame()
+    return lambda: encode_frame(frame)
+
+
+# 名称 -> (构造函数, 每轮调用次数)
+BENCHMARKS = {
+    'utils.calculate_ear': (bench_calculate_ear, 5000),
+    'utils.calculate_mar': (bench_calculate_mar, 5000),
+    'FaceDetector.get_landmarks_array': (bench_get_landmarks_array, 500),
+    'FaceDetector.get_landmarks_subset': (bench_get_landmarks_subset, 2000),
+    'FatigueDetector.detect': (bench_fatigue_detect, 2000),
+    'FatigueLevelCalculator.calculate': (bench_fatigue_level_calculate, 5000),
+    'HeadPoseEstimator.estimate': (bench_head_pose_estimate, 2000),
+    'UIDrawer.draw_all': (bench_ui_draw_all, 100),
+    'FrameMetrics.capture': (bench_frame_metrics, 5000),
+    'FaceDetector.draw_face_mesh': (bench_draw_face_mesh, 50),
+    'web_server.encode_frame': (bench_mjpeg_encode, 20),
+}
+
+
+def run_benchmark(func, iterations, rounds):
+    """
+    运行单个基准
+
+    Args:
+        func: 被测函数（无参数）
+        iterations: 每轮调用次数
+        rounds: 轮数
+
+    Returns:
+        result: {'median_us', 'min_us', 'iterations', 'rounds'}
+    """
+    # 预热
+    for _ in range(max(iterations // 10, 1)):
+        func()
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+
+    return {
+        'median_us': float(np.median(per_call)),
+        'min_us': float(np.min(per_call)),
+        'iterations': iterations,
+        'rounds': rounds
+    }
+
+
+def environment():
+    """
+    获取运行环境信息
+
+    Returns:
+        env: 环境信息字典
+    """
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线比较
+
+    Args:
+        results: 本次结果 {名称: 结果}
+        baseline: 基线结果 {名称: 结果}
+        threshold: 允许的相对变慢比例（0.25表示慢25%以内）
+
+    Returns:
+        regressions: 超出阈值的基准名称列表
+    """
+    regressions = []
+    print("=" * 78)
+    print(f"{'benchmark':<36} {'baseline us':>12} {'current us':>12} {'change':>8}  status")
+    for name, result in results.items():
+        current = result['median_us']
+        if name not in baseline:
+            print(f"{name:<36} {'-':>12} {current:>12.2f} {'-':>8}  new")
+            continue
+        base = baseline[name]['median_us']
+        change = current / base - 1.0
+        status = 'ok'
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            status = 'faster'
+        print(f"{name:<36} {base:>12.2f} {current:>12.2f} {change:>+8.1%}  {status}")
+    print("=" * 78)
+    return regressions
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='检测热路径基准测试')
+    parser.add_argument('--output', type=str, default=None,
+                       help='本次结果输出文件（JSON）')
+    parser.add_argument('--baseline', type=str, default=BASELINE_PATH,
+                       help='基线文件（默认：benchmarks/baseline.json）')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                       help='允许的相对变慢比例（默认：0.25）')
+    parser.add_argument('--rounds', type=int, default=7,
+                       help='每个基准的轮数（默认：7）')
+    parser.add_argument('--only', nargs='+', default=None,
+                       help='只运行名称包含指定关键字的基准')
+    parser.add_argument('--update-baseline', action='store_true',
+                       help='用本次结果覆盖基线文件')
+    args = parser.parse_args()
+
+    results = {}
+    for name, (factory, iterations) in BENCHMARKS.items():
+        if args.only and not any(key.lower() in name.lower() for key in args.only):
+            continue
+        result = run_benchmark(factory(), iterations, args.rounds)
+        results[name] = result
+        print(f"{name:<36} {result['median_us']:>10.2f} us  (min {result['min_us']:.2f} us)")
+
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        baseline_results = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline_results = json.load(f)['results']
+        baseline_results.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': environment(), 'results': baseline_results}, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}, run with --update-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != report['environment']:
+        print("Warning: baseline was recorded in a different environment, "
+              "timings may not be comparable")
+
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"FAILED: {len(regressions)} stage(s) regressed more than {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"  - {name}")
+        sys.exit(1)
+    print("All stages within threshold")
+
+
+if __name__ == "__main__":
+    main()
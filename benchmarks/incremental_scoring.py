@@ -0,0 +1,127 @@
+"""
+增量评分基准测试
+用接近真实驾驶的EAR/MAR序列（每2-6秒一次眨眼，每2分钟左右一次打哈欠，偶尔长时间闭眼）驱动 FatigueDetector，
+同一检测器上并行运行逐帧完整计算和增量评分两个 FatigueLevelCalculator，
+比较评分耗时、实际重新计算的比例，以及增量评分相对逐帧计算的评分偏差和等级滞后时长
+
+用法:
+    python -m benchmarks.incremental_scoring
+    python -m benchmarks.incremental_scoring --minutes 30 --fps 30
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import config
+from fatigue_detector import FatigueDetector
+from fatigue_level import FatigueLevelCalculator
+
+
+def make_signal(num_frames, fps, seed=0):
+    """
+    生成EAR/MAR序列
+
+    Args:
+        num_frames: 帧数
+        fps: 帧率
+        seed: 随机种子
+
+    Returns:
+        ear: (N,) 眼睛纵横比
+        mar: (N,) 嘴部纵横比
+    """
+    rng = np.random.default_rng(seed)
+    ear = 0.30 + rng.normal(0.0, 0.01, num_frames)
+    mar = 0.30 + rng.normal(0.0, 0.02, num_frames)
+    duration = num_frames / fps
+
+    t = rng.uniform(2.0, 6.0)
+    while t < duration:
+        # 约5%的闭眼为2.5秒的长时间闭眼
+        length = 2.5 if rng.random() < 0.05 else rng.uniform(0.1, 0.3)
+        ear[int(t * fps):int((t + length) * fps) + 1] = 0.12
+        t += length + rng.uniform(2.0, 6.0)
+
+    t = rng.uniform(60.0, 180.0)
+    while t < duration:
+        mar[int(t * fps):int((t + 3.0) * fps)] = 0.9
+        t += rng.uniform(60.0, 180.0)
+    return ear, mar
+
+
+def longest_run(mask):
+    """
+    最长连续为True的帧数
+
+    Args:
+        mask: 布尔数组
+
+    Returns:
+        length: 帧数
+    """
+    longest = current = 0
+    for value in mask:
+        current = current + 1 if value else 0
+        longest = max(longest, current)
+    return longest
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='增量评分基准测试')
+    parser.add_argument('--minutes', type=float, default=10.0,
+                       help='模拟时长（分钟，默认：10）')
+    parser.add_argument('--fps', type=float, default=30.0,
+                       help='帧率（默认：30）')
+    args = parser.parse_args()
+
+    num_frames = int(args.minutes * 60 * args.fps)
+    ear, mar = make_signal(num_frames, args.fps)
+    detector = FatigueDetector()
+    full = FatigueLevelCalculator(incremental=False)
+    incremental = FatigueLevelCalculator(incremental=True)
+
+    full_s = incremental_s = 0.0
+    full_results = []
+    incremental_results = []
+    perf_counter = time.perf_counter
+    for i in range(num_frames):
+        detector.update(ear[i], mar[i], i / args.fps)
+        start = perf_counter()
+        level, score = full.calculate(detector)
+        middle = perf_counter()
+        cached_level, cached_score = incremental.calculate(detector)
+        incremental_s += perf_counter() - middle
+        full_s += middle - start
+        full_results.append((level.value, score))
+        incremental_results.append((cached_level.value, cached_score))
+
+    full_results = np.array(full_results)
+    incremental_results = np.array(incremental_results)
+    score_diff = np.abs(full_results[:, 1] - incremental_results[:, 1])
+    level_diff = full_results[:, 0] != incremental_results[:, 0]
+    full_changes = np.count_nonzero(np.diff(full_results[:, 0]))
+    incremental_changes = np.count_nonzero(np.diff(incremental_results[:, 0]))
+
+    print(f"Simulated {args.minutes:g} min at {args.fps:g} fps ({num_frames} frames), "
+          f"{detector.total_blinks} blinks, {detector.yawn_counter} yawns")
+    print(f"Refresh interval: {config.SCORE_REFRESH_INTERVAL:g} s")
+    print("=" * 64)
+    print(f"{'mode':<14} {'recomputes':>12} {'ratio':>8} {'us/frame':>10} {'history':>10}")
+    for name, calculator, elapsed in (('full', full, full_s), ('incremental', incremental, incremental_s)):
+        print(f"{name:<14} {calculator.recomputes:>12} {calculator.recompute_ratio:>8.1%} "
+              f"{elapsed / num_frames * 1e6:>10.2f} {calculator.scores.count:>10}")
+    print("=" * 64)
+    print(f"Scoring time saved: {1 - incremental_s / full_s:.0%}")
+    print(f"Score differs on {np.count_nonzero(score_diff)} frames "
+          f"({np.count_nonzero(score_diff) / num_frames:.1%}), max difference {score_diff.max()}")
+    print(f"Level differs on {np.count_nonzero(level_diff)} frames, "
+          f"longest stretch {longest_run(level_diff) / args.fps:.2f} s")
+    print(f"Level changes: {full_changes} full, {incremental_changes} incremental")
+
+if __name__ == "__main__":
+    main()
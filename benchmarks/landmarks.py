@@ -0,0 +1,152 @@
+"""
+特征点提取基准测试
+对比逐点Python循环的原实现与 FaceDetector.get_landmarks_array 的整组解析、子集提取路径，
+同时检查坐标误差，并检查特征点带有额外字段（visibility/presence）或缺少坐标时
+整组解析能识别布局变化并改为逐点读取，坐标仍然正确
+
+用法:
+    python -m benchmarks.landmarks
+    python -m benchmarks.landmarks --rounds 15
+"""
+
+import argparse
+import struct
+import sys
+
+import numpy as np
+
+import config
+from face_detector import FaceDetector
+from benchmarks.hot_path import run_benchmark
+from benchmarks.synthetic import make_landmarks, to_normalized_landmark_list
+
+
+def legacy_get_landmarks_array(face_landmarks, img_shape):
+    """
+    原实现：逐点读取并构造float64数组
+
+    Args:
+        face_landmarks: MediaPipe面部特征点
+        img_shape: 图像形状 (h, w, c)
+
+    Returns:
+        landmarks: 特征点坐标数组
+    """
+    h, w, c = img_shape
+    landmarks = []
+    for lm in face_landmarks.landmark:
+        landmarks.append([lm.x * w, lm.y * h])
+    return np.array(landmarks)
+
+
+def make_layout_cases(landmarks):
+    """
+    生成序列化布局各不相同的特征点列表
+
+    Args:
+        landmarks: (N, 2) 像素坐标数组
+
+    Returns:
+        cases: [(名称, NormalizedLandmarkList, 预期解析路径 'fast' 或 'fallback'), ...]
+    """
+    def variant(modify):
+        face_landmarks = to_normalized_landmark_list(landmarks)
+        modify(face_landmarks.landmark)
+        return face_landmarks
+
+    def set_all(points, **fields):
+        for lm in points:
+            for name, value in fields.items():
+                setattr(lm, name, value)
+
+    # 坐标的float32字节恰好等于记录头和标签值
+    tag_bytes = struct.unpack('<f', bytes((0x0a, 0x0f, 0x0d, 0x15)))[0]
+
+    return [
+        ('x, y, z', variant(lambda points: None), 'fast'),
+        ('coordinate bytes equal to tags', variant(lambda points: setattr(points[0], 'z', tag_bytes)), 'fast'),
+        ('visibility + presence on all points', variant(lambda points: set_all(points, visibility=0.9, presence=0.8)),
+         'fallback'),
+        ('visibility on one point', variant(lambda points: setattr(points[5], 'visibility', 0.9)), 'fallback'),
+        ('z missing on one point', variant(lambda points: points[5].ClearField('z')), 'fallback'),
+        # 一条记录少5字节、另一条多5字节，总长度与固定布局相同
+        ('z missing + visibility (same total size)',
+         variant(lambda points: (points[5].ClearField('z'), setattr(points[9], 'visibility', 0.9))), 'fallback'),
+    ]
+
+
+def check_layouts(detector, landmarks, shape):
+    """
+    检查各种序列化布局下的解析路径和坐标
+
+    Args:
+        detector: FaceDetector实例
+        landmarks: (N, 2) 像素坐标数组
+        shape: 图像形状 (h, w, c)
+
+    Returns:
+        ok: 全部布局的解析路径符合预期且坐标正确时为True
+    """
+    h, w = shape[:2]
+    ok = True
+    print(f"{'layout':<42} {'path':>9} {'max error px':>13}")
+    for name, face_landmarks, expected in make_layout_cases(landmarks):
+        fallbacks = detector.landmark_fallbacks
+        result = detector.get_landmarks_array(face_landmarks, shape, with_z=True)
+        path = 'fallback' if detector.landmark_fallbacks > fallbacks else 'fast'
+        reference = np.array([(lm.x * w, lm.y * h, lm.z * w) for lm in face_landmarks.landmark], dtype=np.float32)
+        error = np.abs(result - reference).max()
+        passed = path == expected and error < 1e-3
+        ok = ok and passed
+        print(f"{name:<42} {path:>9} {error:>13.2e}  {'ok' if passed else 'FAILED'}")
+    return ok
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='特征点提取基准测试')
+    parser.add_argument('--rounds', type=int, default=7,
+                       help='每种实现的轮数（默认：7）')
+    parser.add_argument('--iterations', type=int, default=500,
+                       help='每轮调用次数（默认：500）')
+    args = parser.parse_args()
+
+    detector = FaceDetector(roi_mode=False)
+    face_landmarks = to_normalized_landmark_list(make_landmarks())
+    shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+    subset = config.LANDMARK_SUBSET_INDICES
+
+    # 检查与原实现的误差
+    reference = legacy_get_landmarks_array(face_landmarks, shape)
+    full_error = np.abs(detector.get_landmarks_array(face_landmarks, shape) - reference).max()
+    subset_error = np.abs(detector.get_landmarks_array(face_landmarks, shape, indices=subset)[subset]
+                          - reference[subset]).max()
+
+    cases = {
+        'legacy python loop': lambda: legacy_get_landmarks_array(face_landmarks, shape),
+        'full (N, 2)': lambda: detector.get_landmarks_array(face_landmarks, shape),
+        'full (N, 3) with z': lambda: detector.get_landmarks_array(face_landmarks, shape, with_z=True),
+        f'subset ({len(subset)} points)': lambda: detector.get_landmarks_array(
+            face_landmarks, shape, indices=subset),
+    }
+
+    print(f"Landmarks: {len(face_landmarks.landmark)}, image: {shape[1]}x{shape[0]}")
+    print("=" * 60)
+    print(f"{'implementation':<28} {'median us':>10} {'min us':>9} {'speedup':>9}")
+    legacy_us = None
+    for name, func in cases.items():
+        result = run_benchmark(func, args.iterations, args.rounds)
+        legacy_us = legacy_us or result['median_us']
+        print(f"{name:<28} {result['median_us']:>10.2f} {result['min_us']:>9.2f} "
+              f"{legacy_us / result['median_us']:>8.1f}x")
+    print("=" * 60)
+    print(f"Max abs error vs legacy: full {full_error:.2e} px, subset {subset_error:.2e} px")
+    print("=" * 60)
+    if not check_layouts(detector, make_landmarks(), shape):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+MJPEG广播基准测试
+主线程以固定帧率提交画面，模拟多个浏览器同时观看 /video_feed，
+比较原实现（每个观看者循环每33毫秒自行编码一次当前画面）与 web_server.MJPEGBroadcaster（每个新画面只编码一次）
+的编码次数和进程CPU占用
+
+用法:
+    python -m benchmarks.mjpeg_broadcast
+    python -m benchmarks.mjpeg_broadcast --viewers 1 4 8 --seconds 5 --fps 30
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from buffer_pool import FramePool
+from web_server import MJPEGBroadcaster, encode_frame
+from benchmarks.synthetic import make_frame
+
+
+class LegacyFeed:
+    """
+    原实现：当前画面保存在带锁的单槽中，每个观看者的生成器循环自行编码
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.current_frame = None
+        self.frame_lock = threading.Lock()
+        self.running = True
+        self.encoded = 0
+        self.sent = 0
+
+    def submit(self, frame):
+        with self.frame_lock:
+            old = self.current_frame
+            self.current_frame = frame
+        self.pool.release(old)
+
+    def stream(self):
+        while self.running:
+            with self.frame_lock:
+                current = self.current_frame
+                if current is not None:
+                    self.pool.retain(current)
+            if current is not None:
+                jpeg = encode_frame(current)
+                self.pool.release(current)
+                self.encoded += 1
+                if jpeg is not None:
+                    self.sent += 1
+                    yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+            time.sleep(0.033)
+
+    def stop(self):
+        self.running = False
+        self.pool.release(self.current_frame)
+        self.current_frame = None
+
+
+def run(feed, viewers, seconds, fps, frame, pool):
+    """
+    以固定帧率提交画面，同时由多个观看者线程读取视频流
+
+    Args:
+        feed: LegacyFeed或MJPEGBroadcaster实例（已启动）
+        viewers: 观看者数量
+        seconds: 测试时长（秒）
+        fps: 提交画面的帧率
+        frame: 测试画面
+        pool: 帧缓冲池
+
+    Returns:
+        cpu_percent: 测试期间进程CPU占用（单核百分比）
+        received: 每个观看者收到的画面数列表
+    """
+    received = [0] * viewers
+    done = threading.Event()
+
+    def viewer(index):
+        stream = feed.stream()
+        for _ in stream:
+            received[index] += 1
+            if done.is_set():
+                break
+        stream.close()
+
+    threads = [threading.Thread(target=viewer, args=(i,), daemon=True) for i in range(viewers)]
+    for thread in threads:
+        thread.start()
+    # 等待观看者连接
+    while isinstance(feed, MJPEGBroadcaster) and feed.clients < viewers:
+        time.sleep(0.001)
+
+    interval = 1.0 / fps
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    next_time = start_wall
+    for _ in range(int(seconds * fps)):
+        buf = pool.acquire(frame.shape, frame.dtype)
+        np.copyto(buf, frame)
+        feed.submit(buf)
+        next_time += interval
+        time.sleep(max(next_time - time.perf_counter(), 0.0))
+    cpu = time.process_time() - start_cpu
+    wall = time.perf_counter() - start_wall
+
+    done.set()
+    feed.stop()
+    for thread in threads:
+        thread.join(2.0)
+    return cpu / wall * 100.0, received
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='MJPEG广播基准测试')
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 4, 8],
+                       help='观看者数量（默认：1 4 8）')
+    parser.add_argument('--seconds', type=float, default=5.0,
+                       help='每项测试时长（秒，默认：5）')
+    parser.add_argument('--fps', type=float, default=30.0,
+                       help='提交画面的帧率（默认：30）')
+    args = parser.parse_args()
+
+    frame = make_frame()
+    submitted = int(args.seconds * args.fps)
+    print(f"Submitting {submitted} frames at {args.fps:g} fps ({frame.shape[1]}x{frame.shape[0]})")
+    print("=" * 72)
+    print(f"{'implementation':<16} {'viewers':>8} {'encodes':>9} {'per frame':>10} {'CPU %':>8} {'received/viewer':>17}")
+    for viewers in args.viewers:
+        for name in ('per-client', 'broadcaster'):
+            pool = FramePool()
+            if name == 'per-client':
+                feed = LegacyFeed(pool)
+            else:
+                feed = MJPEGBroadcaster(pool)
+                feed.start()
+            cpu_percent, received = run(feed, viewers, args.seconds, args.fps, frame, pool)
+            print(f"{name:<16} {viewers:>8} {feed.encoded:>9} {feed.encoded / submitted:>10.2f} "
+                  f"{cpu_percent:>8.0f} {np.mean(received):>17.0f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+推理分辨率基准测试
+对比不同推理宽度下 FaceMesh 的单帧耗时，以及 EAR/MAR 相对原始分辨率的偏差
+
+用法:
+    python -m benchmarks.resolution --input recordings/cab_01.mp4
+    python -m benchmarks.resolution --input frames/ --widths 1280 960 640 480 320
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+import config
+from face_detector import FaceDetector
+from replay import iter_input_frames
+from utils import calculate_ear, calculate_mar
+
+
+def measure(frames, inference_width):
+    """
+    在指定推理宽度下处理所有帧
+
+    Args:
+        frames: (图像, 时间戳) 列表
+        inference_width: 推理宽度（0表示原始分辨率）
+
+    Returns:
+        latencies: 每帧 process() 耗时（毫秒）
+        metrics: 每帧 (EAR, MAR)，未检测到面部时为None
+    """
+    detector = FaceDetector(roi_mode=False, inference_width=inference_width)
+    latencies = []
+    metrics = []
+
+    for img, _ in frames:
+        start = time.perf_counter()
+        results = detector.process(img)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if not results.multi_face_landmarks:
+            metrics.append(None)
+            continue
+
+        # 按显示分辨率换算特征点，与实际使用方式一致
+        landmarks = detector.get_landmarks_array(results.multi_face_landmarks[0], img.shape)
+        ear = (calculate_ear(config.LEFT_EYE_INDICES, landmarks) +
+               calculate_ear(config.RIGHT_EYE_INDICES, landmarks)) / 2.0
+        mar = calculate_mar(config.MOUTH_INDICES, landmarks)
+        metrics.append((ear, mar))
+
+    return np.array(latencies), metrics
+
+
+def drift(metrics, reference):
+    """
+    计算相对参考分辨率的指标偏差
+
+    Args:
+        metrics: 待比较的逐帧指标
+        reference: 参考分辨率的逐帧指标
+
+    Returns:
+        ear_drift: EAR平均绝对偏差
+        mar_drift: MAR平均绝对偏差
+        agreement: EAR阈值判定（闭眼/睁眼）一致的帧比例
+    """
+    pairs = [(m, r) for m, r in zip(metrics, reference) if m is not None and r is not None]
+    if not pairs:
+        return float('nan'), float('nan'), float('nan')
+
+    values = np.array([(m[0], m[1], r[0], r[1]) for m, r in pairs])
+    ear_drift = np.mean(np.abs(values[:, 0] - values[:, 2]))
+    mar_drift = np.mean(np.abs(values[:, 1] - values[:, 3]))
+    agreement = np.mean((values[:, 0] < config.EAR_THRESHOLD) ==
+                        (values[:, 2] < config.EAR_THRESHOLD))
+    return ear_drift, mar_drift, agreement
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='推理分辨率基准测试')
+    parser.add_argument('--input', type=str, required=True,
+                       help='包含人脸的视频文件、图片目录或通配符')
+    parser.add_argument('--widths', type=int, nargs='+', default=[960, 640, 480, 320, 240],
+                       help='待测试的推理宽度（像素）')
+    parser.add_argument('--max-frames', type=int, default=300,
+                       help='最多使用的帧数（默认：300）')
+    args = parser.parse_args()
+
+    frames = []
+    for frame in iter_input_frames(args.input):
+        frames.append(frame)
+        if len(frames) >= args.max_frames:
+            break
+    if not frames:
+        print(f"Error: No frames read from {args.input}")
+        return
+
+    h, w = frames[0][0].shape[:2]
+    print(f"Frames: {len(frames)}, display resolution: {w}x{h}")
+
+    ref_latencies, reference = measure(frames, 0)
+    ref_detected = sum(m is not None for m in reference)
+
+    print("=" * 78)
+    print(f"{'width':>6} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8} {'detect':>8} "
+          f"{'EAR drift':>10} {'MAR drift':>10} {'agree':>7}")
+    print(f"{w:>6} {np.percentile(ref_latencies, 50):>8.2f} {np.percentile(ref_latencies, 95):>8.2f} "
+          f"{1.0:>8.2f} {ref_detected / len(frames):>8.1%} {0.0:>10.4f} {0.0:>10.4f} {1.0:>7.1%}")
+
+    for width in sorted(args.widths, reverse=True):
+        if width >= w:
+            continue
+        latencies, metrics = measure(frames, width)
+        detected = sum(m is not None for m in metrics)
+        ear_drift, mar_drift, agreement = drift(metrics, reference)
+        speedup = np.percentile(ref_latencies, 50) / np.percentile(latencies, 50)
+        print(f"{width:>6} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+              f"{speedup:>8.2f} {detected / len(frames):>8.1%} {ear_drift:>10.4f} "
+              f"{mar_drift:>10.4f} {agreement:>7.1%}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+评分历史基准测试
+比较原实现（字典列表，list.pop(0)裁剪，每次查询重建列表）与 rolling_window.RollingWindow
+在多分钟窗口下每帧记录并查询平均分、趋势和最小/最大值的耗时及内存占用，并核对两者结果一致
+
+用法:
+    python -m benchmarks.rolling_window
+    python -m benchmarks.rolling_window --minutes 10 --fps 30
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import config
+from rolling_window import RollingWindow
+
+
+class LegacyHistory:
+    """
+    原实现：每帧追加一个字典，超出长度时list.pop(0)，查询时从切片重建列表
+    """
+
+    def __init__(self, max_len):
+        self.history = []
+        self.max_len = max_len
+
+    def append(self, score, timestamp):
+        self.history.append({'score': score, 'timestamp': timestamp, 'level': None, 'blink_rate': 0.0,
+                             'yawn_count': 0, 'eye_closed': 0.0, 'perclos': 0.0, 'nod_rate': 0.0})
+        if len(self.history) > self.max_len:
+            self.history.pop(0)
+
+    def mean(self, frames):
+        scores = [h['score'] for h in self.history[-frames:]]
+        return sum(scores) / len(scores)
+
+    def trend(self, frames):
+        recent = [h['score'] for h in self.history[-frames:]]
+        older = [h['score'] for h in self.history[-2 * frames:-frames]]
+        return sum(recent) / len(recent) - sum(older) / len(older)
+
+    def extremes(self, frames):
+        scores = [h['score'] for h in self.history[-frames:]]
+        return min(scores), max(scores)
+
+
+def run(history, scores, timestamps, window_frames):
+    """
+    逐帧记录评分并查询
+
+    Args:
+        history: LegacyHistory或RollingWindow实例
+        scores: 评分序列
+        timestamps: 时间戳序列
+        window_frames: 查询窗口帧数（平均分、最小/最大值；趋势比较两个该长度的窗口）
+
+    Returns:
+        per_frame_us: 每帧平均耗时（微秒）
+        last: 最后一帧的 (平均分, 趋势, 最小值, 最大值)
+    """
+    warm = 2 * window_frames
+    for score, timestamp in zip(scores[:warm], timestamps[:warm]):
+        history.append(score, timestamp)
+    start = time.perf_counter()
+    for score, timestamp in zip(scores[warm:], timestamps[warm:]):
+        history.append(score, timestamp)
+        mean = history.mean(frames=window_frames)
+        trend = history.trend(frames=window_frames)
+        extremes = history.extremes(frames=window_frames)
+    elapsed = time.perf_counter() - start
+    return elapsed / (len(scores) - warm) * 1e6, (mean, trend) + tuple(extremes)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='评分历史基准测试')
+    parser.add_argument('--minutes', type=float, default=5.0,
+                       help='查询窗口长度（分钟，默认：5）')
+    parser.add_argument('--fps', type=float, default=30.0,
+                       help='帧率（默认：30）')
+    parser.add_argument('--frames', type=int, default=3000,
+                       help='计时的帧数（默认：3000）')
+    args = parser.parse_args()
+
+    window = int(args.minutes * 60 * args.fps)
+    capacity = max(config.SCORE_HISTORY_LEN, 2 * window)
+    total = 2 * window + args.frames
+    rng = np.random.default_rng(0)
+    scores = np.clip(np.cumsum(rng.integers(-3, 4, size=total)) + 40, 0, 100).tolist()
+    timestamps = (np.arange(total) / args.fps).tolist()
+
+    results = {}
+    for name, factory in (('list of dicts', lambda: LegacyHistory(capacity)),
+                          ('RollingWindow', lambda: RollingWindow(capacity, frame_windows=(window,)))):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        history = factory()
+        per_frame_us, last = run(history, scores, timestamps, window)
+        memory = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results[name] = (per_frame_us, memory, last)
+
+    print(f"Window: {args.minutes:g} min at {args.fps:g} fps ({window} frames), history {capacity} frames")
+    print("=" * 64)
+    print(f"{'implementation':<18} {'us/frame':>12} {'memory MB':>12}")
+    for name, (per_frame_us, memory, _) in results.items():
+        print(f"{name:<18} {per_frame_us:>12.1f} {memory / 1e6:>12.2f}")
+    print("=" * 64)
+    legacy, ring = results['list of dicts'], results['RollingWindow']
+    print(f"Speedup: {legacy[0] / ring[0]:.0f}x, memory {legacy[1] / ring[1]:.1f}x smaller")
+    match = np.allclose(legacy[2], ring[2])
+    print(f"Results (mean, trend, min, max) match: {'ok' if match else 'DIFF'}")
+
+
+if __name__ == "__main__":
+    main()
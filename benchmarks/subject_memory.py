@@ -0,0 +1,125 @@
+"""
+多对象状态内存基准测试
+比较每个对象使用 FatigueDetector + FatigueLevelCalculator 与使用 subject_store.SubjectStore 的内存占用，
+并测量 SubjectStore 对全部对象执行一步检测和评分的耗时。
+内存超过 config.SUBJECT_MEMORY_TARGET 时返回非零状态
+
+用法:
+    python -m benchmarks.subject_memory
+    python -m benchmarks.subject_memory --subjects 10000 --seconds 300 --fps 10
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import config
+from fatigue_detector import FatigueDetector
+from fatigue_level import FatigueLevelCalculator
+from subject_store import SubjectStore
+from benchmarks.frame_rate_invariance import scripted_ratios
+
+
+def scalar_bytes_per_subject(num_subjects, timestamps, offsets):
+    """
+    测量逐对象实现的内存（运行足够长时间使历史记录和统计窗口填满）
+
+    Args:
+        num_subjects: 对象数量
+        timestamps: 帧时间戳数组（秒）
+        offsets: (num_subjects,) 每个对象动作脚本的时间偏移（秒）
+
+    Returns:
+        per_subject: 每个对象占用的字节数
+        subjects: [(FatigueDetector, FatigueLevelCalculator)] 列表，用于结果比对
+    """
+    ear, mar = scripted_ratios(timestamps[:, None] + offsets[None, :num_subjects])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subjects = [(FatigueDetector(), FatigueLevelCalculator()) for _ in range(num_subjects)]
+    for i, timestamp in enumerate(timestamps):
+        for j, (detector, calculator) in enumerate(subjects):
+            detector.update(ear[i, j], mar[i, j], timestamp)
+            calculator.calculate(detector)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / num_subjects, subjects
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='多对象状态内存基准测试')
+    parser.add_argument('--subjects', type=int, default=10000,
+                       help='SubjectStore中的对象数量（默认：10000）')
+    parser.add_argument('--scalar-subjects', type=int, default=20,
+                       help='逐对象实现实际测量的对象数量，其余按比例外推（默认：20）')
+    parser.add_argument('--seconds', type=float, default=300.0,
+                       help='模拟时长（秒，默认：300，使5分钟统计窗口填满）')
+    parser.add_argument('--fps', type=float, default=10.0,
+                       help='每个对象的帧率（默认：10）')
+    args = parser.parse_args()
+
+    timestamps = np.arange(int(args.seconds * args.fps)) / args.fps
+    rng = np.random.default_rng(0)
+    offsets = rng.uniform(0.0, 20.0, size=args.subjects)
+    ids = np.arange(args.subjects)
+
+    # SubjectStore：对全部对象逐步更新
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = SubjectStore(args.subjects)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    update_s = score_s = 0.0
+    for timestamp in timestamps:
+        ear, mar = scripted_ratios(timestamp + offsets)
+        start = time.perf_counter()
+        store.update(ids, ear, mar, np.full(args.subjects, timestamp))
+        update_s += time.perf_counter() - start
+        start = time.perf_counter()
+        store.score()
+        score_s += time.perf_counter() - start
+    store_per_subject = store.nbytes / args.subjects
+
+    # 逐对象实现
+    scalar_per_subject, subjects = scalar_bytes_per_subject(args.scalar_subjects, timestamps, offsets)
+
+    # 比对前scalar_subjects个对象的结果
+    n = len(subjects)
+    levels = [calculator.level.value for _, calculator in subjects]
+    matches = {
+        'total_blinks': np.array_equal(store.total_blinks[:n], [d.total_blinks for d, _ in subjects]),
+        'yawn_count': np.array_equal(store.yawn_counter[:n], [d.yawn_counter for d, _ in subjects]),
+        'is_fatigued': np.array_equal(store.is_fatigued[:n], [d.is_fatigued for d, _ in subjects]),
+        'fatigue_level': np.array_equal(store.fatigue_level[:n], levels),
+    }
+
+    steps = len(timestamps)
+    print(f"Subjects: {args.subjects}, simulated {args.seconds:g} s at {args.fps:g} fps ({steps} steps)")
+    print("=" * 60)
+    print(f"{'implementation':<34} {'bytes/subject':>13} {'total MB':>10}")
+    print(f"{'FatigueDetector + Calculator':<34} {scalar_per_subject:>13.0f} "
+          f"{scalar_per_subject * args.subjects / 1e6:>10.1f}")
+    print(f"{'SubjectStore':<34} {store_per_subject:>13.0f} "
+          f"{store_per_subject * args.subjects / 1e6:>10.1f}")
+    print("=" * 60)
+    print(f"SubjectStore arrays allocated: {allocated / 1e6:.1f} MB (tracemalloc)")
+    print(f"Vectorized step for {args.subjects} subjects: update {update_s / steps * 1e3:.2f} ms, "
+          f"score {score_s / steps * 1e3:.2f} ms")
+    print("Match vs per-subject objects (first {}): {}".format(
+        n, ", ".join(f"{name} {'ok' if ok else 'DIFF'}" for name, ok in matches.items())))
+
+    within_target = store_per_subject <= config.SUBJECT_MEMORY_TARGET
+    print(f"Memory target {config.SUBJECT_MEMORY_TARGET} bytes/subject: "
+          f"{'met' if within_target else 'EXCEEDED'}")
+    sys.exit(0 if within_target else 1)
+
+
+if __name__ == "__main__":
+    main()
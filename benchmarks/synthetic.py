@@ -0,0 +1,198 @@
+"""
+合成输入
+生成不依赖摄像头的特征点数组、MediaPipe特征点列表和测试画面
+"""
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+import config
+
+
+NUM_LANDMARKS = 478
+
+
+def make_landmarks(width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT,
+                   eye_open=1.0, mouth_open=0.2, seed=0):
+    """
+    生成一组像素坐标特征点
+
+    其余点随机分布在面部区域内，眼睛和嘴部按给定开合程度摆放
+
+    Args:
+        width: 画面宽度
+        height: 画面高度
+        eye_open: 眼睛张开程度（0闭合，1正常）
+        mouth_open: 嘴部张开程度（MAR近似值）
+        seed: 随机种子
+
+    Returns:
+        landmarks: (478, 2) 特征点坐标数组
+    """
+    rng = np.random.default_rng(seed)
+    cx, cy = width * 0.5, height * 0.5
+    face = min(width, height) * 0.5
+
+    landmarks = np.empty((NUM_LANDMARKS, 2))
+    landmarks[:, 0] = cx + rng.uniform(-0.4, 0.4, NUM_LANDMARKS) * face
+    landmarks[:, 1] = cy + rng.uniform(-0.5, 0.5, NUM_LANDMARKS) * face
+
+    # 眼睛：p0/p3为眼角，p1/p5、p2/p4为上下眼睑
+    eye_w = face * 0.2
+    eye_h = eye_w * 0.3 * eye_open
+    for indices, ex in ((config.LEFT_EYE_INDICES, cx - face * 0.2),
+                        (config.RIGHT_EYE_INDICES, cx + face * 0.2)):
+        ey = cy - face * 0.15
+        p0, p1, p2, p3, p4, p5 = indices
+        landmarks[p0] = (ex - eye_w / 2, ey)
+        landmarks[p3] = (ex + eye_w / 2, ey)
+        landmarks[p1] = (ex - eye_w / 6, ey - eye_h / 2)
+        landmarks[p5] = (ex - eye_w / 6, ey + eye_h / 2)
+        landmarks[p2] = (ex + eye_w / 6, ey - eye_h / 2)
+        landmarks[p4] = (ex + eye_w / 6, ey + eye_h / 2)
+
+    # 嘴部：上唇、下唇、左嘴角、右嘴角
+    mouth_w = face * 0.35
+    my = cy + face * 0.25
+    upper, lower, left, right = config.MOUTH_INDICES
+    landmarks[left] = (cx - mouth_w / 2, my)
+    landmarks[right] = (cx + mouth_w / 2, my)
+    landmarks[upper] = (cx, my - mouth_w * mouth_open / 2)
+    landmarks[lower] = (cx, my + mouth_w * mouth_open / 2)
+
+    # 鼻尖和下巴（头部姿态用到的其余特征点已在眼角、嘴角中）
+    nose, chin = config.HEAD_POSE_INDICES[:2]
+    landmarks[nose] = (cx, cy + face * 0.05)
+    landmarks[chin] = (cx, cy + face * 0.45)
+    return landmarks
+
+
+def make_head_pose_sequence(num_frames, fps=30.0, width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT,
+                            noise=0.5, seed=0):
+    """
+    生成包含头部转动、点头和长时间低头的特征点序列
+
+    头部姿态特征点由三维人脸模型按给定角度投影得到，每10秒一个周期：
+    缓慢左右转头并轻微摆动，2秒处点头0.6秒，6秒处低头2.5秒
+
+    Args:
+        num_frames: 帧数
+        fps: 帧率
+        width: 画面宽度
+        height: 画面高度
+        noise: 特征点坐标噪声标准差（像素）
+        seed: 随机种子
+
+    Returns:
+        frames: [(时间戳, 特征点数组)] 列表
+        angles: (num_frames, 3) 真实的 (pitch, yaw, roll) 角度（度）
+    """
+    from head_pose import HEAD_MODEL_POINTS
+
+    rng = np.random.default_rng(seed)
+    base = make_landmarks(width, height, seed=seed)
+    camera_matrix = np.array([[width, 0.0, width / 2.0], [0.0, width, height / 2.0], [0.0, 0.0, 1.0]])
+    tvec = np.array([[0.0], [0.0], [2800.0]])
+
+    frames = []
+    angles = np.empty((num_frames, 3))
+    for i in range(num_frames):
+        t = i / fps
+        phase = t % 10.0
+        pitch = 3.0 * np.sin(t * 0.9)
+        if 2.0 <= phase < 2.6 or 6.0 <= phase < 8.5:
+            pitch += 25.0
+        yaw = 20.0 * np.sin(t * 0.4)
+        roll = 5.0 * np.sin(t * 0.7)
+        angles[i] = (pitch, yaw, roll)
+
+        rx, ry, rz = np.radians(angles[i])
+        rot_x = np.array([[1, 0, 0], [0, np.cos(rx), -np.sin(rx)], [0, np.sin(rx), np.cos(rx)]])
+        rot_y = np.array([[np.cos(ry), 0, np.sin(ry)], [0, 1, 0], [-np.sin(ry), 0, np.cos(ry)]])
+        rot_z = np.array([[np.cos(rz), -np.sin(rz), 0], [np.sin(rz), np.cos(rz), 0], [0, 0, 1]])
+        rvec, _ = cv2.Rodrigues(rot_z @ rot_y @ rot_x)
+        points, _ = cv2.projectPoints(HEAD_MODEL_POINTS, rvec, tvec, camera_matrix, None)
+
+        landmarks = base.copy()
+        landmarks[config.HEAD_POSE_INDICES] = points.reshape(-1, 2) + rng.normal(0.0, noise, (len(points), 2))
+        frames.append((t, landmarks))
+    return frames, angles
+
+
+def make_landmark_sequence(num_frames, fps=30.0, seed=0):
+    """
+    生成包含眨眼、长时间闭眼和打哈欠的特征点序列
+
+    Args:
+        num_frames: 帧数
+        fps: 帧率
+        seed: 随机种子
+
+    Returns:
+        frames: [(时间戳, 特征点数组)] 列表
+    """
+    open_eyes = make_landmarks(seed=seed)
+    closed_eyes = make_landmarks(eye_open=0.2, seed=seed)
+    yawning = make_landmarks(mouth_open=1.0, seed=seed)
+
+    frames = []
+    for i in range(num_frames):
+        t = i / fps
+        phase = t % 10.0
+        if phase % 3.0 < 0.15 or 6.0 <= phase < 8.5:
+            # 每3秒一次短眨眼，每10秒一次2.5秒的长时间闭眼
+            landmarks = closed_eyes
+        elif 8.5 <= phase < 10.0:
+            landmarks = yawning
+        else:
+            landmarks = open_eyes
+        frames.append((t, landmarks))
+    return frames
+
+
+def to_normalized_landmark_list(landmarks, width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT):
+    """
+    转换为MediaPipe归一化特征点列表
+
+    Args:
+        landmarks: (N, 2) 像素坐标数组
+        width: 画面宽度
+        height: 画面高度
+
+    Returns:
+        face_landmarks: NormalizedLandmarkList实例
+    """
+    face_landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y in landmarks:
+        face_landmarks.landmark.add(x=x / width, y=y / height, z=0.0)
+    return face_landmarks
+
+
+def make_frame(width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT, seed=0):
+    """
+    生成一帧接近真实画面的测试图像（平滑背景加少量纹理）
+
+    纯随机噪声的JPEG编码耗时远高于真实画面，因此不直接使用噪声
+
+    Args:
+        width: 画面宽度
+        height: 画面高度
+        seed: 随机种子
+
+    Returns:
+        img: BGR图像
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:, :, 0] = (60 + 80 * x + 40 * y).astype(np.uint8)
+    img[:, :, 1] = (80 + 60 * y + 20 * x).astype(np.uint8)
+    img[:, :, 2] = (100 + 50 * x * y).astype(np.uint8)
+
+    cv2.ellipse(img, (width // 2, height // 2), (height // 4, height // 3),
+                0, 0, 360, (140, 170, 210), -1)
+    noise = rng.integers(0, 12, size=img.shape, dtype=np.uint8)
+    cv2.add(img, noise, dst=img)
+    return cv2.GaussianBlur(img, (3, 3), 0)
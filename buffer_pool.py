@@ -0,0 +1,146 @@
+"""
+帧缓冲池模块
+按形状和数据类型复用整帧图像缓冲区，使稳定运行时每帧几乎不再分配内存
+"""
+
+import threading
+
+import numpy as np
+
+import config
+
+
+class FramePool:
+    """
+    帧缓冲池类
+    acquire()取得缓冲区，所有使用者release()之后缓冲区回到池中复用
+    """
+
+    def __init__(self, max_free_per_key=None):
+        """
+        初始化帧缓冲池
+
+        Args:
+            max_free_per_key: 每种形状/类型最多保留的空闲缓冲区数量
+        """
+        self.max_free_per_key = max_free_per_key or config.FRAME_POOL_MAX_FREE_PER_KEY
+        self._free = {}
+        self._in_use = {}
+        self._lock = threading.Lock()
+
+        # 分配统计
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reuses = 0
+        self.releases = 0
+        self.discarded = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        取得一个缓冲区（内容未初始化），引用计数为1
+
+        Args:
+            shape: 缓冲区形状
+            dtype: 数据类型
+
+        Returns:
+            buf: numpy数组
+        """
+        dtype = np.dtype(dtype)
+        key = (tuple(shape), dtype.str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buf = free.pop()
+                self.reuses += 1
+                self._in_use[id(buf)] = [buf, 1]
+                return buf
+
+        # 分配放在锁外，避免阻塞其他线程
+        buf = np.empty(shape, dtype=dtype)
+        with self._lock:
+            self.allocations += 1
+            self.allocated_bytes += buf.nbytes
+            self._in_use[id(buf)] = [buf, 1]
+        return buf
+
+    def retain(self, buf):
+        """
+        增加缓冲区的引用计数（新的使用者开始持有）
+
+        Args:
+            buf: 由acquire()取得的缓冲区
+
+        Returns:
+            retained: 是否为池中的缓冲区
+        """
+        with self._lock:
+            entry = self._in_use.get(id(buf))
+            if entry is None:
+                return False
+            entry[1] += 1
+            return True
+
+    def release(self, buf):
+        """
+        释放缓冲区，引用计数归零后回到池中
+
+        不是由本池分配的数组会被忽略，因此对任意数组调用都是安全的
+
+        Args:
+            buf: 缓冲区
+
+        Returns:
+            released: 是否为池中的缓冲区
+        """
+        if buf is None:
+            return False
+        with self._lock:
+            entry = self._in_use.get(id(buf))
+            if entry is None:
+                return False
+            entry[1] -= 1
+            if entry[1] > 0:
+                return True
+            del self._in_use[id(buf)]
+            self.releases += 1
+
+            key = (buf.shape, buf.dtype.str)
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free_per_key:
+                free.append(buf)
+            else:
+                self.discarded += 1
+            return True
+
+    def get_stats(self):
+        """
+        获取分配统计
+
+        Returns:
+            stats: 统计字典（新分配次数、分配字节数、复用次数、释放次数、使用中数量、空闲数量）
+        """
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'allocated_mb': self.allocated_bytes / (1024 * 1024),
+                'reuses': self.reuses,
+                'releases': self.releases,
+                'discarded': self.discarded,
+                'in_use': len(self._in_use),
+                'free': sum(len(v) for v in self._free.values())
+            }
+
+    def print_stats(self):
+        """
+        输出分配统计
+        """
+        stats = self.get_stats()
+        total = stats['allocations'] + stats['reuses']
+        reuse_ratio = stats['reuses'] / total if total else 0.0
+        print(f"Frame pool: {stats['allocations']} allocations "
+              f"({stats['allocated_mb']:.1f} MB), {stats['reuses']} reuses "
+              f"({reuse_ratio:.1%}), {stats['in_use']} in use, {stats['free']} free")
+
+
+frame_pool = FramePool()
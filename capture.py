@@ -0,0 +1,200 @@
+"""
+视频采集模块
+在独立线程中读取摄像头，通过单槽"最新帧"缓冲区向检测线程提供画面
+"""
+
+import time
+import threading
+
+from tracer import tracer
+
+
+class CapturedFrame:
+    """
+    采集帧
+    携带图像、采集时间戳和序号
+    """
+
+    __slots__ = ('image', 'timestamp', 'seq')
+
+    def __init__(self, image, timestamp, seq):
+        """
+        初始化采集帧
+
+        Args:
+            image: 图像（BGR格式）
+            timestamp: 采集时间戳（time.time()）
+            seq: 采集序号（从1开始递增）
+        """
+        self.image = image
+        self.timestamp = timestamp
+        self.seq = seq
+
+
+class LatestFrameSlot:
+    """
+    单槽最新帧缓冲区
+    新帧直接覆盖未被取走的旧帧，保证消费者总是拿到最新画面
+    """
+
+    def __init__(self, pool=None):
+        """
+        初始化缓冲区
+        
+        Args:
+            pool: 帧缓冲池（可选），被覆盖的旧帧图像会归还到池中
+        """
+        self.pool = pool
+        self._cond = threading.Condition()
+        self._frame = None
+        self._closed = False
+
+        # 统计计数
+        self.published = 0
+        self.consumed = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        """
+        发布新帧（覆盖未被消费的旧帧）
+
+        Args:
+            frame: CapturedFrame实例
+        """
+        with self._cond:
+            stale = self._frame
+            if stale is not None:
+                self.dropped += 1
+            self._frame = frame
+            self.published += 1
+            self._cond.notify()
+        
+        if stale is not None and self.pool is not None:
+            self.pool.release(stale.image)
+
+    def get(self, timeout=None):
+        """
+        取走最新帧，没有新帧时阻塞等待
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            frame: CapturedFrame实例，超时或已关闭时返回None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame is not None or self._closed, timeout)
+            frame = self._frame
+            self._frame = None
+            if frame is not None:
+                self.consumed += 1
+            return frame
+
+    def close(self):
+        """
+        关闭缓冲区，唤醒所有等待的消费者
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class CaptureThread:
+    """
+    摄像头采集线程
+    循环调用VideoCapture.read，将结果发布到LatestFrameSlot
+    """
+
+    def __init__(self, cap, pool=None):
+        """
+        初始化采集线程
+
+        Args:
+            cap: 已打开的cv2.VideoCapture实例
+            pool: 帧缓冲池（可选），提供时直接读入池中的缓冲区，
+                  消费者处理完帧后需调用pool.release(frame.image)
+        """
+        self.cap = cap
+        self.pool = pool
+        self.frame_shape = None
+        self.slot = LatestFrameSlot(pool)
+        self.running = False
+        self.thread = None
+        self.seq = 0
+        self.read_failures = 0
+
+    def start(self):
+        """
+        启动采集线程
+        """
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='CaptureThread')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """
+        停止采集线程
+
+        Args:
+            timeout: 等待线程退出的最长时间（秒）
+        """
+        self.running = False
+        self.slot.close()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def read(self, timeout=None):
+        """
+        获取最新采集帧
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            frame: CapturedFrame实例，超时返回None
+        """
+        return self.slot.get(timeout)
+
+    def get_stats(self):
+        """
+        获取采集统计信息
+
+        Returns:
+            stats: 统计字典（采集帧数、消费帧数、丢弃帧数、读取失败次数）
+        """
+        return {
+            'captured': self.slot.published,
+            'consumed': self.slot.consumed,
+            'dropped': self.slot.dropped,
+            'read_failures': self.read_failures
+        }
+
+    def _run(self):
+        """
+        采集循环（内部方法）
+        """
+        while self.running:
+            buf = None
+            if self.pool is not None and self.frame_shape is not None:
+                buf = self.pool.acquire(self.frame_shape)
+            
+            with tracer.span('capture.read'):
+                success, img = self.cap.read(buf)
+            
+            # 读取失败或尺寸变化时，池中的缓冲区未被使用
+            if buf is not None and (not success or img is not buf):
+                self.pool.release(buf)
+            if not success:
+                self.read_failures += 1
+                print(f"Error: Cannot read camera frame after frame {self.seq}")
+                time.sleep(0.1)
+                continue
+
+            self.seq += 1
+            self.frame_shape = img.shape
+            self.slot.put(CapturedFrame(img, time.time(), self.seq))
@@ -2,22 +2,96 @@
 包含所有可调整的参数
 """
 
+import math
+
 # 摄像头设置
 CAMERA_WIDTH = 1280
 CAMERA_HEIGHT = 720
 CAMERA_INDEX = 0
 
+# 采集线程设置
+CAPTURE_BUFFER_SIZE = 1         # 驱动缓冲帧数（越小延迟越低）
+CAPTURE_READ_TIMEOUT = 1.0      # 等待新帧的超时时间（秒）
+
+# 推理分辨率（整帧检测时先缩放到该宽度，0表示使用摄像头原始分辨率）
+INFERENCE_WIDTH = 640
+
+# 帧缓冲池：每种形状/类型最多保留的空闲缓冲区数量
+FRAME_POOL_MAX_FREE_PER_KEY = 4
+
+# 多人脸设置（如同时检测驾驶员和副驾驶时设为2）
+MAX_NUM_FACES = 1               # 同时检测的最多人脸数
+FACE_TRACK_IOU_THRESHOLD = 0.3  # 匹配轨迹所需的最小包围框交并比
+FACE_TRACK_MAX_DISTANCE = 0.5   # 交并比不足时允许的最大中心距离（相对面部尺寸）
+FACE_TRACK_TIMEOUT = 2.0        # 轨迹超过该时间（秒）未出现则移除，检测状态一并丢弃
+
+# 面部ROI裁剪推理设置
+FACE_ROI_ENABLED = True         # 根据上一帧面部位置裁剪推理区域（仅单人脸）
+FACE_ROI_PADDING = 0.25         # 包围框四周扩展比例（相对面部尺寸）
+FACE_ROI_SIZE = 256             # 裁剪区域缩放后的推理尺寸（像素）
+FACE_ROI_MIN_SIZE = 48          # 裁剪区域最小边长，过小时回退整帧检测
+
+# 光流特征点跟踪设置（在完整FaceMesh推理之间传播关键特征点）
+LANDMARK_TRACKING_ENABLED = False   # 是否启用推理与光流交替的混合模式（光流帧沿用最近一次推理的面部网格）
+TRACKING_SCALE = 0.5            # 光流使用的灰度图缩放比例
+TRACKING_REGION_PADDING = 0.5   # 跟踪区域在关键点包围框四周扩展的比例
+TRACKING_WINDOW_SIZE = 15       # LK光流搜索窗口（像素，缩小后的图像）
+TRACKING_PYRAMID_LEVELS = 2     # LK光流金字塔层数
+TRACKING_MIN_INTERVAL = 2       # 两次推理之间最少的光流帧数（运动较大时）
+TRACKING_MAX_INTERVAL = 6       # 两次推理之间最多的光流帧数（画面静止时）
+TRACKING_MOTION_LOW = 1.0       # 低于该运动幅度（像素/帧）时逐步拉长推理间隔
+TRACKING_MOTION_HIGH = 4.0      # 高于该运动幅度（像素/帧）时恢复最短推理间隔
+TRACKING_MAX_ERROR = 1.0        # 正反光流往返误差上限（像素，缩小后的图像）
+TRACKING_EAR_MARGIN = 0.05      # EAR低于阈值加该余量时改用完整推理
+
+# 流水线追踪设置
+TRACE_CAPACITY = 65536          # 追踪环形缓冲区容量（区间数）
+TRACE_STATS_WINDOW = 1000       # 每个阶段统计分位数使用的最近样本数
+
+# 启动耗时目标（秒），--startup-profile 以此判断是否达标
+STARTUP_TARGET_SECONDS = 1.0
+
+# 离线回放设置
+REPLAY_DEFAULT_FPS = 30.0       # 图片序列或缺少帧率信息时使用的帧率
+REPLAY_OUTPUT = 'replay_metrics.csv'  # 逐帧指标输出文件
+
+# 多路检测监控设置
+SUPERVISOR_THREADS_PER_WORKER = 1   # 每个工作进程的线程数
+SUPERVISOR_MAX_RESTARTS = 5         # 单路流最多重启次数
+SUPERVISOR_RESTART_DELAY = 1.0      # 首次重启延迟（秒），之后按2倍退避
+SUPERVISOR_RESULT_BATCH = 32        # 每批发送的结果帧数
+SUPERVISOR_FLUSH_INTERVAL = 0.2     # 结果最长发送间隔（秒）
+
+# 多对象集中评分设置（subject_store.SubjectStore）
+SUBJECT_BLINK_RING_LEN = 64         # 每个对象保留的眨眼时间戳数量（统计窗口内眨眼数的上限）
+SUBJECT_YAWN_RING_LEN = 8           # 每个对象保留的打哈欠时间戳数量
+SUBJECT_STATS_BUCKETS = 60          # 统计窗口划分的时间桶数量（窗口60秒时每桶1秒）
+SUBJECT_MEMORY_TARGET = 4096        # 每个对象的内存目标（字节）
+
 # 眼睛纵横比阈值（越小越敏感）
 EAR_THRESHOLD = 0.15
 
-# 连续闭眼帧数阈值（约2秒）
-EYE_AR_CONSEC_FRAMES = 60
+# 持续闭眼判定为疲劳的时长阈值（秒），短于该时长的闭眼计为眨眼
+EYE_CLOSED_DURATION = 2.0
 
 # 嘴部张开阈值（越小越敏感）
 MOUTH_AR_THRESHOLD = 0.65
 
-# 连续打哈欠帧数阈值
-YAWN_CONSEC_FRAMES = 30
+# 嘴部持续张开判定为打哈欠的时长阈值（秒）
+YAWN_DURATION = 1.0
+
+# 相邻两次检测的最大时间间隔（秒），超过时（如人脸丢失）重新开始计时闭眼和打哈欠
+DETECTION_MAX_GAP = 1.0
+
+# 头部姿态：相对基准俯仰角低头超过该角度（度）视为低头
+HEAD_NOD_PITCH = 15.0
+
+# 低头持续时长（秒）：不短于HEAD_NOD_MIN_DURATION后抬头计为一次点头，达到HEAD_DOWN_DURATION判定为疲劳
+HEAD_NOD_MIN_DURATION = 0.3
+HEAD_DOWN_DURATION = 2.0
+
+# 基准俯仰角跟随当前姿态的时间常数（秒），适应不同的摄像头安装角度，低头期间不更新
+HEAD_POSE_BASELINE_TIME = 30.0
 
 # 警报冷却时间（秒）
 ALARM_COOLDOWN = 2.0
@@ -26,11 +100,68 @@ ALARM_COOLDOWN = 2.0
 BLINK_HISTORY_LEN = 100
 EAR_HISTORY_LEN = 30
 MAR_HISTORY_LEN = 30
+EVENT_HISTORY_LEN = 20  # Web界面保留的最近事件数量
+
+# Web视频流（MJPEG）：每个新画面只编码一次，所有观看者共享编码结果
+MJPEG_QUALITY = 85          # JPEG质量（0-100）
+MJPEG_WAIT_TIMEOUT = 1.0    # 编码线程和观看者等待新画面的超时（秒），超时后检查是否已停止
+
+# 滑动窗口统计（秒）：同时维护的窗口长度，以及眨眼频率和疲劳评分使用的窗口
+ROLLING_WINDOWS = (10.0, 60.0, 300.0)
+FATIGUE_STATS_WINDOW = 60.0
+ROLLING_MIN_OBSERVED = 5.0    # 观测时间不足该值（或窗口长度的一半）时频率类统计返回0，避免启动阶段的尖峰
+
+# 疲劳评分历史（环形缓冲区，随记录数加倍增长）：最多保留的评分数量（30 FPS下10分钟，可计算5分钟窗口的趋势），
+# 以及单调队列维护最小/最大值的帧数窗口；时间窗口使用ROLLING_WINDOWS
+SCORE_HISTORY_LEN = 18000
+SCORE_FRAME_WINDOWS = (10, 30)
+
+# 疲劳评分权重（各项得分0-1，加权和为综合得分）
+SCORE_WEIGHTS = {
+    'blink_rate': 0.40,   # 眨眼频率
+    'yawn_count': 0.30,   # 打哈欠次数
+    'eye_closed': 0.20,   # 闭眼时长 / PERCLOS
+    'head_pose': 0.10,    # 头部姿态（点头、低头）
+}
+
+# 疲劳评分分段表 {指标: (断点, 得分)}：指标小于第一个断点时得分为得分[0]，
+# 不小于第i个断点且小于第i+1个断点时为得分[i]，不小于最后一个断点时为得分[-1]
+SCORE_TABLES = {
+    'blink_rate': ((5.0, 10.0, 15.0, 20.0), (0.0, 0.2, 0.5, 0.7, 1.0)),     # 次/分钟
+    'yawn_count': ((1, 2, 4, 6), (0.0, 0.3, 0.6, 0.8, 1.0)),                # 次
+    # 秒，第一个断点为最小正浮点数：只有时长为0时得0分（也用于低头时长）
+    'eye_closed': ((math.ulp(0.0), 1.0, 2.0, 3.0), (0.0, 0.3, 0.6, 0.8, 1.0)),
+    'perclos': ((0.08, 0.15, 0.25, 0.4), (0.0, 0.3, 0.6, 0.8, 1.0)),        # 闭眼时间占比
+    'nod_rate': ((1.0, 2.0, 4.0, 6.0), (0.0, 0.3, 0.6, 0.8, 1.0)),          # 次/分钟
+}
+
+# 疲劳等级断点：综合得分依次小于各断点时为正常、轻度、中度，否则为重度
+LEVEL_BREAKPOINTS = (0.25, 0.5, 0.75)
+
+# 增量评分（默认关闭）：检测器状态版本未变化、没有进行中的闭眼/低头、统计窗口内没有事件移出时沿用上一次的评分，
+# 不写入评分历史（评分历史按重新计算次数而不是帧数记录）；PERCLOS和频率随观测时间的缓慢变化
+# 至少每SCORE_REFRESH_INTERVAL秒重新计算一次，期间评分是近似值
+SCORE_INCREMENTAL = False
+SCORE_REFRESH_INTERVAL = 1.0
 
 # 面部特征点索引
 LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
 RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
 MOUTH_INDICES = [13, 14, 61, 291]  # 上唇、下唇、左嘴角、右嘴角
+HEAD_POSE_INDICES = [1, 152, 33, 263, 61, 291]  # 鼻尖、下巴、左右外眼角、左右嘴角
+
+# 启用的信号检测插件（detector_plugins.PLUGINS中的名称），流水线只提取这些插件所需的特征点
+DETECTOR_PLUGINS = ('eyes', 'mouth', 'head_pose')
+PLUGIN_CHEAP_COST_US = 100.0    # 每帧耗时估计不超过该值（微秒）的插件每帧运行
+PLUGIN_EXPENSIVE_INTERVAL = 2   # 其余插件每隔该帧数运行一次
+
+# 内置插件用到的全部特征点（批量计算、紧凑存储和光流跟踪的默认索引）
+LANDMARK_SUBSET_INDICES = sorted(set(LEFT_EYE_INDICES + RIGHT_EYE_INDICES + MOUTH_INDICES + HEAD_POSE_INDICES))
+
+# 面部网格绘制设置
+MESH_COLOR = (192, 192, 192)    # 网格连线颜色
+MESH_RENDER_INTERVAL = 1        # 网格图层重绘间隔（帧），大于1时其余帧沿用上次的图层
+MESH_RENDER_SCALE = 1.0         # 网格图层分辨率比例，小于1时在缩小的图层上绘制后放大叠加
 
 # 颜色定义
 COLOR_NORMAL = (0, 255, 0)      # 绿色
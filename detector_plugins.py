@@ -0,0 +1,288 @@
+"""
+信号检测插件模块
+每个信号检测器（眼睛、嘴部、头部姿态等）作为插件声明所需的特征点索引和每帧耗时估计，
+流水线只提取所有插件所需特征点的并集，耗时较高的插件按较低的频率调度
+"""
+
+import config
+from head_pose import HeadPoseEstimator
+from tracer import tracer
+from utils import calculate_ear_batch, calculate_mar_batch
+
+
+# 插件名称 -> 插件类
+PLUGINS = {}
+
+# 左右眼特征点索引（EyePlugin一次取出两只眼睛的端点）
+_EYES = (config.LEFT_EYE_INDICES, config.RIGHT_EYE_INDICES)
+
+
+def register_plugin(cls):
+    """
+    注册插件类（类装饰器）
+
+    Args:
+        cls: DetectorPlugin子类，name属性作为注册名称
+
+    Returns:
+        cls: 原插件类
+    """
+    PLUGINS[cls.name] = cls
+    return cls
+
+
+def get_plugin_class(name):
+    """
+    按名称获取插件类
+
+    Args:
+        name: 插件名称
+
+    Returns:
+        cls: 插件类
+    """
+    if name not in PLUGINS:
+        raise ValueError(f"Unknown detector plugin: {name} (available: {', '.join(PLUGINS)})")
+    return PLUGINS[name]
+
+
+def required_indices(names=None):
+    """
+    获取一组插件所需特征点索引的并集
+
+    Args:
+        names: 插件名称列表（默认config.DETECTOR_PLUGINS）
+
+    Returns:
+        indices: 排序后的特征点索引列表
+    """
+    names = config.DETECTOR_PLUGINS if names is None else names
+    indices = set()
+    for name in names:
+        indices.update(get_plugin_class(name).indices)
+    return sorted(indices)
+
+
+class DetectorPlugin:
+    """
+    信号检测插件基类
+    子类声明name、indices、outputs、cost_us并实现process()，用register_plugin注册
+    """
+
+    name = None
+    indices = ()     # 需要的特征点索引
+    outputs = ()     # 产生的信号名称
+    cost_us = 0.0    # 每帧耗时估计（微秒），决定调度频率
+
+    def process(self, landmarks, img_shape, timestamp):
+        """
+        处理一帧
+
+        Args:
+            landmarks: 特征点像素坐标数组（至少包含indices对应的行）
+            img_shape: 图像形状 (h, w, c)，未知时为None
+            timestamp: 帧时间戳（秒）
+
+        Returns:
+            signals: {信号名称: 值}，键与outputs一致
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def process_batch(cls, batch, img_shape, timestamp, instances):
+        """
+        处理同一帧的多张人脸
+
+        默认逐个调用各实例的process()；无状态插件重写为对整个张量一次向量化计算
+
+        Args:
+            batch: (F, N, 2) 特征点像素坐标张量
+            img_shape: 图像形状 (h, w, c)，未知时为None
+            timestamp: 帧时间戳（秒）
+            instances: 与batch各行对应的插件实例列表（每张人脸一个）
+
+        Returns:
+            signals: 每张人脸的 {信号名称: 值} 列表
+        """
+        return [instance.process(landmarks, img_shape, timestamp)
+                for landmarks, instance in zip(batch, instances)]
+
+    def reset(self):
+        """
+        清除插件内部状态（无状态插件不需要重写）
+        """
+
+
+@register_plugin
+class EyePlugin(DetectorPlugin):
+    """
+    眼睛插件：双眼平均纵横比
+    """
+
+    name = 'eyes'
+    indices = tuple(config.LEFT_EYE_INDICES + config.RIGHT_EYE_INDICES)
+    outputs = ('ear',)
+    cost_us = 5.0
+
+    def process(self, landmarks, img_shape, timestamp):
+        # 单张人脸只有两个值，转为Python浮点数求平均比NumPy标量运算快
+        ear_left, ear_right = calculate_ear_batch(_EYES, landmarks).tolist()
+        return {'ear': (ear_left + ear_right) / 2.0}
+
+    @classmethod
+    def process_batch(cls, batch, img_shape, timestamp, instances):
+        ear = calculate_ear_batch(_EYES, batch)
+        return [{'ear': value} for value in ((ear[:, 0] + ear[:, 1]) / 2.0).tolist()]
+
+
+@register_plugin
+class MouthPlugin(DetectorPlugin):
+    """
+    嘴部插件：嘴部纵横比
+    """
+
+    name = 'mouth'
+    indices = tuple(config.MOUTH_INDICES)
+    outputs = ('mar',)
+    cost_us = 3.0
+
+    def process(self, landmarks, img_shape, timestamp):
+        return {'mar': calculate_mar_batch(config.MOUTH_INDICES, landmarks)}
+
+    @classmethod
+    def process_batch(cls, batch, img_shape, timestamp, instances):
+        return [{'mar': mar} for mar in calculate_mar_batch(config.MOUTH_INDICES, batch).tolist()]
+
+
+@register_plugin
+class HeadPosePlugin(DetectorPlugin):
+    """
+    头部姿态插件：(pitch, yaw, roll) 角度，画面尺寸未知或求解失败时为None
+    """
+
+    name = 'head_pose'
+    indices = tuple(config.HEAD_POSE_INDICES)
+    outputs = ('head_pose',)
+    cost_us = 60.0
+
+    def __init__(self):
+        self.estimator = HeadPoseEstimator()
+
+    def process(self, landmarks, img_shape, timestamp):
+        if img_shape is None:
+            return {'head_pose': None}
+        return {'head_pose': self.estimator.estimate(landmarks, img_shape, timestamp)}
+
+    def reset(self):
+        self.estimator.reset()
+
+
+class PluginSet:
+    """
+    插件集合类
+    每个检测器（每张人脸）一个实例，按声明的耗时调度各插件：
+    不超过config.PLUGIN_CHEAP_COST_US的插件每帧运行，其余每config.PLUGIN_EXPENSIVE_INTERVAL帧运行一次，
+    未运行的帧沿用上一次的输出
+    """
+
+    def __init__(self, names=None):
+        """
+        初始化插件集合
+
+        Args:
+            names: 插件名称列表（默认config.DETECTOR_PLUGINS）
+        """
+        names = config.DETECTOR_PLUGINS if names is None else names
+        self.plugins = [get_plugin_class(name)() for name in names]
+        self.indices = required_indices(names)
+        self.outputs = {output for plugin in self.plugins for output in plugin.outputs}
+        # (插件, 调度间隔帧数, tracer区间名称)
+        self._schedule = [
+            (plugin,
+             1 if plugin.cost_us <= config.PLUGIN_CHEAP_COST_US else config.PLUGIN_EXPENSIVE_INTERVAL,
+             f'plugin.{plugin.name}')
+            for plugin in self.plugins
+        ]
+        self.frame_count = 0
+        self.signals = {}
+
+    def get(self, name):
+        """
+        按名称获取插件实例
+
+        Args:
+            name: 插件名称
+
+        Returns:
+            plugin: 插件实例，不在集合中时为None
+        """
+        for plugin in self.plugins:
+            if plugin.name == name:
+                return plugin
+        return None
+
+    def process(self, landmarks, img_shape, timestamp):
+        """
+        运行本帧调度到的插件
+
+        Args:
+            landmarks: 特征点像素坐标数组
+            img_shape: 图像形状 (h, w, c)，未知时为None
+            timestamp: 帧时间戳（秒）
+
+        Returns:
+            signals: 所有插件的最新输出 {信号名称: 值}（同一个字典，下一帧会被更新）
+        """
+        frame = self.frame_count
+        self.frame_count += 1
+        signals = self.signals
+        for plugin, interval, span in self._schedule:
+            if frame % interval == 0:
+                with tracer.span(span):
+                    signals.update(plugin.process(landmarks, img_shape, timestamp))
+        return signals
+
+    @staticmethod
+    def process_batch(plugin_sets, batch, img_shape, timestamp):
+        """
+        对同一帧的多张人脸运行插件（每张人脸一个插件集合，插件名称需一致）
+
+        每种插件对本帧调度到它的所有人脸只调用一次process_batch()，EAR/MAR等对整个张量向量化计算
+
+        Args:
+            plugin_sets: 与batch各行对应的PluginSet列表
+            batch: (F, N, 2) 特征点像素坐标张量
+            img_shape: 图像形状 (h, w, c)，未知时为None
+            timestamp: 帧时间戳（秒）
+
+        Returns:
+            signals: 每张人脸的最新输出列表（即各集合的signals字典）
+        """
+        names = [plugin.name for plugin in plugin_sets[0].plugins]
+        if any([plugin.name for plugin in plugin_set.plugins] != names for plugin_set in plugin_sets[1:]):
+            # 插件组合不同时无法合并，逐张人脸处理
+            return [plugin_set.process(landmarks, img_shape, timestamp)
+                    for landmarks, plugin_set in zip(batch, plugin_sets)]
+
+        for j, (plugin, interval, span) in enumerate(plugin_sets[0]._schedule):
+            due = [i for i, plugin_set in enumerate(plugin_sets) if plugin_set.frame_count % interval == 0]
+            if not due:
+                continue
+            instances = [plugin_sets[i].plugins[j] for i in due]
+            rows = batch if len(due) == len(plugin_sets) else batch[due]
+            with tracer.span(span):
+                outputs = type(plugin).process_batch(rows, img_shape, timestamp, instances)
+            for i, output in zip(due, outputs):
+                plugin_sets[i].signals.update(output)
+        for plugin_set in plugin_sets:
+            plugin_set.frame_count += 1
+        return [plugin_set.signals for plugin_set in plugin_sets]
+
+    def reset(self):
+        """
+        重置所有插件和调度状态
+        """
+        for plugin in self.plugins:
+            plugin.reset()
+        self.frame_count = 0
+        self.signals = {}
@@ -0,0 +1,366 @@
+"""
+疲劳事件模块
+定义眨眼、打哈欠、长时间闭眼、点头、疲劳等级变化等轻量事件，
+提供按需逐帧产生事件的生成器和发布/订阅事件总线
+"""
+
+import json
+
+
+class FatigueEvent:
+    """
+    疲劳事件基类
+    """
+
+    __slots__ = ('timestamp', 'source')
+
+    kind = 'event'
+
+    def __init__(self, timestamp, source=None):
+        """
+        初始化事件
+
+        Args:
+            timestamp: 事件发生的帧时间戳（秒）
+            source: 事件来源（如人脸跟踪编号），单一对象时为None
+        """
+        self.timestamp = timestamp
+        self.source = source
+
+    def to_dict(self):
+        """
+        转换为字典（用于JSON输出）
+
+        Returns:
+            data: 包含事件类型、时间戳、来源及各字段的字典
+        """
+        data = {'kind': self.kind, 'timestamp': self.timestamp, 'source': self.source}
+        for cls in type(self).__mro__[:-2]:
+            for name in cls.__slots__:
+                if name not in data:
+                    data[name] = getattr(self, name)
+        return data
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.to_dict().items() if key != 'kind')
+        return f"{type(self).__name__}({fields})"
+
+
+class BlinkStart(FatigueEvent):
+    """
+    闭眼开始（可能结束为一次眨眼，也可能发展为长时间闭眼）
+    """
+
+    __slots__ = ()
+
+    kind = 'blink_start'
+
+
+class BlinkEnd(FatigueEvent):
+    """
+    眨眼结束（闭眼未达到长时间闭眼阈值即睁眼）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'blink_end'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 睁眼的帧时间戳（秒）
+            duration: 眨眼时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class ProlongedClosure(FatigueEvent):
+    """
+    长时间闭眼开始（闭眼时长达到config.EYE_CLOSED_DURATION）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'prolonged_closure'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 达到阈值的帧时间戳（秒）
+            duration: 此时的闭眼时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class ProlongedClosureEnd(FatigueEvent):
+    """
+    长时间闭眼结束（睁眼或检测中断）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'prolonged_closure_end'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 结束的帧时间戳（秒）
+            duration: 闭眼总时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class YawnStart(FatigueEvent):
+    """
+    打哈欠开始（张嘴时长达到config.YAWN_DURATION）
+    """
+
+    __slots__ = ()
+
+    kind = 'yawn_start'
+
+
+class YawnEnd(FatigueEvent):
+    """
+    打哈欠结束（闭嘴或检测中断）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'yawn_end'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 结束的帧时间戳（秒）
+            duration: 张嘴总时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class HeadNod(FatigueEvent):
+    """
+    点头（低头未达到长时间低头阈值即抬头）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'head_nod'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 抬头的帧时间戳（秒）
+            duration: 低头时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class HeadDown(FatigueEvent):
+    """
+    长时间低头开始（低头时长达到config.HEAD_DOWN_DURATION）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'head_down'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 达到阈值的帧时间戳（秒）
+            duration: 此时的低头时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class HeadDownEnd(FatigueEvent):
+    """
+    长时间低头结束（抬头或检测中断）
+    """
+
+    __slots__ = ('duration',)
+
+    kind = 'head_down_end'
+
+    def __init__(self, timestamp, duration, source=None):
+        """
+        Args:
+            timestamp: 结束的帧时间戳（秒）
+            duration: 低头总时长（秒）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.duration = duration
+
+
+class LevelChange(FatigueEvent):
+    """
+    疲劳等级变化
+    """
+
+    __slots__ = ('level', 'previous', 'score')
+
+    kind = 'level_change'
+
+    def __init__(self, timestamp, level, previous, score, source=None):
+        """
+        Args:
+            timestamp: 帧时间戳（秒）
+            level: 新的疲劳等级（FatigueLevel）
+            previous: 之前的疲劳等级（FatigueLevel）
+            score: 疲劳评分（0-100）
+            source: 事件来源
+        """
+        super().__init__(timestamp, source)
+        self.level = level
+        self.previous = previous
+        self.score = score
+
+    def to_dict(self):
+        """
+        转换为字典，疲劳等级输出为名称
+
+        Returns:
+            data: 事件字典
+        """
+        data = super().to_dict()
+        data['level'] = self.level.get_name()
+        data['previous'] = self.previous.get_name()
+        return data
+
+
+def iter_events(frames, fatigue_detector=None, fatigue_level_calculator=None, img_shape=None):
+    """
+    逐帧检测并产生事件的生成器
+
+    按需从frames读取下一帧，不缓存整段录像，可用于任意长度的特征点流
+
+    Args:
+        frames: 产生 (时间戳, 特征点数组) 的可迭代对象，未检测到人脸的帧特征点为None
+        fatigue_detector: FatigueDetector实例（默认新建）
+        fatigue_level_calculator: FatigueLevelCalculator实例（默认新建）
+        img_shape: 特征点所在画面的形状 (h, w, c)，给出时同时估计头部姿态并产生点头事件
+
+    Yields:
+        event: FatigueEvent子类实例
+    """
+    from fatigue_detector import FatigueDetector
+    from fatigue_level import FatigueLevelCalculator
+
+    detector = fatigue_detector if fatigue_detector is not None else FatigueDetector()
+    calculator = fatigue_level_calculator if fatigue_level_calculator is not None else FatigueLevelCalculator()
+    for timestamp, landmarks in frames:
+        if landmarks is None:
+            continue
+        detector.detect(landmarks, timestamp, img_shape)
+        yield from detector.events
+        calculator.calculate(detector)
+        yield from calculator.events
+
+
+class EventBus:
+    """
+    事件总线类
+    订阅者按事件类型注册回调，发布事件时同步调用
+    """
+
+    def __init__(self):
+        """
+        初始化事件总线
+        """
+        self._subscribers = []  # [(回调, 事件类型元组或None)]
+
+    def subscribe(self, callback, kinds=None):
+        """
+        订阅事件
+
+        Args:
+            callback: 回调函数，参数为事件
+            kinds: 关注的事件类（单个类或类的元组），None表示全部事件
+
+        Returns:
+            callback: 传入的回调（便于之后取消订阅）
+        """
+        if kinds is not None and not isinstance(kinds, tuple):
+            kinds = (kinds,)
+        self._subscribers.append((callback, kinds))
+        return callback
+
+    def unsubscribe(self, callback):
+        """
+        取消订阅
+
+        Args:
+            callback: subscribe()注册的回调
+        """
+        self._subscribers = [(cb, kinds) for cb, kinds in self._subscribers if cb is not callback]
+
+    def publish(self, event):
+        """
+        发布单个事件
+
+        Args:
+            event: FatigueEvent实例
+        """
+        for callback, kinds in self._subscribers:
+            if kinds is None or isinstance(event, kinds):
+                callback(event)
+
+    def publish_all(self, events):
+        """
+        依次发布多个事件
+
+        Args:
+            events: 事件序列
+        """
+        for event in events:
+            self.publish(event)
+
+
+class EventLogger:
+    """
+    事件日志类
+    作为事件总线的订阅者，把每个事件以一行JSON写入文件
+    """
+
+    def __init__(self, path):
+        """
+        初始化事件日志
+
+        Args:
+            path: 输出文件路径（JSON Lines格式）
+        """
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w')
+
+    def __call__(self, event):
+        """
+        写入一个事件
+
+        Args:
+            event: FatigueEvent实例
+        """
+        self._file.write(json.dumps(event.to_dict()) + '\n')
+        self.count += 1
+
+    def close(self):
+        """
+        关闭日志文件
+        """
+        if not self._file.closed:
+            self._file.close()
+            print(f"Events written: {self.count} to {self.path}")
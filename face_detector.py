@@ -4,9 +4,21 @@
 """
 
 import cv2
-import mediapipe as mp
 import numpy as np
 
+import config
+from tracer import tracer
+from buffer_pool import frame_pool
+from mesh_renderer import MeshRenderer
+
+
+# NormalizedLandmark只设置x、y、z时序列化后的固定布局（每个特征点17字节）：
+# 0x0a 长度0x0f | 0x0d x(float32) | 0x15 y(float32) | 0x1d z(float32)
+# 设置了visibility（0x25）、presence（0x2d）或缺少某个坐标时记录长度改变，不符合此布局，改为逐点读取
+_LANDMARK_RECORD_SIZE = 17
+_LANDMARK_FIELD_OFFSETS = (3, 8, 13)
+_LANDMARK_TAGS = ((0, 0x0a), (1, 0x0f), (2, 0x0d), (7, 0x15), (12, 0x1d))
+
 
 class FaceDetector:
     """
@@ -14,35 +26,207 @@ class FaceDetector:
     使用MediaPipe Face Mesh检测面部特征点
     """
     
-    def __init__(self):
+    def __init__(self, roi_mode=None, inference_width=None, max_num_faces=None):
         """
         初始化面部检测器
+        
+        Args:
+            roi_mode: 是否启用面部ROI裁剪推理（默认读取config.FACE_ROI_ENABLED，多人脸时不启用）
+            inference_width: 整帧推理宽度（像素，默认读取config.INFERENCE_WIDTH，0表示原始分辨率）
+            max_num_faces: 同时检测的最多人脸数（默认读取config.MAX_NUM_FACES）
         """
+        # MediaPipe导入耗时较长，推迟到构造检测器时（可在预热线程中进行）
+        import mediapipe as mp
+        
+        self.max_num_faces = config.MAX_NUM_FACES if max_num_faces is None else max_num_faces
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
+            max_num_faces=self.max_num_faces,
             refine_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.mesh_renderer = MeshRenderer(self.mp_face_mesh.FACEMESH_TESSELATION)
+        
+        # 推理分辨率（与显示分辨率解耦）
+        self.inference_width = config.INFERENCE_WIDTH if inference_width is None else inference_width
+        
+        # ROI裁剪推理（裁剪区域只覆盖一张人脸）
+        self.roi_mode = config.FACE_ROI_ENABLED if roi_mode is None else roi_mode
+        self.roi_mode = self.roi_mode and self.max_num_faces == 1
+        self.roi_face_mesh = None
+        if self.roi_mode:
+            # 裁剪图尺寸固定，使用独立的图实例，避免与整帧推理的内部跟踪状态互相干扰
+            self.roi_face_mesh = self.mp_face_mesh.FaceMesh(
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        self.roi = None  # 上一帧面部的像素包围框 (x0, y0, x1, y1)
+        # 最近一次process()结果的坐标变换 (x偏移, y偏移, x缩放, y缩放)，整帧检测时为None
+        self.roi_transform = None
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self._oval_indices = sorted({i for edge in self.mp_face_mesh.FACEMESH_FACE_OVAL for i in edge})
+        
+        # 特征点数组缓冲区（按列数复用）和序列化字节的取数索引
+        self._landmark_buffers = {}
+        self._landmark_decoders = {}
+        self.landmark_fallbacks = 0  # 序列化布局不符、改为逐点读取的次数
+    
+    def warmup(self, img_shape=None):
+        """
+        用空白画面执行一次推理，提前完成模型初始化
+        
+        Args:
+            img_shape: 预热画面形状 (h, w, c)，默认使用摄像头分辨率
+        """
+        if img_shape is None:
+            img_shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3)
+        dummy = np.zeros(img_shape, dtype=np.uint8)
+        img_rgb = self._prepare_inference_image(dummy)
+        self.face_mesh.process(img_rgb)
+        frame_pool.release(img_rgb)
+        if self.roi_face_mesh is not None:
+            size = config.FACE_ROI_SIZE
+            self.roi_face_mesh.process(np.zeros((size, size, 3), dtype=np.uint8))
     
     def process(self, img):
         """
         处理图像，检测面部特征点
         
+        ROI模式下优先在上一帧面部区域的裁剪图上推理，跟踪丢失时回退到整帧检测。
+        裁剪推理的特征点相对于裁剪区域，get_landmarks_array()和draw_face_mesh()
+        会按roi_transform自动映射回整帧坐标
+        
         Args:
             img: 输入图像（BGR格式）
         
         Returns:
             results: MediaPipe Face Mesh检测结果
         """
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(img_rgb)
+        if self.roi_mode and self.roi is not None:
+            results = self._process_roi(img)
+            if results.multi_face_landmarks:
+                # 特征点相对于裁剪区域，由roi_transform映射回整帧
+                self.roi_hits += 1
+                self._update_roi(results, img.shape)
+                return results
+            self.roi_misses += 1
+        
+        with tracer.span('face.preprocess'):
+            img_rgb = self._prepare_inference_image(img)
+        with tracer.span('face.facemesh'):
+            results = self.face_mesh.process(img_rgb)
+        # MediaPipe在process()内已复制输入，缓冲区可以立即归还
+        frame_pool.release(img_rgb)
+        self.roi_transform = None
+        
+        if self.roi_mode:
+            self._update_roi(results, img.shape)
+        return results
+    
+    def _prepare_inference_image(self, img):
+        """
+        将整帧缩放到推理分辨率并转换为RGB，结果写入缓冲池中的缓冲区（内部方法）
+        
+        特征点为归一化坐标，与推理分辨率无关，按显示图像尺寸换算即可对齐
+        
+        Args:
+            img: 输入图像（BGR格式，显示分辨率）
+        
+        Returns:
+            img_rgb: 推理分辨率的RGB图像，使用完毕后需调用frame_pool.release()
+        """
+        h, w = img.shape[:2]
+        small = None
+        if self.inference_width and w > self.inference_width:
+            size = (self.inference_width, int(round(h * self.inference_width / w)))
+            small = frame_pool.acquire((size[1], size[0], 3))
+            cv2.resize(img, size, dst=small, interpolation=cv2.INTER_LINEAR)
+            img = small
+        
+        img_rgb = frame_pool.acquire(img.shape)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img_rgb)
+        frame_pool.release(small)
+        return img_rgb
+    
+    def _process_roi(self, img):
+        """
+        在ROI裁剪图上推理（内部方法）
+        
+        Args:
+            img: 输入图像（BGR格式）
+        
+        Returns:
+            results: MediaPipe Face Mesh检测结果（特征点相对于裁剪区域归一化）
+        """
+        x0, y0, x1, y1 = self.roi
+        with tracer.span('face.roi_preprocess'):
+            size = config.FACE_ROI_SIZE
+            crop = frame_pool.acquire((size, size, 3))
+            crop_rgb = frame_pool.acquire((size, size, 3))
+            cv2.resize(img[y0:y1, x0:x1], (size, size), dst=crop, interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=crop_rgb)
+            frame_pool.release(crop)
+        with tracer.span('face.facemesh_roi'):
+            results = self.roi_face_mesh.process(crop_rgb)
+        frame_pool.release(crop_rgb)
+        
+        if results.multi_face_landmarks:
+            h, w = img.shape[:2]
+            self.roi_transform = (x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h)
         return results
     
-    def draw_face_mesh(self, img, face_landmarks, draw=True):
+    def _update_roi(self, results, img_shape):
+        """
+        根据当前帧特征点计算下一帧的ROI（内部方法）
+        
+        Args:
+            results: 检测结果（坐标按roi_transform解释）
+            img_shape: 图像形状 (h, w, c)
+        """
+        if not results.multi_face_landmarks:
+            self.roi = None
+            return
+        
+        h, w = img_shape[:2]
+        ox, oy, sx, sy = self.roi_transform or (0.0, 0.0, 1.0, 1.0)
+        xs = []
+        ys = []
+        for face_landmarks in results.multi_face_landmarks:
+            points = face_landmarks.landmark
+            for i in self._oval_indices:
+                xs.append(points[i].x)
+                ys.append(points[i].y)
+        
+        # 以面部外轮廓包围框为中心，扩展为带边距的正方形
+        x_min = (ox + min(xs) * sx) * w
+        x_max = (ox + max(xs) * sx) * w
+        y_min = (oy + min(ys) * sy) * h
+        y_max = (oy + max(ys) * sy) * h
+        cx = (x_min + x_max) * 0.5
+        cy = (y_min + y_max) * 0.5
+        side = max(x_max - x_min, y_max - y_min)
+        side = min(int(side * (1.0 + 2.0 * config.FACE_ROI_PADDING)), w, h)
+        
+        # 靠近画面边缘时把正方形平移回画面内（而不是裁掉超出的部分），
+        # 裁剪区域始终为正方形，缩放到FACE_ROI_SIZE时面部不会变形
+        x0 = min(max(int(cx - side * 0.5), 0), w - side)
+        y0 = min(max(int(cy - side * 0.5), 0), h - side)
+        if side < config.FACE_ROI_MIN_SIZE:
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x0 + side, y0 + side)
+    
+    def reset_roi(self):
+        """
+        清除ROI跟踪状态，下一帧执行整帧检测
+        """
+        self.roi = None
+    
+    def draw_face_mesh(self, img, face_landmarks, draw=True, key=0):
         """
         绘制面部特征点网格
         
@@ -50,29 +234,101 @@ class FaceDetector:
             img: 输入图像
             face_landmarks: 面部特征点
             draw: 是否绘制（默认True）
+            key: 网格图层缓存键，多人脸时每张人脸使用不同的键
         """
-        if draw:
-            self.mp_draw.draw_landmarks(
-                image=img,
-                landmark_list=face_landmarks,
-                connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_tesselation_style()
-            )
+        if not draw:
+            return
+        with tracer.span('face.draw_mesh'):
+            # 整组转换已映射回整帧坐标，ROI裁剪推理的结果无需额外处理
+            landmarks = self.get_landmarks_array(face_landmarks, img.shape)
+            self.mesh_renderer.draw(img, landmarks, key)
     
-    def get_landmarks_array(self, face_landmarks, img_shape):
+    def get_landmarks_array(self, face_landmarks, img_shape, indices=None, with_z=False, out=None):
         """
         将MediaPipe特征点转换为numpy数组
         
+        结果写入复用的float32缓冲区，下一次调用会覆盖其内容；
+        需要跨帧保留时请复制，或通过out传入自己的缓冲区
+        
         Args:
             face_landmarks: MediaPipe面部特征点
             img_shape: 图像形状 (h, w, c)
+            indices: 只转换指定索引的特征点（子集模式，如config.LANDMARK_SUBSET_INDICES），
+                     None表示全部。子集模式下数组仍按完整索引排列，其余行的内容未定义
+            with_z: 是否包含z坐标（按画面宽度缩放，与x同一尺度）
+            out: 输出缓冲区（可选），float32，形状 (N, 2) 或 (N, 3)
         
         Returns:
-            landmarks: 特征点坐标数组 [[x1, y1], [x2, y2], ...]
+            landmarks: 特征点坐标数组 [[x1, y1], [x2, y2], ...]（with_z时为 [[x1, y1, z1], ...]）
         """
-        h, w, c = img_shape
-        landmarks = []
-        for lm in face_landmarks.landmark:
-            landmarks.append([lm.x * w, lm.y * h])
-        return np.array(landmarks)
+        with tracer.span('face.landmarks'):
+            h, w = img_shape[:2]
+            points = face_landmarks.landmark
+            num = len(points)
+            cols = 3 if with_z else 2
+            if out is None:
+                out = self._landmark_buffers.get(cols)
+                if out is None or len(out) != num:
+                    out = np.empty((num, cols), dtype=np.float32)
+                    self._landmark_buffers[cols] = out
+            
+            # 像素坐标 = 偏移 + 归一化坐标 * 缩放（ROI裁剪推理的结果同时映射回整帧坐标）
+            ox, oy, sx, sy = self.roi_transform or (0.0, 0.0, 1.0, 1.0)
+            scale = (sx * w, sy * h, sx * w)[:cols]
+            offset = (ox * w, oy * h, 0.0)[:cols]
+            
+            if indices is None:
+                coords = self._decode_landmarks(face_landmarks, num, cols)
+                if coords is None:
+                    # 布局与预期不符时逐点读取
+                    self.landmark_fallbacks += 1
+                    coords = np.array([(lm.x, lm.y, lm.z)[:cols] for lm in points], dtype=np.float32)
+                np.multiply(coords, np.array(scale, dtype=np.float32), out=out)
+                np.add(out, np.array(offset, dtype=np.float32), out=out)
+            else:
+                for i in indices:
+                    lm = points[i]
+                    out[i, 0] = offset[0] + lm.x * scale[0]
+                    out[i, 1] = offset[1] + lm.y * scale[1]
+                    if with_z:
+                        out[i, 2] = lm.z * scale[2]
+        return out
+    
+    def _decode_landmarks(self, face_landmarks, num, cols):
+        """
+        从序列化字节中直接读取特征点坐标（内部方法）
+        
+        逐个访问protobuf字段的开销远大于一次序列化，因此整组读取时按固定布局解析字节，
+        坐标字节按预先计算的索引收集到复用的缓冲区中。
+        
+        解析前校验布局：总长度必须为 num * 17，且每条记录的第0、1字节为 0x0a 0x0f（长度15的特征点），
+        第2、7、12字节依次为x、y、z的float32标签。记录头固定了每条记录的边界，三个标签又把15字节的内容
+        完全分成x、y、z三个字段，因此通过校验即说明布局一致；设置了visibility/presence或缺少坐标时
+        总长度或某个标签必然不符（坐标字节恰好等于标签值也不影响，标签只在固定位置检查），返回None。
+        python -m benchmarks.landmarks 会用这些布局检查解析路径和坐标
+        
+        Args:
+            face_landmarks: MediaPipe面部特征点
+            num: 特征点数量
+            cols: 读取的坐标数（2为x、y，3为x、y、z）
+        
+        Returns:
+            coords: (num, cols) 归一化坐标数组（float32），布局与预期不符时返回None
+        """
+        data = face_landmarks.SerializeToString()
+        if len(data) != num * _LANDMARK_RECORD_SIZE:
+            return None
+        for offset, tag in _LANDMARK_TAGS:
+            if data[offset::_LANDMARK_RECORD_SIZE].count(tag) != num:
+                return None
+        
+        decoder = self._landmark_decoders.get((num, cols))
+        if decoder is None:
+            fields = np.array(_LANDMARK_FIELD_OFFSETS[:cols])
+            byte_offsets = (fields[:, None] + np.arange(4)).ravel()
+            index = (np.arange(num)[:, None] * _LANDMARK_RECORD_SIZE + byte_offsets).ravel()
+            decoder = (index, np.empty(index.size, dtype=np.uint8))
+            self._landmark_decoders[(num, cols)] = decoder
+        index, raw = decoder
+        np.take(np.frombuffer(data, dtype=np.uint8), index, out=raw, mode='clip')
+        return raw.view('<f4').reshape(num, cols)
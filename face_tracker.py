@@ -0,0 +1,156 @@
+"""
+人脸跟踪模块
+按包围框重叠度和中心距离为每张人脸分配稳定的跟踪编号，每条轨迹拥有独立的疲劳检测状态
+"""
+
+import numpy as np
+
+import config
+from fatigue_detector import FatigueDetector
+from fatigue_level import FatigueLevelCalculator
+from metrics import FrameMetrics
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    计算两组包围框两两之间的交并比
+
+    Args:
+        boxes_a: (A, 4) 包围框 (x0, y0, x1, y1)
+        boxes_b: (B, 4) 包围框 (x0, y0, x1, y1)
+
+    Returns:
+        iou: (A, B) 交并比矩阵
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class FaceTrack:
+    """
+    人脸轨迹类
+    保存一张人脸的跟踪编号、最近位置以及独立的疲劳检测器和疲劳等级计算器
+    """
+
+    def __init__(self, track_id, box, timestamp):
+        """
+        初始化人脸轨迹
+
+        Args:
+            track_id: 跟踪编号
+            box: 包围框 (x0, y0, x1, y1)
+            timestamp: 首次出现的时间戳（秒）
+        """
+        self.track_id = track_id
+        self.box = box
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.fatigue_detector = FatigueDetector(source=track_id)
+        self.fatigue_level_calculator = FatigueLevelCalculator()
+        self.fatigue_level = None
+        self.fatigue_score = 0
+        self.metrics = FrameMetrics()  # 最近一帧的指标快照
+
+
+class FaceTracker:
+    """
+    人脸跟踪器类
+    每帧将检测到的人脸与已有轨迹贪心匹配，超时未出现的轨迹连同其检测状态一起移除
+    """
+
+    def __init__(self, iou_threshold=None, max_distance=None, timeout=None):
+        """
+        初始化人脸跟踪器
+
+        Args:
+            iou_threshold: 匹配所需的最小交并比（默认config.FACE_TRACK_IOU_THRESHOLD）
+            max_distance: 交并比不足时允许的最大中心距离，相对于面部尺寸（默认config.FACE_TRACK_MAX_DISTANCE）
+            timeout: 轨迹未匹配的最长保留时间（秒，默认config.FACE_TRACK_TIMEOUT）
+        """
+        self.iou_threshold = config.FACE_TRACK_IOU_THRESHOLD if iou_threshold is None else iou_threshold
+        self.max_distance = config.FACE_TRACK_MAX_DISTANCE if max_distance is None else max_distance
+        self.timeout = config.FACE_TRACK_TIMEOUT if timeout is None else timeout
+        self.tracks = {}
+        self.next_id = 1
+        self.evicted = []  # 最近一次update()移除的跟踪编号
+
+    def update(self, boxes, timestamp):
+        """
+        用当前帧的人脸包围框更新轨迹
+
+        Args:
+            boxes: (F, 4) 当前帧的人脸包围框 (x0, y0, x1, y1)
+            timestamp: 帧时间戳（秒）
+
+        Returns:
+            tracks: 与boxes一一对应的FaceTrack列表
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        active = list(self.tracks.values())
+        assigned = [None] * len(boxes)
+
+        if active and len(boxes):
+            previous = np.array([track.box for track in active])
+            scores = self._match_scores(boxes, previous)
+            # 按得分从高到低贪心匹配，人脸数很少，无需匈牙利算法
+            used = set()
+            for flat in np.argsort(scores, axis=None)[::-1]:
+                i, j = divmod(int(flat), len(active))
+                if scores[i, j] <= 0:
+                    break
+                if assigned[i] is not None or j in used:
+                    continue
+                assigned[i] = active[j]
+                used.add(j)
+
+        for i, box in enumerate(boxes):
+            track = assigned[i]
+            if track is None:
+                track = FaceTrack(self.next_id, box, timestamp)
+                self.tracks[track.track_id] = track
+                self.next_id += 1
+                assigned[i] = track
+            track.box = box
+            track.last_seen = timestamp
+
+        # 移除超时的轨迹
+        self.evicted = [tid for tid, track in self.tracks.items()
+                        if timestamp - track.last_seen > self.timeout]
+        for track_id in self.evicted:
+            del self.tracks[track_id]
+        return assigned
+
+    def reset(self):
+        """
+        清除所有轨迹
+        """
+        self.tracks.clear()
+
+    def _match_scores(self, boxes, previous):
+        """
+        计算当前人脸与已有轨迹的匹配得分（内部方法）
+
+        交并比达到阈值时得分为交并比；否则中心距离足够近时给出低于阈值的得分；其余为0
+
+        Args:
+            boxes: (F, 4) 当前帧包围框
+            previous: (T, 4) 已有轨迹的包围框
+
+        Returns:
+            scores: (F, T) 匹配得分
+        """
+        iou = box_iou(boxes, previous)
+        centers = (boxes[:, None, :2] + boxes[:, None, 2:]) * 0.5
+        previous_centers = (previous[None, :, :2] + previous[None, :, 2:]) * 0.5
+        sizes = np.maximum(previous[None, :, 2] - previous[None, :, 0],
+                           previous[None, :, 3] - previous[None, :, 1])
+        distance = np.linalg.norm(centers - previous_centers, axis=-1) / np.maximum(sizes, 1e-9)
+        fallback = self.iou_threshold * np.clip(1.0 - distance / self.max_distance, 0.0, None)
+        return np.where(iou >= self.iou_threshold, iou, fallback)
@@ -1,6 +1,6 @@
 """
 疲劳检测模块
-包含眨眼、打哈欠检测逻辑
+包含眨眼、打哈欠、点头检测逻辑
 """
 
 import time
@@ -8,107 +8,290 @@ import numpy as np
 from collections import deque
 
 import config
-from utils import calculate_ear, calculate_mar, get_eye_landmarks, get_mouth_landmarks
+from events import (BlinkStart, BlinkEnd, ProlongedClosure, ProlongedClosureEnd, YawnStart, YawnEnd,
+                    HeadNod, HeadDown, HeadDownEnd)
+from detector_plugins import PluginSet
+from rolling_stats import RollingStats
 
 
 class FatigueDetector:
     """
     疲劳检测器类
-    检测眨眼、打哈欠等疲劳指标
+    检测眨眼、打哈欠、点头等疲劳指标
     """
     
-    def __init__(self):
+    def __init__(self, source=None, plugins=None):
         """
         初始化疲劳检测器
+        
+        Args:
+            source: 事件来源标识（如人脸跟踪编号），写入产生的事件
+            plugins: 信号检测插件名称列表（默认config.DETECTOR_PLUGINS），必须包含产生ear、mar的插件
         """
+        self.source = source
+        
+        # 信号检测插件（每个检测器独立实例，头部姿态等插件带有逐帧状态）
+        self.plugins = PluginSet(plugins)
+        if not {'ear', 'mar'} <= self.plugins.outputs:
+            raise ValueError("Detector plugins must provide 'ear' and 'mar' signals")
+        
         # 疲劳检测状态
         self.blink_counter = 0
         self.total_blinks = 0
-        self.eye_closed_frames = 0
         self.yawn_counter = 0
-        self.yawn_frames = 0
+        self.nod_counter = 0
+        
+        # 闭眼和张嘴的起始时间戳及已持续时长（秒），阈值均按帧时间戳计时，与帧率无关
+        self.eye_closed_start = None
+        self.eye_closed_duration = 0.0
+        self.yawn_start = None
+        self.yawn_duration = 0.0
+        self.head_down_start = None
+        self.head_down_duration = 0.0
+        self.last_timestamp = None
+        self.frame_interval = 0.0
         
         # 历史记录
         self.blink_history = deque(maxlen=config.BLINK_HISTORY_LEN)
         self.ear_history = deque(maxlen=config.EAR_HISTORY_LEN)
         self.mar_history = deque(maxlen=config.MAR_HISTORY_LEN)
         
+        # 滑动窗口统计（PERCLOS、眨眼频率、眨眼时长、打哈欠频率）
+        self.rolling_stats = RollingStats()
+        
+        # 俯仰角相对基准俯仰角判断低头（适应不同的摄像头安装角度）
+        self.pitch_baseline = None
+        
         # 状态标志
         self.is_fatigued = False
         self.is_yawning = False
+        self.is_head_down = False
         
         # 当前指标
         self.current_ear = 0.0
         self.current_mar = 0.0
+        self.current_pose = None  # (pitch, yaw, roll)，没有头部姿态时为None
+        
+        # 最近一次update()产生的事件，下一次update()时清空
+        self.events = []
+        
+        # 状态版本：评分输入发生离散变化（闭眼/低头开始或结束、眨眼、打哈欠、点头计数）时加1，
+        # 供FatigueLevelCalculator判断能否沿用上一次的评分
+        self.version = 0
     
-    def detect(self, landmarks):
+    def detect(self, landmarks, timestamp=None, img_shape=None):
         """
         检测疲劳状态
         
         Args:
             landmarks: 面部特征点坐标数组
+            timestamp: 帧时间戳（秒），默认使用当前时间
+            img_shape: 图像形状 (h, w, c)，给出时同时估计头部姿态
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        
+        # 运行本帧调度到的信号检测插件
+        signals = self.plugins.process(landmarks, img_shape, timestamp)
+        
+        self.update(signals['ear'], signals['mar'], timestamp, signals.get('head_pose'))
+    
+    def update(self, ear, mar, timestamp=None, head_pose=None):
         """
-        # 获取眼睛和嘴部特征点
-        left_eye_landmarks, right_eye_landmarks = get_eye_landmarks(landmarks)
-        mouth_landmarks = get_mouth_landmarks(landmarks)
+        用已计算的EAR/MAR更新疲劳状态（批量计算多张人脸时使用）
         
-        # 计算眼睛纵横比
-        left_ear = calculate_ear(config.LEFT_EYE_INDICES, landmarks)
-        right_ear = calculate_ear(config.RIGHT_EYE_INDICES, landmarks)
-        self.current_ear = (left_ear + right_ear) / 2.0
+        Args:
+            ear: 双眼平均纵横比
+            mar: 嘴部纵横比
+            timestamp: 帧时间戳（秒），默认使用当前时间
+            head_pose: (pitch, yaw, roll) 头部姿态角度（度，可选），
+                       由头部姿态插件得到，None时不检测点头
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.events.clear()
         
-        # 计算嘴部纵横比
-        self.current_mar = calculate_mar(config.MOUTH_INDICES, landmarks)
+        self.current_ear = float(ear)
+        self.current_mar = float(mar)
+        self.current_pose = head_pose
         
         # 更新历史记录
         self.ear_history.append(self.current_ear)
         self.mar_history.append(self.current_mar)
         
+        # 每次检测代表到下一次检测为止的一段时间，以相邻帧间隔近似；
+        # 间隔过长（如人脸丢失）时无法判断期间的状态，放弃进行中的闭眼和张嘴计时
+        self.frame_interval = 0.0
+        if self.last_timestamp is not None:
+            if timestamp - self.last_timestamp > config.DETECTION_MAX_GAP:
+                self._end_eye_closure(self.last_timestamp)
+                self._end_yawn(self.last_timestamp)
+                self._end_head_down(self.last_timestamp)
+            else:
+                self.frame_interval = max(timestamp - self.last_timestamp, 0.0)
+        self.last_timestamp = timestamp
+        
         # 眨眼检测
-        self._detect_blink()
+        self._detect_blink(timestamp)
         
         # 打哈欠检测
-        self._detect_yawn()
+        self._detect_yawn(timestamp)
+        
+        # 点头检测
+        self._detect_head_pose(timestamp)
+        
+        self.rolling_stats.add_frame(timestamp, self.frame_interval,
+                                     self.current_ear < config.EAR_THRESHOLD)
     
-    def _detect_blink(self):
+    def _detect_blink(self, timestamp):
         """
         检测眨眼
+        
+        闭眼持续时长从第一帧闭眼的时间戳算到当前帧结束，达到EYE_CLOSED_DURATION判定为疲劳，
+        未达到就睁眼则计为一次眨眼
+        
+        Args:
+            timestamp: 帧时间戳（秒）
         """
         if self.current_ear < config.EAR_THRESHOLD:
-            self.eye_closed_frames += 1
-            self.is_fatigued = self.eye_closed_frames >= config.EYE_AR_CONSEC_FRAMES
+            if self.eye_closed_start is None:
+                self.eye_closed_start = timestamp
+                self.version += 1
+                self.events.append(BlinkStart(timestamp, self.source))
+            self.eye_closed_duration = timestamp - self.eye_closed_start + self.frame_interval
+            is_fatigued = self.eye_closed_duration >= config.EYE_CLOSED_DURATION
+            if is_fatigued and not self.is_fatigued:
+                self.events.append(ProlongedClosure(timestamp, self.eye_closed_duration, self.source))
+            self.is_fatigued = is_fatigued
         else:
-            if self.eye_closed_frames > 0 and self.eye_closed_frames < config.EYE_AR_CONSEC_FRAMES:
+            if self.eye_closed_start is not None and self.eye_closed_duration < config.EYE_CLOSED_DURATION:
                 self.total_blinks += 1
-                self.blink_history.append(time.time())
-            self.eye_closed_frames = 0
-            self.is_fatigued = False
+                self.blink_history.append(timestamp)
+                self.rolling_stats.add_blink(timestamp, self.eye_closed_duration)
+                self.events.append(BlinkEnd(timestamp, self.eye_closed_duration, self.source))
+            self._end_eye_closure(timestamp)
     
-    def _detect_yawn(self):
+    def _detect_yawn(self, timestamp):
         """
         检测打哈欠
+        
+        Args:
+            timestamp: 帧时间戳（秒）
         """
         if self.current_mar > config.MOUTH_AR_THRESHOLD:
-            self.yawn_frames += 1
-            self.is_yawning = self.yawn_frames >= config.YAWN_CONSEC_FRAMES
+            if self.yawn_start is None:
+                self.yawn_start = timestamp
+            self.yawn_duration = timestamp - self.yawn_start + self.frame_interval
+            is_yawning = self.yawn_duration >= config.YAWN_DURATION
+            if is_yawning and not self.is_yawning:
+                self.events.append(YawnStart(timestamp, self.source))
+            self.is_yawning = is_yawning
         else:
-            if self.yawn_frames > 0 and self.yawn_frames >= config.YAWN_CONSEC_FRAMES:
+            if self.yawn_start is not None and self.yawn_duration >= config.YAWN_DURATION:
                 self.yawn_counter += 1
-            self.yawn_frames = 0
-            self.is_yawning = False
+                self.version += 1
+                self.rolling_stats.add_yawn(timestamp)
+            self._end_yawn(timestamp)
+    
+    def _detect_head_pose(self, timestamp):
+        """
+        检测点头和长时间低头
+        
+        俯仰角比基准俯仰角大HEAD_NOD_PITCH以上视为低头，低头不短于HEAD_NOD_MIN_DURATION
+        且未达到HEAD_DOWN_DURATION即抬头计为一次点头，达到HEAD_DOWN_DURATION判定为疲劳
+        
+        Args:
+            timestamp: 帧时间戳（秒）
+        """
+        if self.current_pose is None:
+            # 没有头部姿态（未提供画面尺寸或求解失败）时无法判断，放弃进行中的低头计时
+            self._end_head_down(timestamp)
+            return
+        
+        pitch = self.current_pose[0]
+        if self.pitch_baseline is None:
+            self.pitch_baseline = pitch
+        
+        if pitch - self.pitch_baseline > config.HEAD_NOD_PITCH:
+            if self.head_down_start is None:
+                self.head_down_start = timestamp
+                self.version += 1
+            self.head_down_duration = timestamp - self.head_down_start + self.frame_interval
+            is_head_down = self.head_down_duration >= config.HEAD_DOWN_DURATION
+            if is_head_down and not self.is_head_down:
+                self.events.append(HeadDown(timestamp, self.head_down_duration, self.source))
+            self.is_head_down = is_head_down
+        else:
+            if (self.head_down_start is not None and
+                    config.HEAD_NOD_MIN_DURATION <= self.head_down_duration < config.HEAD_DOWN_DURATION):
+                self.nod_counter += 1
+                self.rolling_stats.add_nod(timestamp)
+                self.events.append(HeadNod(timestamp, self.head_down_duration, self.source))
+            self._end_head_down(timestamp)
+            # 抬头时基准俯仰角缓慢跟随当前姿态
+            alpha = min(self.frame_interval / config.HEAD_POSE_BASELINE_TIME, 1.0)
+            self.pitch_baseline += (pitch - self.pitch_baseline) * alpha
+    
+    def _end_eye_closure(self, timestamp=None):
+        """
+        结束闭眼计时（内部方法）
+        
+        Args:
+            timestamp: 结束的帧时间戳（秒），长时间闭眼结束时写入事件
+        """
+        if self.is_fatigued:
+            self.events.append(ProlongedClosureEnd(timestamp, self.eye_closed_duration, self.source))
+        if self.eye_closed_start is not None:
+            self.version += 1
+        self.eye_closed_start = None
+        self.eye_closed_duration = 0.0
+        self.is_fatigued = False
+    
+    def _end_yawn(self, timestamp=None):
+        """
+        结束张嘴计时（内部方法）
+        
+        Args:
+            timestamp: 结束的帧时间戳（秒），打哈欠结束时写入事件
+        """
+        if self.is_yawning:
+            self.events.append(YawnEnd(timestamp, self.yawn_duration, self.source))
+        self.yawn_start = None
+        self.yawn_duration = 0.0
+        self.is_yawning = False
+    
+    def _end_head_down(self, timestamp=None):
+        """
+        结束低头计时（内部方法）
+        
+        Args:
+            timestamp: 结束的帧时间戳（秒），长时间低头结束时写入事件
+        """
+        if self.is_head_down:
+            self.events.append(HeadDownEnd(timestamp, self.head_down_duration, self.source))
+        if self.head_down_start is not None:
+            self.version += 1
+        self.head_down_start = None
+        self.head_down_duration = 0.0
+        self.is_head_down = False
     
     def get_blink_rate(self):
         """
-        获取眨眼频率（每分钟）
+        获取眨眼频率（每分钟），统计窗口为config.FATIGUE_STATS_WINDOW
         
         Returns:
             blink_rate: 眨眼频率（次/分钟）
         """
-        if len(self.blink_history) > 1:
-            time_span = self.blink_history[-1] - self.blink_history[0]
-            if time_span > 0:
-                return len(self.blink_history) / time_span * 60
-        return 0.0
+        return self.rolling_stats.window().blink_rate()
+    
+    def get_perclos(self):
+        """
+        获取PERCLOS（统计窗口内闭眼时间占比）
+        
+        Returns:
+            perclos: 0-1之间的比例
+        """
+        return self.rolling_stats.window().perclos()
     
     def get_eye_closed_duration(self):
         """
@@ -117,9 +300,16 @@ class FatigueDetector:
         Returns:
             duration: 闭眼时长（秒）
         """
-        if self.eye_closed_frames > 0:
-            return self.eye_closed_frames / 30.0
-        return 0.0
+        return self.eye_closed_duration
+    
+    def get_head_down_duration(self):
+        """
+        获取低头时长（秒）
+        
+        Returns:
+            duration: 低头时长（秒）
+        """
+        return self.head_down_duration
     
     def reset(self):
         """
@@ -127,11 +317,19 @@ class FatigueDetector:
         """
         self.blink_counter = 0
         self.total_blinks = 0
-        self.eye_closed_frames = 0
         self.yawn_counter = 0
-        self.yawn_frames = 0
+        self.nod_counter = 0
+        self._end_eye_closure()
+        self._end_yawn()
+        self._end_head_down()
+        self.plugins.reset()
+        self.pitch_baseline = None
+        self.current_pose = None
+        self.last_timestamp = None
+        self.frame_interval = 0.0
+        self.events.clear()
+        self.version += 1
+        self.rolling_stats.reset()
         self.blink_history.clear()
         self.ear_history.clear()
         self.mar_history.clear()
-        self.is_fatigued = False
-        self.is_yawning = False
@@ -3,10 +3,13 @@
 综合多个指标计算疲劳等级
 """
 
+from bisect import bisect_right
 from enum import Enum
 import numpy as np
 
 import config
+from events import LevelChange
+from rolling_window import RollingWindow
 
 
 class FatigueLevel(Enum):
@@ -64,79 +67,273 @@ class FatigueLevel(Enum):
         return progress_map[self]
 
 
+# 按整数值排列的疲劳等级（分段查找得到的下标即等级）
+_LEVELS = tuple(FatigueLevel)
+
+
 class FatigueLevelCalculator:
     """
     疲劳等级计算器类
     综合多个指标计算疲劳等级
     """
     
-    def __init__(self):
+    def __init__(self, weights=None, tables=None, incremental=None):
         """
         初始化疲劳等级计算器
+        
+        Args:
+            weights: 评分权重，覆盖config.SCORE_WEIGHTS中的对应项
+            tables: 评分分段表 {指标: (断点, 得分)}，覆盖config.SCORE_TABLES中的对应项
+            incremental: 是否增量评分（默认config.SCORE_INCREMENTAL）
         """
         # 权重配置
-        self.blink_rate_weight = 0.45      # 眨眼频率权重
-        self.yawn_count_weight = 0.35       # 打哈欠次数权重
-        self.eye_closed_weight = 0.20       # 闭眼时长权重
+        weights = {**config.SCORE_WEIGHTS, **(weights or {})}
+        self.blink_rate_weight = weights['blink_rate']    # 眨眼频率权重
+        self.yawn_count_weight = weights['yawn_count']    # 打哈欠次数权重
+        self.eye_closed_weight = weights['eye_closed']    # 闭眼时长权重
+        self.head_pose_weight = weights['head_pose']      # 头部姿态（点头、低头）权重
         
         # 阈值配置
         self.blink_rate_threshold = 15.0    # 眨眼频率阈值（次/分钟）
         self.yawn_count_threshold = 3       # 打哈欠次数阈值
         self.eye_closed_threshold = 2.0     # 闭眼时长阈值（秒）
         
-        # 历史数据
-        self.history = []
-        self.max_history_len = 100
+        # 评分分段表：逐个计算用元组二分查找，批量计算用同一组断点的NumPy数组
+        self.tables = {name: (tuple(breakpoints), tuple(scores))
+                       for name, (breakpoints, scores) in {**config.SCORE_TABLES, **(tables or {})}.items()}
+        self._batch_tables = {name: (np.array(breakpoints), np.array(scores))
+                              for name, (breakpoints, scores) in self.tables.items()}
+        self.level_breakpoints = tuple(config.LEVEL_BREAKPOINTS)
+        
+        # 评分历史（环形缓冲区，按帧数或秒数窗口查询平均值、趋势、最小/最大值）
+        self.scores = RollingWindow(config.SCORE_HISTORY_LEN, config.SCORE_FRAME_WINDOWS, config.ROLLING_WINDOWS)
+        # 最近一次计算的各项指标
+        self.latest = None
+        
+        # 当前等级及最近一次calculate()产生的等级变化事件
+        self.level = FatigueLevel.NORMAL
+        self.events = []
+        
+        # 增量评分：上一次计算的结果及当时的检测器、状态版本、时间戳和窗口内最早事件移出的时间
+        self.incremental = config.SCORE_INCREMENTAL if incremental is None else incremental
+        self._result = None
+        self._detector = None
+        self._version = None
+        self._computed_at = None
+        self._expires_at = None
+        
+        # calculate()调用次数和实际重新计算的次数
+        self.calls = 0
+        self.recomputes = 0
     
-    def calculate(self, fatigue_detector):
+    def calculate(self, fatigue_detector, stats=None):
         """
         计算疲劳等级
         
+        增量评分时，检测器状态未变化就直接返回上一次的结果（见_is_stale()），只有重新计算时才写入评分历史，
+        此时评分历史的一条记录对应一次重新计算而不是一帧
+        
         Args:
             fatigue_detector: 疲劳检测器实例
+            stats: 滑动窗口统计（RollingStats.get_stats()的返回值，
+                   默认取检测器config.FATIGUE_STATS_WINDOW窗口的统计，给出时总是重新计算）
         
         Returns:
             fatigue_level: 疲劳等级
             fatigue_score: 疲劳评分（0-100）
         """
+        self.calls += 1
+        if self.incremental and stats is None and not self._is_stale(fatigue_detector):
+            self.events.clear()
+            return self._result
+        self.recomputes += 1
+        
         # 获取各项指标
-        blink_rate = fatigue_detector.get_blink_rate()
+        if stats is None:
+            stats = fatigue_detector.rolling_stats.get_stats()
+        blink_rate = stats['blink_rate']
+        perclos = stats['perclos']
+        nod_rate = stats['nod_rate']
         yawn_count = fatigue_detector.yawn_counter
         eye_closed_duration = fatigue_detector.get_eye_closed_duration()
         
-        # 计算各项得分（0-1）
-        blink_score = self._calculate_blink_score(blink_rate)
-        yawn_score = self._calculate_yawn_score(yawn_count)
-        eye_closed_score = self._calculate_eye_closed_score(eye_closed_duration)
+        fatigue_level, fatigue_score = self.score(blink_rate, yawn_count, eye_closed_duration, perclos,
+                                                  nod_rate, fatigue_detector.get_head_down_duration())
+        self.events.clear()
+        if fatigue_level is not self.level:
+            self.events.append(LevelChange(fatigue_detector.last_timestamp, fatigue_level, self.level,
+                                           fatigue_score, fatigue_detector.source))
+            self.level = fatigue_level
+        
+        # 记录历史
+        timestamp = fatigue_detector.last_timestamp
+        self.scores.append(fatigue_score, 0.0 if timestamp is None else timestamp)
+        self.latest = {
+            'score': fatigue_score,
+            'level': fatigue_level,
+            'blink_rate': blink_rate,
+            'yawn_count': yawn_count,
+            'eye_closed': eye_closed_duration,
+            'perclos': perclos,
+            'nod_rate': nod_rate
+        }
+        
+        self._result = (fatigue_level, fatigue_score)
+        self._detector = fatigue_detector
+        self._version = fatigue_detector.version
+        self._computed_at = timestamp
+        if self.incremental:
+            self._expires_at = fatigue_detector.rolling_stats.window().next_expiry()
+        return self._result
+    
+    def _is_stale(self, fatigue_detector):
+        """
+        判断上一次的评分是否需要重新计算（内部方法）
+        
+        Args:
+            fatigue_detector: 疲劳检测器实例
+        
+        Returns:
+            stale: 检测器不同、状态版本变化、闭眼或低头计时进行中（时长逐帧增长）、
+                   统计窗口内有事件移出（眨眼/打哈欠/点头频率跳变），
+                   或距上一次计算已达config.SCORE_REFRESH_INTERVAL秒时为True
+        """
+        if fatigue_detector is not self._detector or fatigue_detector.version != self._version:
+            return True
+        if fatigue_detector.eye_closed_start is not None or fatigue_detector.head_down_start is not None:
+            return True
+        timestamp = fatigue_detector.last_timestamp
+        if timestamp is None or self._computed_at is None:
+            return True
+        if self._expires_at is not None and timestamp >= self._expires_at:
+            return True
+        return not 0.0 <= timestamp - self._computed_at < config.SCORE_REFRESH_INTERVAL
+    
+    @property
+    def recompute_ratio(self):
+        """
+        实际重新计算的比例（0-1），尚未调用时为0
+        """
+        return self.recomputes / self.calls if self.calls else 0.0
+    
+    def print_stats(self):
+        """
+        输出增量评分统计
+        """
+        print(f"Fatigue scoring: {self.recomputes} of {self.calls} calls recomputed "
+              f"({self.recompute_ratio:.1%}), incremental {'on' if self.incremental else 'off'}")
+    
+    def score(self, blink_rate, yawn_count, eye_closed_duration, perclos=0.0, nod_rate=0.0, head_down_duration=0.0):
+        """
+        由各项指标计算疲劳等级和评分（不记录历史、不产生事件）
+        
+        Args:
+            blink_rate: 眨眼频率（次/分钟）
+            yawn_count: 打哈欠次数
+            eye_closed_duration: 当前闭眼时长（秒）
+            perclos: 统计窗口内闭眼时间占比（0-1）
+            nod_rate: 统计窗口内的点头频率（次/分钟）
+            head_down_duration: 当前低头时长（秒）
+        
+        Returns:
+            fatigue_level: 疲劳等级
+            fatigue_score: 疲劳评分（0-100）
+        """
+        # 计算各项得分（0-1），在分段表中二分查找（与_calculate_*_score()相同，内联以减少方法调用）
+        tables = self.tables
+        breakpoints, scores = tables['blink_rate']
+        blink_score = scores[bisect_right(breakpoints, blink_rate)]
+        breakpoints, scores = tables['yawn_count']
+        yawn_score = scores[bisect_right(breakpoints, yawn_count)]
+        # 单次长时间闭眼和窗口内闭眼占比偏高都反映眼部疲劳，取两者中较高的得分
+        closed_breakpoints, closed_scores = tables['eye_closed']
+        breakpoints, scores = tables['perclos']
+        eye_closed_score = max(closed_scores[bisect_right(closed_breakpoints, eye_closed_duration)],
+                               scores[bisect_right(breakpoints, perclos)])
+        # 点头频率得分与低头时长得分取较高者
+        breakpoints, scores = tables['nod_rate']
+        head_pose_score = max(scores[bisect_right(breakpoints, nod_rate)],
+                              closed_scores[bisect_right(closed_breakpoints, head_down_duration)])
         
         # 加权计算综合得分
         total_score = (
             blink_score * self.blink_rate_weight +
             yawn_score * self.yawn_count_weight +
-            eye_closed_score * self.eye_closed_weight
+            eye_closed_score * self.eye_closed_weight +
+            head_pose_score * self.head_pose_weight
         )
         
-        # 转换为0-100分制
-        fatigue_score = int(total_score * 100)
+        # 转换为0-100分制，并确定疲劳等级
+        return _LEVELS[bisect_right(self.level_breakpoints, total_score)], int(total_score * 100)
+    
+    def score_batch(self, blink_rate, yawn_count, eye_closed_duration, perclos=None, nod_rate=None,
+                    head_down_duration=None):
+        """
+        批量计算一组对象的疲劳等级和评分（与score()逐个计算的结果完全一致）
         
-        # 确定疲劳等级
-        fatigue_level = self._determine_level(total_score)
+        各项得分用np.searchsorted在分段表的断点上查找，一次调用完成所有对象
         
-        # 记录历史
-        self.history.append({
-            'score': fatigue_score,
-            'level': fatigue_level,
-            'blink_rate': blink_rate,
-            'yawn_count': yawn_count,
-            'eye_closed': eye_closed_duration
-        })
+        Args:
+            blink_rate: (F,) 眨眼频率（次/分钟）
+            yawn_count: (F,) 打哈欠次数
+            eye_closed_duration: (F,) 当前闭眼时长（秒）
+            perclos: (F,) 闭眼时间占比（默认全部为0）
+            nod_rate: (F,) 点头频率（次/分钟，默认全部为0）
+            head_down_duration: (F,) 当前低头时长（秒，默认全部为0）
+        
+        Returns:
+            fatigue_level: (F,) 疲劳等级（FatigueLevel的整数值）
+            fatigue_score: (F,) 疲劳评分（0-100）
+        """
+        blink_score = self._lookup_batch('blink_rate', blink_rate)
+        yawn_score = self._lookup_batch('yawn_count', yawn_count)
+        eye_closed_score = self._lookup_batch('eye_closed', eye_closed_duration)
+        if perclos is not None:
+            eye_closed_score = np.maximum(eye_closed_score, self._lookup_batch('perclos', perclos))
         
-        # 保持历史长度
-        if len(self.history) > self.max_history_len:
-            self.history.pop(0)
+        # 与score()相同的顺序累加，保证浮点结果逐位一致
+        total_score = (blink_score * self.blink_rate_weight +
+                       yawn_score * self.yawn_count_weight +
+                       eye_closed_score * self.eye_closed_weight)
+        head_pose_score = np.zeros_like(total_score)
+        if nod_rate is not None:
+            head_pose_score = np.maximum(head_pose_score, self._lookup_batch('nod_rate', nod_rate))
+        if head_down_duration is not None:
+            head_pose_score = np.maximum(head_pose_score, self._lookup_batch('eye_closed', head_down_duration))
+        total_score = total_score + head_pose_score * self.head_pose_weight
         
+        fatigue_score = (total_score * 100).astype(np.int16)
+        fatigue_level = np.searchsorted(self.level_breakpoints, total_score, side='right').astype(np.int8)
         return fatigue_level, fatigue_score
     
+    def _lookup(self, name, value):
+        """
+        在分段表中查找指标对应的得分（内部方法）
+        
+        Args:
+            name: 指标名称（config.SCORE_TABLES的键）
+            value: 指标值
+        
+        Returns:
+            score: 得分（0-1）
+        """
+        breakpoints, scores = self.tables[name]
+        return scores[bisect_right(breakpoints, value)]
+    
+    def _lookup_batch(self, name, values):
+        """
+        在分段表中批量查找得分（内部方法）
+        
+        Args:
+            name: 指标名称（config.SCORE_TABLES的键）
+            values: 指标值数组
+        
+        Returns:
+            scores: 得分数组（0-1）
+        """
+        breakpoints, scores = self._batch_tables[name]
+        return scores[np.searchsorted(breakpoints, values, side='right')]
+    
     def _calculate_blink_score(self, blink_rate):
         """
         计算眨眼频率得分
@@ -147,16 +344,7 @@ class FatigueLevelCalculator:
         Returns:
             score: 得分（0-1）
         """
-        if blink_rate < 5:
-            return 0.0
-        elif blink_rate < 10:
-            return 0.2
-        elif blink_rate < 15:
-            return 0.5
-        elif blink_rate < 20:
-            return 0.7
-        else:
-            return 1.0
+        return self._lookup('blink_rate', blink_rate)
     
     def _calculate_yawn_score(self, yawn_count):
         """
@@ -168,16 +356,7 @@ class FatigueLevelCalculator:
         Returns:
             score: 得分（0-1）
         """
-        if yawn_count == 0:
-            return 0.0
-        elif yawn_count < 2:
-            return 0.3
-        elif yawn_count < 4:
-            return 0.6
-        elif yawn_count < 6:
-            return 0.8
-        else:
-            return 1.0
+        return self._lookup('yawn_count', yawn_count)
     
     def _calculate_eye_closed_score(self, eye_closed_duration):
         """
@@ -189,16 +368,32 @@ class FatigueLevelCalculator:
         Returns:
             score: 得分（0-1）
         """
-        if eye_closed_duration == 0:
-            return 0.0
-        elif eye_closed_duration < 1.0:
-            return 0.3
-        elif eye_closed_duration < 2.0:
-            return 0.6
-        elif eye_closed_duration < 3.0:
-            return 0.8
-        else:
-            return 1.0
+        return self._lookup('eye_closed', eye_closed_duration)
+    
+    def _calculate_perclos_score(self, perclos):
+        """
+        计算PERCLOS得分
+        
+        Args:
+            perclos: 统计窗口内闭眼时间占比（0-1）
+        
+        Returns:
+            score: 得分（0-1）
+        """
+        return self._lookup('perclos', perclos)
+    
+    def _calculate_head_pose_score(self, nod_rate, head_down_duration):
+        """
+        计算头部姿态得分
+        
+        Args:
+            nod_rate: 统计窗口内的点头频率（次/分钟）
+            head_down_duration: 当前低头时长（秒）
+        
+        Returns:
+            score: 得分（0-1），点头频率得分与低头时长得分中的较高者
+        """
+        return max(self._lookup('nod_rate', nod_rate), self._lookup('eye_closed', head_down_duration))
     
     def _determine_level(self, total_score):
         """
@@ -210,51 +405,62 @@ class FatigueLevelCalculator:
         Returns:
             level: 疲劳等级
         """
-        if total_score < 0.25:
-            return FatigueLevel.NORMAL
-        elif total_score < 0.5:
-            return FatigueLevel.MILD
-        elif total_score < 0.75:
-            return FatigueLevel.MODERATE
-        else:
-            return FatigueLevel.SEVERE
+        return _LEVELS[bisect_right(self.level_breakpoints, total_score)]
     
-    def get_average_score(self, window_size=30):
+    def get_average_score(self, window_size=30, seconds=None):
         """
-        获取最近N次检测的平均得分
+        获取最近N条评分记录（或最近若干秒）的平均得分
         
         Args:
-            window_size: 窗口大小
+            window_size: 窗口大小（记录数，默认每帧一条；增量评分时每条记录对应一次重新计算）
+            seconds: 窗口秒数（给出时代替window_size；增量评分时为窗口内各次重新计算结果的平均，不按时长加权）
         
         Returns:
-            avg_score: 平均得分
+            avg_score: 平均得分，帧数窗口的历史不足时为0
         """
-        if len(self.history) < window_size:
+        if seconds is not None:
+            return self.scores.mean(seconds=seconds)
+        if len(self.scores) < window_size:
             return 0
-        
-        recent_history = self.history[-window_size:]
-        scores = [h['score'] for h in recent_history]
-        return sum(scores) / len(scores)
+        return self.scores.mean(frames=window_size)
     
-    def get_trend(self):
+    def get_score_range(self, window_size=30, seconds=None):
         """
-        获取疲劳趋势
+        获取窗口内的最低和最高得分
+        
+        Args:
+            window_size: 窗口大小（记录数）
+            seconds: 窗口秒数（给出时代替window_size）
         
         Returns:
-            trend: 趋势（'up', 'down', 'stable'）
+            min_score: 最低得分
+            max_score: 最高得分
         """
-        if len(self.history) < 10:
-            return 'stable'
+        if seconds is not None:
+            return self.scores.extremes(seconds=seconds)
+        return self.scores.extremes(frames=window_size)
+    
+    def get_trend(self, window_size=10, seconds=None):
+        """
+        获取疲劳趋势（窗口平均得分与前一个等长窗口相比）
         
-        recent_scores = [h['score'] for h in self.history[-10:]]
-        older_scores = [h['score'] for h in self.history[-20:-10]]
+        Args:
+            window_size: 窗口大小（记录数，增量评分时每条记录对应一次重新计算，同样的记录数覆盖更长的时间）
+            seconds: 窗口秒数（给出时代替window_size）
         
-        recent_avg = sum(recent_scores) / len(recent_scores)
-        older_avg = sum(older_scores) / len(older_scores)
+        Returns:
+            trend: 趋势（'up', 'down', 'stable'），历史不足两个窗口时为'stable'
+        """
+        if seconds is not None:
+            delta = self.scores.trend(seconds=seconds)
+        else:
+            delta = self.scores.trend(frames=window_size)
+        if delta is None:
+            return 'stable'
         
-        if recent_avg > older_avg + 10:
+        if delta > 10:
             return 'up'
-        elif recent_avg < older_avg - 10:
+        elif delta < -10:
             return 'down'
         else:
             return 'stable'
@@ -263,4 +469,8 @@ class FatigueLevelCalculator:
         """
         重置疲劳等级计算器
         """
-        self.history.clear()
+        self.scores.reset()
+        self.latest = None
+        self.level = FatigueLevel.NORMAL
+        self.events = []
+        self._result = self._detector = self._version = self._computed_at = self._expires_at = None
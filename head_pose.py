@@ -0,0 +1,137 @@
+"""
+头部姿态模块
+用 cv2.solvePnP 由六个面部特征点估计头部的俯仰角、偏航角和翻滚角
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+import config
+
+
+# 通用三维人脸模型（毫米，与config.HEAD_POSE_INDICES一一对应）
+# 坐标系与相机一致：x向右、y向下、z指向画面深处，正脸朝向相机时旋转为单位阵
+HEAD_MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),          # 鼻尖
+    (0.0, 330.0, 65.0),       # 下巴
+    (-225.0, -170.0, 135.0),  # 画面左侧眼睛外眼角
+    (225.0, -170.0, 135.0),   # 画面右侧眼睛外眼角
+    (-150.0, 150.0, 125.0),   # 画面左侧嘴角
+    (150.0, 150.0, 125.0),    # 画面右侧嘴角
+], dtype=np.float64)
+
+
+def rotation_to_euler(rvec):
+    """
+    将旋转向量转换为欧拉角
+
+    Args:
+        rvec: solvePnP得到的旋转向量 (3, 1)
+
+    Returns:
+        pitch: 俯仰角（度，低头为正）
+        yaw: 偏航角（度，向画面左侧转头为正）
+        roll: 翻滚角（度，头向画面右侧歪为正）
+    """
+    rotation, _ = cv2.Rodrigues(rvec)
+    pitch = math.degrees(math.atan2(rotation[2, 1], rotation[2, 2]))
+    yaw = math.degrees(math.asin(max(-1.0, min(1.0, -rotation[2, 0]))))
+    roll = math.degrees(math.atan2(rotation[1, 0], rotation[0, 0]))
+    return pitch, yaw, roll
+
+
+class HeadPoseEstimator:
+    """
+    头部姿态估计器类
+    相机内参按画面尺寸预先计算并缓存；上一帧的旋转、平移向量作为迭代求解的初值，
+    连续帧之间姿态变化很小，迭代只需几步即可收敛
+    """
+
+    def __init__(self):
+        """
+        初始化头部姿态估计器
+        """
+        self.indices = np.array(config.HEAD_POSE_INDICES)
+        self._image_points = np.empty((len(self.indices), 2), dtype=np.float64)
+        self._cameras = {}  # (宽, 高) -> 相机内参矩阵
+        self._dist_coeffs = np.zeros((4, 1), dtype=np.float64)  # 假设无镜头畸变
+
+        # 上一帧的解（作为下一帧的初值）
+        self.rvec = None
+        self.tvec = None
+        self.last_timestamp = None
+
+        # 当前姿态（度）
+        self.pitch = 0.0
+        self.yaw = 0.0
+        self.roll = 0.0
+
+    def camera_matrix(self, img_shape):
+        """
+        获取画面尺寸对应的相机内参（焦距近似为画面宽度，主点为画面中心）
+
+        Args:
+            img_shape: 图像形状 (h, w, c)
+
+        Returns:
+            camera_matrix: 3x3 相机内参矩阵
+        """
+        h, w = img_shape[:2]
+        matrix = self._cameras.get((w, h))
+        if matrix is None:
+            matrix = np.array([[w, 0.0, w / 2.0],
+                               [0.0, w, h / 2.0],
+                               [0.0, 0.0, 1.0]], dtype=np.float64)
+            self._cameras[(w, h)] = matrix
+        return matrix
+
+    def estimate(self, landmarks, img_shape, timestamp=None):
+        """
+        估计头部姿态
+
+        Args:
+            landmarks: 特征点像素坐标数组（至少包含config.HEAD_POSE_INDICES对应的行）
+            img_shape: 图像形状 (h, w, c)
+            timestamp: 帧时间戳（秒，可选），与上一帧间隔超过config.DETECTION_MAX_GAP时不使用上一帧的解
+
+        Returns:
+            pose: (pitch, yaw, roll) 角度（度），求解失败时为None
+        """
+        image_points = self._image_points
+        image_points[:] = landmarks[self.indices, :2]
+        camera_matrix = self.camera_matrix(img_shape)
+
+        use_guess = self.rvec is not None and (
+            timestamp is None or self.last_timestamp is None or
+            timestamp - self.last_timestamp <= config.DETECTION_MAX_GAP)
+        if use_guess:
+            rvec, tvec = self.rvec, self.tvec
+        else:
+            # 没有可用的初值时先用EPnP得到闭式解（六个点时迭代法自带的DLT初始化不稳定）
+            ok, rvec, tvec = cv2.solvePnP(HEAD_MODEL_POINTS, image_points, camera_matrix, self._dist_coeffs,
+                                          flags=cv2.SOLVEPNP_EPNP)
+            if not ok:
+                rvec = tvec = None
+        self.last_timestamp = timestamp
+        if rvec is not None:
+            ok, rvec, tvec = cv2.solvePnP(HEAD_MODEL_POINTS, image_points, camera_matrix, self._dist_coeffs,
+                                          rvec, tvec, useExtrinsicGuess=True, flags=cv2.SOLVEPNP_ITERATIVE)
+
+        # 人脸在相机后方说明收敛到了镜像解，丢弃并在下一帧重新求解
+        if rvec is None or not ok or tvec[2, 0] <= 0:
+            self.rvec = self.tvec = None
+            return None
+
+        self.rvec, self.tvec = rvec, tvec
+        self.pitch, self.yaw, self.roll = rotation_to_euler(rvec)
+        return self.pitch, self.yaw, self.roll
+
+    def reset(self):
+        """
+        清除上一帧的解和当前姿态
+        """
+        self.rvec = self.tvec = None
+        self.last_timestamp = None
+        self.pitch = self.yaw = self.roll = 0.0
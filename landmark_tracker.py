@@ -0,0 +1,210 @@
+"""
+特征点跟踪模块
+每隔K帧运行一次完整的FaceMesh推理，其余帧用金字塔LK光流在面部区域的缩小灰度图上传播关键特征点
+"""
+
+import cv2
+import numpy as np
+
+import config
+from tracer import tracer
+from utils import calculate_ratios_batch
+
+
+class LandmarkTracker:
+    """
+    特征点跟踪器类
+    推理间隔K根据测得的运动幅度自适应调整，跟踪不可靠或EAR接近阈值时立即回退到完整推理
+    """
+
+    def __init__(self, face_detector, indices=None):
+        """
+        初始化特征点跟踪器
+
+        Args:
+            face_detector: FaceDetector实例，用于完整推理
+            indices: 需要跟踪的特征点索引（默认config.LANDMARK_SUBSET_INDICES）
+        """
+        self.face_detector = face_detector
+        self.indices = np.array(indices if indices is not None else config.LANDMARK_SUBSET_INDICES)
+        self.scale = config.TRACKING_SCALE
+        self.interval = config.TRACKING_MIN_INTERVAL  # 两次完整推理之间的光流帧数
+        self.lk_params = dict(
+            winSize=(config.TRACKING_WINDOW_SIZE, config.TRACKING_WINDOW_SIZE),
+            maxLevel=config.TRACKING_PYRAMID_LEVELS,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+
+        # 跟踪状态
+        self.region = None  # 跟踪区域（整帧像素坐标 (x0, y0, x1, y1)，每次推理后重新确定）
+        self.points = None  # 跟踪区域缩小灰度图上的关键点坐标 (M, 1, 2)
+        self.landmarks = None  # 最近一帧的特征点数组（只有indices对应行有效）
+        self.frames_since_inference = 0
+        self.motion = 0.0  # 最近一次光流测得的运动幅度（整帧像素）
+
+        # 跟踪区域的缩小图和灰度图双缓冲（上一帧/当前帧）
+        self._small = None
+        self._gray = None
+        self._prev_gray = None
+
+        # 统计计数
+        self.inferences = 0
+        self.tracked_frames = 0
+        self.tracking_failures = 0
+        self.threshold_fallbacks = 0
+
+    def process(self, img):
+        """
+        处理单帧图像，得到关键特征点
+
+        Args:
+            img: 输入图像（BGR格式）
+
+        Returns:
+            landmarks: 特征点坐标数组（只有indices对应行有效），未检测到面部时为None；
+                       数组在下一帧会被覆盖
+            face_landmarks: 本帧完整推理得到的MediaPipe特征点，光流帧为None
+        """
+        landmarks = None
+        if self.points is not None and self.frames_since_inference < self.interval:
+            with tracer.span('tracking.preprocess'):
+                self._prepare_gray(img)
+            with tracer.span('tracking.flow'):
+                landmarks = self._track()
+
+        face_landmarks = None
+        if landmarks is None:
+            face_landmarks = self._infer(img)
+            landmarks = self.landmarks if face_landmarks is not None else None
+
+        self._prev_gray, self._gray = self._gray, self._prev_gray
+        return landmarks, face_landmarks
+
+    def reset(self):
+        """
+        清除跟踪状态，下一帧执行完整推理
+        """
+        self.points = None
+        self.frames_since_inference = 0
+        self.interval = config.TRACKING_MIN_INTERVAL
+
+    def get_stats(self):
+        """
+        获取跟踪统计
+
+        Returns:
+            stats: 统计字典（推理次数、光流帧数、跟踪失败次数、阈值回退次数、当前推理间隔）
+        """
+        return {
+            'inferences': self.inferences,
+            'tracked_frames': self.tracked_frames,
+            'tracking_failures': self.tracking_failures,
+            'threshold_fallbacks': self.threshold_fallbacks,
+            'interval': self.interval
+        }
+
+    def print_stats(self):
+        """
+        输出跟踪统计
+        """
+        total = self.inferences + self.tracked_frames
+        ratio = self.tracked_frames / total if total else 0.0
+        print(f"Landmark tracking: {self.inferences} inferences, {self.tracked_frames} tracked "
+              f"frames ({ratio:.1%}), {self.tracking_failures} tracking failures, "
+              f"{self.threshold_fallbacks} EAR fallbacks, interval {self.interval}")
+
+    def _prepare_gray(self, img):
+        """
+        将跟踪区域缩小并转换为灰度图，写入当前帧缓冲区（内部方法）
+
+        Args:
+            img: 输入图像（BGR格式）
+        """
+        x0, y0, x1, y1 = self.region
+        size = (self._gray.shape[1], self._gray.shape[0])
+        cv2.resize(img[y0:y1, x0:x1], size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+    def _infer(self, img):
+        """
+        运行完整FaceMesh推理并重新初始化跟踪点（内部方法）
+
+        Args:
+            img: 输入图像（BGR格式）
+
+        Returns:
+            face_landmarks: MediaPipe特征点，未检测到面部时为None
+        """
+        self.inferences += 1
+        self.frames_since_inference = 0
+        results = self.face_detector.process(img)
+        if not results.multi_face_landmarks:
+            self.points = None
+            return None
+
+        face_landmarks = results.multi_face_landmarks[0]
+        landmarks = self.face_detector.get_landmarks_array(face_landmarks, img.shape,
+                                                           indices=self.indices)
+        # 检测器的特征点缓冲区会被下一次转换覆盖，关键点复制到跟踪器自己的数组中
+        if self.landmarks is None or self.landmarks.shape != landmarks.shape:
+            self.landmarks = np.zeros_like(landmarks)
+        self.landmarks[self.indices] = landmarks[self.indices]
+
+        # 以关键点包围框加边距作为跟踪区域，光流只在该区域内计算
+        points = self.landmarks[self.indices]
+        h, w = img.shape[:2]
+        (px0, py0), (px1, py1) = points.min(axis=0), points.max(axis=0)
+        margin = max(px1 - px0, py1 - py0) * config.TRACKING_REGION_PADDING
+        x0, y0 = max(int(px0 - margin), 0), max(int(py0 - margin), 0)
+        x1, y1 = min(int(px1 + margin) + 1, w), min(int(py1 + margin) + 1, h)
+        self.region = (x0, y0, x1, y1)
+        self.points = ((points - (x0, y0)) * self.scale).astype(np.float32).reshape(-1, 1, 2)
+
+        size = (max(int(round((x1 - x0) * self.scale)), 1), max(int(round((y1 - y0) * self.scale)), 1))
+        if self._gray is None or self._gray.shape != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._prev_gray = np.empty_like(self._gray)
+        self._prepare_gray(img)
+        return face_landmarks
+
+    def _track(self):
+        """
+        用光流把关键点从上一帧传播到当前帧（内部方法）
+
+        正反两次光流的往返误差过大、有点丢失，或者EAR接近闭眼阈值时返回None，由调用方执行完整推理
+
+        Returns:
+            landmarks: 特征点坐标数组，跟踪不可靠时返回None
+        """
+        points, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, self._gray, self.points, None, **self.lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            self._gray, self._prev_gray, points, None, **self.lk_params)
+        round_trip = np.abs(back - self.points).max()
+        if not status.all() or not back_status.all() or round_trip > config.TRACKING_MAX_ERROR:
+            self.tracking_failures += 1
+            self.interval = config.TRACKING_MIN_INTERVAL
+            return None
+
+        landmarks = self.landmarks
+        landmarks[self.indices] = points.reshape(-1, 2) / self.scale + self.region[:2]
+
+        # 光流难以跟随眼睑快速闭合，EAR接近阈值时以完整推理为准，避免漏检短眨眼
+        left_ear, right_ear, _ = calculate_ratios_batch(landmarks)
+        ear = (left_ear + right_ear) / 2.0
+        if ear < config.EAR_THRESHOLD + config.TRACKING_EAR_MARGIN:
+            self.threshold_fallbacks += 1
+            return None
+
+        # 运动越大推理越频繁，画面静止时逐步拉长推理间隔
+        self.motion = float(np.median(np.linalg.norm(points - self.points, axis=2))) / self.scale
+        if self.motion > config.TRACKING_MOTION_HIGH:
+            self.interval = config.TRACKING_MIN_INTERVAL
+        elif self.motion < config.TRACKING_MOTION_LOW:
+            self.interval = min(self.interval + 1, config.TRACKING_MAX_INTERVAL)
+
+        self.points = points
+        self.frames_since_inference += 1
+        self.tracked_frames += 1
+        return landmarks
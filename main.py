@@ -3,18 +3,83 @@
 整合所有模块，实现完整的疲劳检测功能
 """
 
-import cv2
 import time
+
+# 进程启动时刻，用于启动耗时分析
+PROCESS_START = time.perf_counter()
+
+import cv2
+import numpy as np
 import sys
 import argparse
+import threading
 
 import config
 from face_detector import FaceDetector
-from fatigue_detector import FatigueDetector
-from fatigue_level import FatigueLevelCalculator
+from face_tracker import FaceTracker
 from alarm import AlarmManager
+from events import EventBus, EventLogger
+from metrics import FrameMetrics
 from ui import UIDrawer
-from web_server import web_server
+from capture import CaptureThread
+from landmark_tracker import LandmarkTracker
+from tracer import tracer
+from buffer_pool import frame_pool
+from detector_plugins import PluginSet, required_indices
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器
+    记录从进程启动到各启动阶段完成的时间
+    """
+    
+    def __init__(self, origin=PROCESS_START):
+        """
+        初始化启动耗时分析器
+        
+        Args:
+            origin: 计时起点（time.perf_counter()）
+        """
+        self.origin = origin
+        self.marks = []
+        self.reported = False
+        self._lock = threading.Lock()
+    
+    def mark(self, name):
+        """
+        记录一个启动阶段完成的时刻
+        
+        Args:
+            name: 阶段名称
+        """
+        elapsed = time.perf_counter() - self.origin
+        with self._lock:
+            self.marks.append((elapsed, name, threading.current_thread().name))
+    
+    def report(self):
+        """
+        输出启动耗时报告
+        """
+        if self.reported:
+            return
+        self.reported = True
+        
+        print("\nStartup profile")
+        print("=" * 50)
+        with self._lock:
+            marks = sorted(self.marks)
+        for elapsed, name, thread_name in marks:
+            print(f"{elapsed * 1000:>8.1f} ms  {name}  [{thread_name}]")
+        
+        scored = [elapsed for elapsed, name, _ in marks if name == 'first scored frame']
+        if scored:
+            status = 'OK' if scored[0] <= config.STARTUP_TARGET_SECONDS else 'OVER TARGET'
+            print(f"Time to first scored frame: {scored[0]:.3f}s "
+                  f"(target {config.STARTUP_TARGET_SECONDS:.1f}s) {status}")
+        else:
+            print("No frame was scored (no face detected)")
+        print("=" * 50)
 
 
 class FatigueDetectionSystem:
@@ -23,24 +88,84 @@ class FatigueDetectionSystem:
     整合所有功能模块
     """
     
-    def __init__(self, use_web=False):
+    def __init__(self, use_web=False, trace_path=None, startup_profiler=None, tracking=None,
+                 events_path=None):
         """
         初始化疲劳检测系统
+        
+        FaceDetector在run()中由预热线程构建，与摄像头初始化并行进行
+        
+        Args:
+            use_web: 是否使用Web界面模式
+            trace_path: 追踪结果输出文件（Chrome trace格式），None表示不追踪
+            startup_profiler: 启动耗时分析器（可选）
+            tracking: 是否在推理之间用光流跟踪关键特征点（默认读取config.LANDMARK_TRACKING_ENABLED）
+            events_path: 事件日志输出文件（JSON Lines），None表示不记录
         """
-        self.face_detector = FaceDetector()
-        self.fatigue_detector = FatigueDetector()
-        self.fatigue_level_calculator = FatigueLevelCalculator()
+        self.face_detector = None
+        self.landmark_tracker = None
+        self.tracking = config.LANDMARK_TRACKING_ENABLED if tracking is None else tracking
+        self.face_tracker = FaceTracker()
+        # 只提取信号检测插件需要的特征点
+        self.landmark_indices = required_indices()
+        self._landmark_batch = None
         self.alarm_manager = AlarmManager()
         self.ui_drawer = UIDrawer()
         self.use_web = use_web
+        self.web_server = None
+        if use_web:
+            # Flask只在Web模式下导入
+            from web_server import web_server
+            self.web_server = web_server
+        
+        # 报警、Web界面和事件日志订阅检测事件，不再逐帧读取检测器状态
+        self.event_bus = EventBus()
+        self.event_bus.subscribe(self.alarm_manager.handle_event)
+        if use_web:
+            self.event_bus.subscribe(self.web_server.handle_event)
+        self.event_logger = None
+        if events_path:
+            self.event_logger = self.event_bus.subscribe(EventLogger(events_path))
+        self.trace_path = trace_path
+        self.startup = startup_profiler
+        self._detector_error = None
+        if trace_path:
+            tracer.enable()
         
         self.cap = None
+        self.capture = None
         self.running = False
         self.frame_count = 0
         self.start_time = 0
         self.current_fatigue_level = None
         self.current_fatigue_score = 0
     
+    def _mark_startup(self, name):
+        """
+        记录启动阶段（未启用启动分析时不做任何事情）
+        
+        Args:
+            name: 阶段名称
+        """
+        if self.startup is not None and not self.startup.reported:
+            self.startup.mark(name)
+    
+    def _build_face_detector(self):
+        """
+        构建FaceMesh图并执行一次预热推理（在预热线程中运行）
+        """
+        try:
+            self.face_detector = FaceDetector()
+            if self.tracking and self.face_detector.max_num_faces > 1:
+                print("Warning: Hybrid tracking supports a single face, disabled")
+            elif self.tracking:
+                self.landmark_tracker = LandmarkTracker(self.face_detector, self.landmark_indices)
+            self._mark_startup('FaceMesh graph built')
+            self.face_detector.warmup()
+            self._mark_startup('FaceMesh warm-up inference done')
+        except Exception as e:
+            self._detector_error = e
+    
     def initialize_camera(self):
         """
         初始化摄像头
@@ -49,6 +174,7 @@ class FatigueDetectionSystem:
         self.cap = cv2.VideoCapture(config.CAMERA_INDEX)
         self.cap.set(3, config.CAMERA_WIDTH)
         self.cap.set(4, config.CAMERA_HEIGHT)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, config.CAPTURE_BUFFER_SIZE)
         
         if not self.cap.isOpened():
             print("Error: Cannot open camera")
@@ -58,6 +184,7 @@ class FatigueDetectionSystem:
             print("3. Camera permissions are granted")
             return False
         
+        self._mark_startup('camera opened')
         print("Camera initialized successfully")
         
         # 测试读取一帧
@@ -68,66 +195,153 @@ class FatigueDetectionSystem:
             self.cap.release()
             return False
         
+        self._mark_startup('camera test frame read')
         print("Camera frame test successful")
+        
+        # 启动采集线程（直接读入缓冲池中的缓冲区）
+        self.capture = CaptureThread(self.cap, frame_pool)
+        self.capture.start()
         return True
     
-    def process_frame(self, img):
+    def process_frame(self, img, timestamp=None):
         """
         处理单帧图像
-
+        
+        Args:
+            img: 输入图像（BGR格式）
+            timestamp: 采集时间戳（秒）
         """
-        # 检测面部特征点
-        results = self.face_detector.process(img)
-        
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                # 转换特征点坐标
-                landmarks = self.face_detector.get_landmarks_array(
-                    face_landmarks, img.shape
-                )
-                
-                # 检测疲劳状态
-                self.fatigue_detector.detect(landmarks)
-                
-                # 计算疲劳等级
-                self.current_fatigue_level, self.current_fatigue_score = \
-                    self.fatigue_level_calculator.calculate(self.fatigue_detector)
-                
-                # 更新Web服务器数据
-                if self.use_web:
-                    web_server.update_frame(img)
-                    web_server.update_fatigue_data(
-                        self.fatigue_detector,
-                        self.current_fatigue_level,
-                        self.current_fatigue_score
-                    )
-                
-                # 绘制面部特征点网格（始终绘制以体现识别效果）
-                self.face_detector.draw_face_mesh(img, face_landmarks, draw=True)
-                
-                # 绘制UI（Web模式下不绘制）
-                self.ui_drawer.draw_all(img, landmarks, self.fatigue_detector, 
-                                   self.current_fatigue_level, self.current_fatigue_score,
-                                   draw_ui=not self.use_web)
-                
-                # 检查是否需要发出警报
-                self.alarm_manager.check_and_trigger(
-                    self.fatigue_detector.is_fatigued,
-                    self.fatigue_detector.is_yawning
-                )
+        if timestamp is None:
+            timestamp = time.time()
+        
+        # 检测面部特征点（混合模式下光流帧没有MediaPipe特征点，只有关键点数组）
+        if self.landmark_tracker is not None:
+            landmarks, face_landmarks = self.landmark_tracker.process(img)
+            faces = [(landmarks, face_landmarks)] if landmarks is not None else []
+        else:
+            results = self.face_detector.process(img)
+            faces = [(None, face_landmarks) for face_landmarks in results.multi_face_landmarks or []]
+        
+        if not faces:
+            # 没有人脸时仍需更新跟踪器，使超时的轨迹被移除
+            self.face_tracker.update(np.empty((0, 4)), timestamp)
+            self._release_evicted_tracks()
+            return img
+        
+        # 所有人脸的关键点写入同一个张量，一次算出每张脸的包围框
+        batch = self._stack_landmarks(faces, img.shape)
+        points = batch[:, self.landmark_indices]
+        boxes = np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+        
+        # 匹配跟踪编号，每条轨迹使用独立的疲劳检测状态
+        tracks = self.face_tracker.update(boxes, timestamp)
+        self._release_evicted_tracks()
+        # 插件对所有人脸一次批量计算EAR/MAR等信号，再逐个送入各自的检测器状态机
+        with tracer.span('fatigue.signals'):
+            signals = PluginSet.process_batch([track.fatigue_detector.plugins for track in tracks],
+                                              batch, img.shape, timestamp)
+        for i, track in enumerate(tracks):
+            with tracer.span('fatigue.detect'):
+                track.fatigue_detector.update(signals[i]['ear'], signals[i]['mar'], timestamp,
+                                              signals[i].get('head_pose'))
+            with tracer.span('fatigue.score'):
+                track.fatigue_level, track.fatigue_score = \
+                    track.fatigue_level_calculator.calculate(track.fatigue_detector)
+            # 本帧指标快照，UI和Web共用
+            track.metrics = FrameMetrics.capture(track.fatigue_detector, track.fatigue_level_calculator)
+            self.event_bus.publish_all(track.fatigue_detector.events)
+            self.event_bus.publish_all(track.fatigue_level_calculator.events)
+        
+        # 状态面板、Web数据跟随疲劳评分最高的人脸
+        primary = max(tracks, key=lambda track: track.fatigue_score)
+        self.current_fatigue_level = primary.fatigue_level
+        self.current_fatigue_score = primary.fatigue_score
+        if self.startup is not None and not self.startup.reported:
+            self.startup.mark('first scored frame')
+            self.startup.report()
+        
+        # 更新Web服务器数据
+        if self.use_web:
+            with tracer.span('web.update'):
+                self.web_server.update_metrics(primary.metrics)
+        
+        for i, (track, (_, face_landmarks)) in enumerate(zip(tracks, faces)):
+            # 绘制面部特征点网格（始终绘制以体现识别效果）；光流帧没有完整网格，
+            # 沿用最近一次推理的网格，避免网格按推理间隔闪烁
+            if face_landmarks is not None:
+                self.face_detector.draw_face_mesh(img, face_landmarks, draw=True, key=track.track_id)
+            else:
+                self.face_detector.mesh_renderer.redraw(img, track.track_id)
+            
+            # 绘制UI（Web模式下不绘制）
+            with tracer.span('ui.draw_all'):
+                if len(tracks) > 1 and not self.use_web:
+                    self.ui_drawer.draw_track_label(img, track.box, track.track_id,
+                                                    track.fatigue_level, track.fatigue_score)
+                self.ui_drawer.draw_all(img, batch[i], track.metrics,
+                                        draw_ui=not self.use_web, draw_panel=track is primary)
+        
+        # 报警条件由事件维护，条件持续期间按冷却时间重复报警（任意一人疲劳即报警）
+        with tracer.span('alarm.check'):
+            self.alarm_manager.update()
         
         return img
     
+    def _release_evicted_tracks(self):
+        """
+        释放已移除轨迹缓存的网格图层，并解除其报警条件
+        """
+        for track_id in self.face_tracker.evicted:
+            self.face_detector.mesh_renderer.reset(track_id)
+            self.alarm_manager.clear(track_id)
+    
+    def _stack_landmarks(self, faces, img_shape):
+        """
+        将各张人脸的关键点写入复用的 (F, N, 2) 张量
+        
+        Args:
+            faces: [(特征点数组或None, MediaPipe特征点或None)] 列表（至少一张人脸）
+            img_shape: 图像形状 (h, w, c)
+        
+        Returns:
+            batch: (F, N, 2) 特征点张量（只有self.landmark_indices对应行有效）
+        """
+        landmarks, face_landmarks = faces[0]
+        num = len(landmarks) if landmarks is not None else len(face_landmarks.landmark)
+        capacity = max(self.face_detector.max_num_faces, len(faces))
+        if self._landmark_batch is None or self._landmark_batch.shape[:2] != (capacity, num):
+            self._landmark_batch = np.zeros((capacity, num, 2), dtype=np.float32)
+        
+        batch = self._landmark_batch
+        for i, (landmarks, face_landmarks) in enumerate(faces):
+            if landmarks is not None:
+                batch[i] = landmarks
+            else:
+                self.face_detector.get_landmarks_array(
+                    face_landmarks, img_shape, indices=self.landmark_indices, out=batch[i]
+                )
+        return batch[:len(faces)]
+    
     def run(self):
         """
         运行疲劳检测系统
         """
+        # FaceMesh图构建与预热和摄像头初始化并行进行
+        warmup_thread = threading.Thread(target=self._build_face_detector,
+                                         name='DetectorWarmup', daemon=True)
+        warmup_thread.start()
+        
         if not self.initialize_camera():
             input("\nPress Enter to exit...")
             return
         
+        warmup_thread.join()
+        if self._detector_error is not None:
+            raise self._detector_error
+        self._mark_startup('detector ready')
+        
         if self.use_web:
-            web_server.start()
+            self.web_server.start()
             print("\nFatigue Detection System (Web Mode)")
             print("=" * 50)
             print("Web server started at http://localhost:5000")
@@ -152,41 +366,56 @@ class FatigueDetectionSystem:
         
         try:
             while self.running:
-                success, img = self.cap.read()
-                if not success:
-                    print(f"Error: Cannot read camera frame at frame {self.frame_count}")
-                    time.sleep(0.1)
+                # 获取最新采集帧（旧帧已被丢弃）
+                frame = self.capture.read(timeout=config.CAPTURE_READ_TIMEOUT)
+                if frame is None:
+                    print(f"Error: No camera frame received at frame {self.frame_count}")
                     continue
                 
                 self.frame_count += 1
+                if self.frame_count == 1:
+                    self._mark_startup('first frame received')
                 
-                # 翻转图像（镜像效果）
-                img = cv2.flip(img, 1)
+                # 翻转图像（镜像效果），写入缓冲池中的缓冲区
+                with tracer.span('frame.flip'):
+                    img = frame_pool.acquire(frame.image.shape)
+                    cv2.flip(frame.image, 1, dst=img)
+                frame_pool.release(frame.image)
                 
-                # 处理帧
                 try:
-                    img = self.process_frame(img)
-                except Exception as e:
-                    print(f"Error in detection at frame {self.frame_count}: {e}")
-                    continue
-                
-                # 在非Web模式下显示画面
-                if not self.use_web:
-                    cv2.imshow('Fatigue Detection System', img)
+                    # 处理帧
+                    try:
+                        with tracer.span('frame.process'):
+                            img = self.process_frame(img, frame.timestamp)
+                    except Exception as e:
+                        print(f"Error in detection at frame {self.frame_count}: {e}")
+                        continue
                     
-                    # 处理键盘输入
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == ord('q'):
-                        print("\nUser requested to quit")
-                        self.running = False
-                else:
-                    # Web模式下，检查是否有键盘输入
-                    import msvcrt
-                    if msvcrt.kbhit():
-                        key = msvcrt.getch()
-                        if key == b'q':
+                    # 在非Web模式下显示画面
+                    if not self.use_web:
+                        with tracer.span('frame.display'):
+                            cv2.imshow('Fatigue Detection System', img)
+                            
+                            # 处理键盘输入
+                            key = cv2.waitKey(1) & 0xFF
+                        if key == ord('q'):
                             print("\nUser requested to quit")
                             self.running = False
+                    else:
+                        # 绘制完成后再发布给Web服务器（复制到其自有缓冲区）
+                        with tracer.span('web.update_frame'):
+                            self.web_server.update_frame(img)
+                        
+                        # Web模式下，检查是否有键盘输入
+                        import msvcrt
+                        if msvcrt.kbhit():
+                            key = msvcrt.getch()
+                            if key == b'q':
+                                print("\nUser requested to quit")
+                                self.running = False
+                finally:
+                    # 显示和Web发布完成后归还缓冲区
+                    frame_pool.release(img)
         
         except KeyboardInterrupt:
             print("\nProgram interrupted by user")
@@ -204,13 +433,38 @@ class FatigueDetectionSystem:
         print("\nCleaning up...")
         
         if self.use_web:
-            web_server.stop()
+            self.web_server.stop()
+            stats = self.web_server.broadcaster.get_stats()
+            print(f"MJPEG stream: {stats['encoded']} frames encoded, {stats['sent']} sent, "
+                  f"{stats['skipped']} skipped by slow viewers")
+        
+        if self.capture is not None:
+            self.capture.stop()
+            stats = self.capture.get_stats()
+            print(f"Frames captured: {stats['captured']}, "
+                  f"dropped: {stats['dropped']}, "
+                  f"read failures: {stats['read_failures']}")
+        if self.landmark_tracker is not None:
+            self.landmark_tracker.print_stats()
+        for track in self.face_tracker.tracks.values():
+            track.fatigue_level_calculator.print_stats()
+        frame_pool.print_stats()
+        if self.event_logger is not None:
+            self.event_logger.close()
         
         if self.cap is not None:
             self.cap.release()
         
         cv2.destroyAllWindows()
         
+        if self.startup is not None:
+            self.startup.report()
+        
+        if tracer.enabled:
+            print("\nStage timings (recent frames):")
+            tracer.print_stage_stats()
+            tracer.export_chrome_trace(self.trace_path)
+        
         elapsed = time.time() - self.start_time
         print(f"Total frames processed: {self.frame_count}")
         print(f"Total time: {elapsed:.1f}s")
@@ -229,13 +483,45 @@ def main():
                        help='Web服务器地址（默认：0.0.0.0）')
     parser.add_argument('--port', type=int, default=5000,
                        help='Web服务器端口（默认：5000）')
+    parser.add_argument('--trace', type=str, default=None, metavar='FILE',
+                       help='记录各阶段耗时，退出时导出Chrome trace JSON文件')
+    parser.add_argument('--startup-profile', action='store_true',
+                       help='输出启动各阶段耗时及首个评分帧的耗时')
+    parser.add_argument('--input', type=str, default=None,
+                       help='离线回放输入：视频文件、图片目录或通配符（无界面批量处理）')
+    parser.add_argument('--output', type=str, default=config.REPLAY_OUTPUT,
+                       help=f'回放模式逐帧指标输出文件（默认：{config.REPLAY_OUTPUT}）')
+    parser.add_argument('--hybrid', action='store_true', default=None,
+                       help='混合模式：每隔数帧运行一次FaceMesh，其间用光流跟踪关键特征点')
+    parser.add_argument('--events', type=str, default=None, metavar='FILE',
+                       help='将眨眼、打哈欠、长时间闭眼、疲劳等级变化事件写入JSON Lines文件')
+    parser.add_argument('--fps', type=float, default=None,
+                       help=f'图片序列帧率，用于生成时间戳（默认：{config.REPLAY_DEFAULT_FPS:.0f}）')
     
     args = parser.parse_args()
     
+    if args.input:
+        # 离线回放模式：不限速、不显示、不启动Web服务器
+        from replay import resolve_input, run_replay
+        # 在创建检测器和输出文件之前检查输入
+        try:
+            resolve_input(args.input)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if args.trace:
+            tracer.enable()
+        run_replay(args.input, args.output, args.fps, tracking=args.hybrid, events_path=args.events)
+        if args.trace:
+            tracer.print_stage_stats()
+            tracer.export_chrome_trace(args.trace)
+        return
+    
     print("Initializing Fatigue Detection System...")
     print("=" * 50)
     
     if args.web:
+        from web_server import web_server
         print(f"Mode: Web Interface")
         print(f"Server: http://{args.host}:{args.port}")
         web_server.host = args.host
@@ -246,7 +532,13 @@ def main():
     print("=" * 50)
     
     try:
-        system = FatigueDetectionSystem(use_web=args.web)
+        startup_profiler = None
+        if args.startup_profile:
+            startup_profiler = StartupProfiler()
+            startup_profiler.mark('imports done')
+        system = FatigueDetectionSystem(use_web=args.web, trace_path=args.trace,
+                                        startup_profiler=startup_profiler,
+                                        tracking=args.hybrid, events_path=args.events)
         system.run()
     except Exception as e:
         print(f"Fatal error: {e}")
@@ -0,0 +1,139 @@
+"""
+面部网格绘制模块
+预先计算三角网格的连线索引，用一次cv2.polylines调用绘制全部连线
+"""
+
+import cv2
+import numpy as np
+
+import config
+
+
+class MeshRenderer:
+    """
+    面部网格绘制器类
+    可选每隔N帧重新绘制一次网格图层，或在缩小分辨率的图层上绘制后放大叠加
+    """
+
+    def __init__(self, connections, color=None, thickness=1, interval=None, scale=None):
+        """
+        初始化网格绘制器
+
+        Args:
+            connections: 连线集合 {(起点索引, 终点索引)}，如FACEMESH_TESSELATION
+            color: 连线颜色（BGR，默认config.MESH_COLOR）
+            thickness: 线宽（像素）
+            interval: 网格图层的重绘间隔（帧，默认config.MESH_RENDER_INTERVAL，1表示每帧直接绘制）
+            scale: 网格图层的分辨率比例（默认config.MESH_RENDER_SCALE，1.0表示原始分辨率）
+        """
+        # 同一条边可能以两个方向出现，去重后只绘制一次
+        edges = np.sort(np.array(sorted(connections), dtype=np.int64), axis=1)
+        self.edges = np.unique(edges, axis=0)
+        self.point_indices = np.unique(self.edges)
+        self.color = tuple(config.MESH_COLOR if color is None else color)
+        self.thickness = thickness
+        self.interval = max(int(config.MESH_RENDER_INTERVAL if interval is None else interval), 1)
+        self.scale = config.MESH_RENDER_SCALE if scale is None else scale
+
+        # 图层缓存：键 -> [已叠加帧数, 图层左上角, 掩码]
+        self._layers = {}
+        # 每帧直接绘制时最近一次的网格连线端点：键 -> (E, 2, 2) int32
+        self._lines = {}
+
+    def draw(self, img, landmarks, key=0):
+        """
+        绘制面部网格
+
+        Args:
+            img: 输入图像（直接在其上绘制）
+            landmarks: (N, 2) 像素坐标特征点数组（包含全部网格点）
+            key: 图层缓存键，多人脸时每张人脸使用不同的键（如跟踪编号）
+        """
+        if self.interval == 1 and self.scale >= 1.0:
+            lines = np.rint(landmarks).astype(np.int32)[self.edges]
+            self._lines[key] = lines
+            cv2.polylines(img, lines, False, self.color, self.thickness)
+            return
+
+        layer = self._layers.get(key)
+        if layer is None or layer[0] % self.interval == 0:
+            layer = [0, *self._render_layer(landmarks)]
+            self._layers[key] = layer
+        layer[0] += 1
+        self._composite(img, layer[1], layer[2])
+
+    def redraw(self, img, key=0):
+        """
+        在最近一次绘制的位置重新绘制网格（没有新特征点的帧使用，如光流跟踪帧）
+
+        Args:
+            img: 输入图像（直接在其上绘制）
+            key: 图层缓存键
+
+        Returns:
+            drawn: 该键有缓存的网格时为True
+        """
+        lines = self._lines.get(key)
+        if lines is not None:
+            cv2.polylines(img, lines, False, self.color, self.thickness)
+            return True
+        layer = self._layers.get(key)
+        if layer is not None:
+            self._composite(img, layer[1], layer[2])
+            return True
+        return False
+
+    def reset(self, key=None):
+        """
+        清除图层缓存
+
+        Args:
+            key: 只清除指定键的图层，None表示全部
+        """
+        if key is None:
+            self._layers.clear()
+            self._lines.clear()
+        else:
+            self._layers.pop(key, None)
+            self._lines.pop(key, None)
+
+    def _render_layer(self, landmarks):
+        """
+        在面部包围框大小的掩码上绘制网格（内部方法）
+
+        Args:
+            landmarks: (N, 2) 像素坐标特征点数组
+
+        Returns:
+            origin: 掩码在整帧中的左上角 (x0, y0)
+            mask: 整帧分辨率的布尔掩码，网格连线处为True
+        """
+        mesh = landmarks[self.point_indices]
+        x0, y0 = np.floor(mesh.min(axis=0)).astype(int) - self.thickness
+        x1, y1 = np.ceil(mesh.max(axis=0)).astype(int) + self.thickness + 1
+        width, height = max(x1 - x0, 1), max(y1 - y0, 1)
+
+        small = np.zeros((max(int(height * self.scale), 1), max(int(width * self.scale), 1)), dtype=np.uint8)
+        points = np.rint((landmarks - (x0, y0)) * self.scale).astype(np.int32)
+        cv2.polylines(small, points[self.edges], False, 255, self.thickness)
+        if small.shape != (height, width):
+            small = cv2.resize(small, (width, height), interpolation=cv2.INTER_NEAREST)
+        return (x0, y0), small > 0
+
+    def _composite(self, img, origin, mask):
+        """
+        将网格掩码叠加到图像上（内部方法）
+
+        Args:
+            img: 输入图像
+            origin: 掩码左上角 (x0, y0)
+            mask: 布尔掩码
+        """
+        h, w = img.shape[:2]
+        x0, y0 = origin
+        # 裁掉超出画面的部分
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x0 + mask.shape[1], w), min(y0 + mask.shape[0], h)
+        if cx1 <= cx0 or cy1 <= cy0:
+            return
+        img[cy0:cy1, cx0:cx1][mask[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]] = self.color
@@ -0,0 +1,111 @@
+"""
+帧指标模块
+每帧检测和评分完成后生成一次不可变的指标快照，供UI绘制、Web数据和结果输出共用
+"""
+
+import itertools
+import json
+
+
+# 快照版本号（全局递增，每个快照唯一）
+_versions = itertools.count(1)
+
+
+class FrameMetrics:
+    """
+    帧指标快照类
+    创建后不能修改，字典和JSON序列化在第一次需要时生成并缓存在快照上，
+    同一版本的快照被多次读取（如Web接口轮询）时只序列化一次
+    """
+
+    __slots__ = ('version', 'timestamp', 'source', 'ear', 'mar', 'total_blinks', 'yawn_count', 'nod_count',
+                 'blink_rate', 'perclos', 'eye_closed_duration', 'is_fatigued', 'is_yawning', 'is_head_down',
+                 'head_pose', 'fatigue_level', 'fatigue_score', '_dict', '_json')
+
+    FIELDS = __slots__[:-2]
+
+    def __init__(self, version=0, timestamp=None, source=None, ear=0.0, mar=0.0, total_blinks=0, yawn_count=0,
+                 nod_count=0, blink_rate=0.0, perclos=0.0, eye_closed_duration=0.0, is_fatigued=False,
+                 is_yawning=False, is_head_down=False, head_pose=None, fatigue_level=None, fatigue_score=0):
+        """
+        初始化帧指标快照（通常通过capture()创建，默认值表示尚无检测结果）
+
+        Args:
+            version: 快照版本号
+            timestamp: 帧时间戳（秒）
+            source: 检测器的事件来源（如人脸跟踪编号）
+            head_pose: (pitch, yaw, roll) 头部姿态角度（度），没有时为None
+            fatigue_level: 疲劳等级（FatigueLevel），尚未评分时为None
+            其余参数: 对应的疲劳指标
+        """
+        # __setattr__被禁用，直接调用槽描述符写入（与__slots__顺序一致，缓存初始为None）
+        values = (version, timestamp, source, ear, mar, total_blinks, yawn_count, nod_count, blink_rate, perclos,
+                  eye_closed_duration, is_fatigued, is_yawning, is_head_down, head_pose, fatigue_level,
+                  fatigue_score, None, None)
+        for setter, value in zip(_SLOT_SETTERS, values):
+            setter(self, value)
+
+    @classmethod
+    def capture(cls, fatigue_detector, fatigue_level_calculator):
+        """
+        从检测器和评分结果生成快照
+
+        疲劳等级、评分、眨眼频率和PERCLOS直接取自评分计算器最近一次计算的指标（latest），不再查询统计窗口
+
+        Args:
+            fatigue_detector: 疲劳检测器实例（本帧已完成检测）
+            fatigue_level_calculator: 疲劳等级计算器实例（本帧已完成评分）
+
+        Returns:
+            metrics: FrameMetrics实例
+        """
+        detector = fatigue_detector
+        latest = fatigue_level_calculator.latest
+        if latest is None:
+            blink_rate = perclos = 0.0
+            fatigue_level, fatigue_score = None, 0
+        else:
+            blink_rate, perclos = latest['blink_rate'], latest['perclos']
+            fatigue_level, fatigue_score = latest['level'], latest['score']
+        return cls(next(_versions), detector.last_timestamp, detector.source,
+                   detector.current_ear, detector.current_mar, detector.total_blinks, detector.yawn_counter,
+                   detector.nod_counter, blink_rate, perclos, detector.eye_closed_duration,
+                   detector.is_fatigued, detector.is_yawning, detector.is_head_down, detector.current_pose,
+                   fatigue_level, fatigue_score)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"FrameMetrics is immutable (cannot set '{name}')")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"FrameMetrics is immutable (cannot delete '{name}')")
+
+    def to_dict(self):
+        """
+        转换为字典（疲劳等级输出为名称，结果缓存，调用方不应修改）
+
+        Returns:
+            data: 指标字典
+        """
+        if self._dict is None:
+            data = {name: getattr(self, name) for name in self.FIELDS}
+            data['fatigue_level'] = self.fatigue_level.get_name() if self.fatigue_level is not None else 'Normal'
+            object.__setattr__(self, '_dict', data)
+        return self._dict
+
+    def to_json(self):
+        """
+        转换为JSON字符串（结果缓存）
+
+        Returns:
+            text: JSON对象字符串
+        """
+        if self._json is None:
+            object.__setattr__(self, '_json', json.dumps(self.to_dict()))
+        return self._json
+
+    def __repr__(self):
+        return f"FrameMetrics(version={self.version}, timestamp={self.timestamp}, score={self.fatigue_score})"
+
+
+# 各槽的写入函数（按__slots__顺序）
+_SLOT_SETTERS = tuple(getattr(FrameMetrics, name).__set__ for name in FrameMetrics.__slots__)
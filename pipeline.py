@@ -0,0 +1,194 @@
+"""
+检测流水线模块
+无界面地串联 FaceDetector → FatigueDetector → FatigueLevelCalculator
+"""
+
+import config
+from face_detector import FaceDetector
+from landmark_tracker import LandmarkTracker
+from fatigue_detector import FatigueDetector
+from fatigue_level import FatigueLevelCalculator
+from metrics import FrameMetrics
+from tracer import tracer
+
+
+class FrameResult:
+    """
+    单帧检测结果
+    只保存数值指标，便于写入文件或跨进程传输
+    """
+
+    __slots__ = ('frame_index', 'timestamp', 'face_detected', 'ear', 'mar',
+                 'total_blinks', 'yawn_count', 'blink_rate', 'eye_closed_duration',
+                 'is_fatigued', 'is_yawning', 'fatigue_level', 'fatigue_score', 'perclos',
+                 'pitch', 'yaw', 'roll', 'nod_count')
+
+    FIELDS = __slots__
+
+    def __init__(self, frame_index, timestamp, face_detected=False, ear=0.0, mar=0.0,
+                 total_blinks=0, yawn_count=0, blink_rate=0.0, eye_closed_duration=0.0,
+                 is_fatigued=False, is_yawning=False, fatigue_level=0, fatigue_score=0, perclos=0.0,
+                 pitch=0.0, yaw=0.0, roll=0.0, nod_count=0):
+        """
+        初始化单帧检测结果
+
+        Args:
+            frame_index: 帧序号
+            timestamp: 帧时间戳（秒）
+            其余参数: 对应的疲劳指标，fatigue_level为FatigueLevel的整数值，pitch/yaw/roll为头部姿态角度（度）
+        """
+        self.frame_index = frame_index
+        self.timestamp = timestamp
+        self.face_detected = face_detected
+        self.ear = ear
+        self.mar = mar
+        self.total_blinks = total_blinks
+        self.yawn_count = yawn_count
+        self.blink_rate = blink_rate
+        self.eye_closed_duration = eye_closed_duration
+        self.is_fatigued = is_fatigued
+        self.is_yawning = is_yawning
+        self.fatigue_level = fatigue_level
+        self.fatigue_score = fatigue_score
+        self.perclos = perclos
+        self.pitch = pitch
+        self.yaw = yaw
+        self.roll = roll
+        self.nod_count = nod_count
+
+    def to_tuple(self):
+        """
+        转换为紧凑元组（用于跨进程传输）
+
+        Returns:
+            values: 与FIELDS顺序一致的元组
+        """
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    @classmethod
+    def from_metrics(cls, frame_index, metrics):
+        """
+        由帧指标快照生成检测结果
+
+        Args:
+            frame_index: 帧序号
+            metrics: FrameMetrics实例
+
+        Returns:
+            result: FrameResult实例（face_detected为True）
+        """
+        pitch, yaw, roll = metrics.head_pose if metrics.head_pose is not None else (0.0, 0.0, 0.0)
+        return cls(frame_index, metrics.timestamp, True, metrics.ear, metrics.mar,
+                   metrics.total_blinks, metrics.yawn_count, metrics.blink_rate, metrics.eye_closed_duration,
+                   metrics.is_fatigued, metrics.is_yawning, metrics.fatigue_level.value, metrics.fatigue_score,
+                   metrics.perclos, pitch, yaw, roll, metrics.nod_count)
+
+    @classmethod
+    def from_tuple(cls, values):
+        """
+        从紧凑元组还原检测结果
+
+        Args:
+            values: to_tuple()的返回值
+
+        Returns:
+            result: FrameResult实例
+        """
+        return cls(*values)
+
+    def to_row(self):
+        """
+        转换为CSV行
+
+        Returns:
+            row: 与FIELDS顺序一致的值列表
+        """
+        return [
+            self.frame_index,
+            f"{self.timestamp:.3f}",
+            int(self.face_detected),
+            f"{self.ear:.4f}",
+            f"{self.mar:.4f}",
+            self.total_blinks,
+            self.yawn_count,
+            f"{self.blink_rate:.2f}",
+            f"{self.eye_closed_duration:.2f}",
+            int(self.is_fatigued),
+            int(self.is_yawning),
+            self.fatigue_level,
+            self.fatigue_score,
+            f"{self.perclos:.4f}",
+            f"{self.pitch:.1f}",
+            f"{self.yaw:.1f}",
+            f"{self.roll:.1f}",
+            self.nod_count
+        ]
+
+
+class DetectionPipeline:
+    """
+    检测流水线类
+    不绘制、不显示、不报警，只计算每帧的疲劳指标
+    """
+
+    def __init__(self, face_detector=None, tracking=None, event_bus=None):
+        """
+        初始化检测流水线
+
+        Args:
+            face_detector: FaceDetector实例（可选，默认新建）
+            tracking: 是否在推理之间用光流跟踪关键特征点（默认读取config.LANDMARK_TRACKING_ENABLED）
+            event_bus: 事件总线（可选），每帧发布检测器和等级计算器产生的事件
+        """
+        # FrameResult只描述一张人脸，默认检测器只检测一张
+        self.face_detector = face_detector or FaceDetector(max_num_faces=1)
+        if tracking is None:
+            tracking = config.LANDMARK_TRACKING_ENABLED
+        self.fatigue_detector = FatigueDetector()
+        # 只提取信号检测插件需要的特征点
+        self.landmark_indices = self.fatigue_detector.plugins.indices
+        self.landmark_tracker = LandmarkTracker(self.face_detector, self.landmark_indices) if tracking else None
+        self.fatigue_level_calculator = FatigueLevelCalculator()
+        self.event_bus = event_bus
+        self.frame_count = 0
+        self.metrics = FrameMetrics()  # 最近一次检测到人脸的帧指标快照
+
+    def process(self, img, timestamp):
+        """
+        处理单帧图像
+
+        Args:
+            img: 输入图像（BGR格式）
+            timestamp: 帧时间戳（秒），来自视频文件而非系统时钟
+
+        Returns:
+            result: FrameResult实例
+        """
+        self.frame_count += 1
+
+        if self.landmark_tracker is not None:
+            landmarks, _ = self.landmark_tracker.process(img)
+            if landmarks is None:
+                return FrameResult(self.frame_count, timestamp)
+        else:
+            results = self.face_detector.process(img)
+            if not results.multi_face_landmarks:
+                return FrameResult(self.frame_count, timestamp)
+
+            face_landmarks = results.multi_face_landmarks[0]
+            # 只提取检测用到的特征点
+            landmarks = self.face_detector.get_landmarks_array(
+                face_landmarks, img.shape, indices=self.landmark_indices
+            )
+
+        detector = self.fatigue_detector
+        with tracer.span('fatigue.detect'):
+            detector.detect(landmarks, timestamp, img.shape)
+        with tracer.span('fatigue.score'):
+            self.fatigue_level_calculator.calculate(detector)
+        if self.event_bus is not None:
+            self.event_bus.publish_all(detector.events)
+            self.event_bus.publish_all(self.fatigue_level_calculator.events)
+
+        self.metrics = FrameMetrics.capture(detector, self.fatigue_level_calculator)
+        return FrameResult.from_metrics(self.frame_count, self.metrics)
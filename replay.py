@@ -0,0 +1,212 @@
+"""
+离线回放模块
+对录制的视频或图片序列进行无界面批量检测，按文件时间戳驱动
+"""
+
+import os
+import csv
+import glob
+import time
+
+import cv2
+
+import config
+from pipeline import DetectionPipeline, FrameResult
+from buffer_pool import frame_pool
+from events import EventBus, EventLogger
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm', '.wmv', '.flv', '.mpg', '.mpeg', '.ts')
+
+
+def resolve_input(source):
+    """
+    解析输入源
+
+    Args:
+        source: 视频文件、图片目录或通配符路径
+
+    Returns:
+        kind: 'video' 或 'images'
+        paths: 文件路径列表（已排序）
+
+    Raises:
+        ValueError: 通配符同时匹配到视频和图片（两者的时间戳无法拼接），或没有匹配到任何视频和图片时
+    """
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        return 'images', paths
+
+    if glob.has_magic(source):
+        # 只接受已知扩展名的视频和图片，其他文件（如上次回放输出的CSV、事件日志）跳过
+        paths = sorted(glob.glob(source))
+        images = [p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)]
+        videos = [p for p in paths if p.lower().endswith(VIDEO_EXTENSIONS)]
+        if images and videos:
+            raise ValueError(f"Input pattern matches both videos and images: {source} "
+                             f"({len(videos)} videos, {len(images)} images)")
+        if images:
+            return 'images', images
+        if videos:
+            return 'video', videos
+        raise ValueError(f"Input pattern matches no videos or images: {source}")
+
+    if source.lower().endswith(IMAGE_EXTENSIONS):
+        return 'images', [source]
+
+    return 'video', [source]
+
+
+def iter_video_frames(path, pool=None):
+    """
+    逐帧读取视频文件
+
+    Args:
+        path: 视频文件路径
+        pool: 帧缓冲池（可选），提供时读入池中的缓冲区，消费者处理完需调用pool.release(img)
+
+    Yields:
+        img: 帧图像（BGR格式）
+        timestamp: 帧在视频中的时间戳（秒）
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"Error: Cannot open video {path}")
+        return
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or config.REPLAY_DEFAULT_FPS
+    index = 0
+    shape = None
+    try:
+        while True:
+            buf = pool.acquire(shape) if pool is not None and shape is not None else None
+            success, img = cap.read(buf)
+            if buf is not None and (not success or img is not buf):
+                pool.release(buf)
+            if not success:
+                break
+            shape = img.shape
+            # 优先使用容器时间戳，不可用时按帧率推算
+            pos_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if pos_msec > 0 or index == 0:
+                timestamp = pos_msec / 1000.0
+            else:
+                timestamp = index / fps
+            index += 1
+            yield img, timestamp
+    finally:
+        cap.release()
+
+
+def iter_image_frames(paths, fps=None):
+    """
+    逐张读取图片序列
+
+    Args:
+        paths: 图片路径列表
+        fps: 图片序列对应的帧率，用于生成时间戳
+
+    Yields:
+        img: 图像（BGR格式）
+        timestamp: 按序号和帧率推算的时间戳（秒）
+    """
+    fps = fps or config.REPLAY_DEFAULT_FPS
+    for index, path in enumerate(paths):
+        img = cv2.imread(path)
+        if img is None:
+            print(f"Warning: Cannot read image {path}, skipped")
+            continue
+        yield img, index / fps
+
+
+def iter_input_frames(source, fps=None, pool=None):
+    """
+    按输入源类型逐帧读取画面
+
+    多个视频依次拼接，后一个视频的时间戳接在前一个之后（间隔为前一个视频自身的帧间隔），保证时间单调递增
+
+    Args:
+        source: 视频文件、图片目录或通配符路径
+        fps: 图片序列帧率（仅图片输入有效）
+        pool: 帧缓冲池（可选，仅视频输入有效）
+
+    Yields:
+        img: 帧图像（BGR格式）
+        timestamp: 帧时间戳（秒）
+    """
+    kind, paths = resolve_input(source)
+    if kind == 'images':
+        yield from iter_image_frames(paths, fps)
+        return
+
+    offset = 0.0
+    for path in paths:
+        timestamps = [0.0, 0.0]  # 该视频最后两帧的时间戳
+        for img, timestamp in iter_video_frames(path, pool):
+            timestamps = [timestamps[1], timestamp]
+            yield img, offset + timestamp
+        # 拼接间隔取该视频最后两帧的时间差，不足两帧时按默认帧率
+        interval = timestamps[1] - timestamps[0]
+        if interval <= 0.0:
+            interval = 1.0 / config.REPLAY_DEFAULT_FPS
+        offset += timestamps[1] + interval
+
+
+def run_replay(source, output_path, fps=None, tracking=None, events_path=None):
+    """
+    运行离线回放，不限速、不显示、不启动Web服务器
+
+    Args:
+        source: 视频文件、图片目录或通配符路径
+        output_path: 逐帧指标输出文件（CSV）
+        fps: 图片序列帧率
+        tracking: 是否启用光流跟踪混合模式（默认读取config.LANDMARK_TRACKING_ENABLED）
+        events_path: 事件日志输出文件（JSON Lines，可选）
+
+    Returns:
+        frame_count: 处理的帧数
+    """
+    event_bus = None
+    event_logger = None
+    if events_path:
+        event_bus = EventBus()
+        event_logger = event_bus.subscribe(EventLogger(events_path))
+    pipeline = DetectionPipeline(tracking=tracking, event_bus=event_bus)
+
+    print(f"Replaying: {source}")
+    print(f"Metrics output: {output_path}")
+
+    frame_count = 0
+    face_frames = 0
+    start = time.perf_counter()
+
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FrameResult.FIELDS)
+        for img, timestamp in iter_input_frames(source, fps, frame_pool):
+            try:
+                result = pipeline.process(img, timestamp)
+            finally:
+                # 处理出错时也归还缓冲区
+                frame_pool.release(img)
+            writer.writerow(result.to_row())
+            frame_count += 1
+            face_frames += result.face_detected
+
+    elapsed = time.perf_counter() - start
+    throughput = frame_count / elapsed if elapsed > 0 else 0.0
+
+    print(f"Frames processed: {frame_count} (face detected in {face_frames})")
+    print(f"Processing time: {elapsed:.1f}s")
+    print(f"Throughput: {throughput:.1f} frames/s")
+    if pipeline.landmark_tracker is not None:
+        pipeline.landmark_tracker.print_stats()
+    pipeline.fatigue_level_calculator.print_stats()
+    frame_pool.print_stats()
+    if event_logger is not None:
+        event_logger.close()
+    return frame_count
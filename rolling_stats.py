@@ -0,0 +1,303 @@
+"""
+滑动窗口统计模块
+按时间窗口（如10秒、60秒、5分钟）增量统计PERCLOS、眨眼频率、平均眨眼时长、打哈欠频率和点头频率
+"""
+
+from collections import deque
+
+import config
+
+
+class TimeWindow:
+    """
+    单个时间窗口类
+    样本按时间戳顺序追加到队列，同时维护累计和；过期样本从队首移出并从累计和中扣除，
+    每个样本只进出队列一次，更新和查询均摊O(1)
+    """
+
+    def __init__(self, length):
+        """
+        初始化时间窗口
+
+        Args:
+            length: 窗口长度（秒）
+        """
+        self.length = length
+        self.min_observed = min(length / 2.0, config.ROLLING_MIN_OBSERVED)
+
+        # 逐帧样本 (时间戳, 覆盖时长, 闭眼时长) 及其累计和
+        self.frames = deque()
+        self.observed_time = 0.0
+        self.closed_time = 0.0
+
+        # 眨眼事件 (时间戳, 眨眼时长)，打哈欠和点头事件时间戳
+        self.blinks = deque()
+        self.blink_duration_sum = 0.0
+        self.yawns = deque()
+        self.nods = deque()
+
+    def add_frame(self, timestamp, interval, eyes_closed):
+        """
+        添加一帧样本
+
+        Args:
+            timestamp: 帧时间戳（秒）
+            interval: 该帧覆盖的时长（秒，即与上一帧的间隔）
+            eyes_closed: 该帧是否闭眼
+        """
+        closed = interval if eyes_closed else 0.0
+        self.frames.append((timestamp, interval, closed))
+        self.observed_time += interval
+        self.closed_time += closed
+        self.expire(timestamp)
+
+    def add_blink(self, timestamp, duration):
+        """
+        添加一次眨眼
+
+        Args:
+            timestamp: 眨眼结束的时间戳（秒）
+            duration: 眨眼时长（秒）
+        """
+        self.blinks.append((timestamp, duration))
+        self.blink_duration_sum += duration
+
+    def add_yawn(self, timestamp):
+        """
+        添加一次打哈欠
+
+        Args:
+            timestamp: 打哈欠的时间戳（秒）
+        """
+        self.yawns.append(timestamp)
+
+    def add_nod(self, timestamp):
+        """
+        添加一次点头
+
+        Args:
+            timestamp: 点头（抬头）的时间戳（秒）
+        """
+        self.nods.append(timestamp)
+
+    def expire(self, now):
+        """
+        移出窗口之外的样本和事件
+
+        Args:
+            now: 当前时间戳（秒）
+        """
+        start = now - self.length
+        frames = self.frames
+        while frames and frames[0][0] <= start:
+            _, interval, closed = frames.popleft()
+            self.observed_time -= interval
+            self.closed_time -= closed
+        if not frames:
+            # 窗口清空时归零，避免浮点累计误差
+            self.observed_time = self.closed_time = 0.0
+
+        blinks = self.blinks
+        while blinks and blinks[0][0] <= start:
+            self.blink_duration_sum -= blinks.popleft()[1]
+        if not blinks:
+            self.blink_duration_sum = 0.0
+
+        yawns = self.yawns
+        while yawns and yawns[0] <= start:
+            yawns.popleft()
+
+        nods = self.nods
+        while nods and nods[0] <= start:
+            nods.popleft()
+
+    def next_expiry(self):
+        """
+        获取窗口内的事件计数下一次发生跳变的时间
+
+        观测时间不足min_observed时频率恒为0，达到时才跳变为实际值，此期间每次都视为即将跳变
+
+        Returns:
+            timestamp: 最早的眨眼/打哈欠/点头移出窗口的时间戳（秒），观测时间不足时为-inf，没有事件时为None
+        """
+        if self.observed_time < self.min_observed:
+            return float('-inf')
+        oldest = [events[0] for events in (self.yawns, self.nods) if events]
+        if self.blinks:
+            oldest.append(self.blinks[0][0])
+        if not oldest:
+            return None
+        return min(oldest) + self.length
+
+    def perclos(self):
+        """
+        获取PERCLOS（窗口内闭眼时间占观测时间的比例）
+
+        Returns:
+            perclos: 0-1之间的比例，尚无观测时为0
+        """
+        if self.observed_time <= 0:
+            return 0.0
+        return min(max(self.closed_time / self.observed_time, 0.0), 1.0)
+
+    def blink_rate(self):
+        """
+        获取眨眼频率，按实际观测时间折算（人脸丢失的时间不计入），观测时间不足min_observed时为0
+
+        Returns:
+            blink_rate: 眨眼频率（次/分钟）
+        """
+        if self.observed_time < self.min_observed:
+            return 0.0
+        return len(self.blinks) / self.observed_time * 60.0
+
+    def mean_blink_duration(self):
+        """
+        获取平均眨眼时长
+
+        Returns:
+            duration: 平均眨眼时长（秒），窗口内没有眨眼时为0
+        """
+        if not self.blinks:
+            return 0.0
+        return self.blink_duration_sum / len(self.blinks)
+
+    def yawn_rate(self):
+        """
+        获取打哈欠频率，按实际观测时间折算
+
+        Returns:
+            yawn_rate: 打哈欠频率（次/分钟）
+        """
+        if self.observed_time < self.min_observed:
+            return 0.0
+        return len(self.yawns) / self.observed_time * 60.0
+
+    def nod_rate(self):
+        """
+        获取点头频率，按实际观测时间折算
+
+        Returns:
+            nod_rate: 点头频率（次/分钟）
+        """
+        if self.observed_time < self.min_observed:
+            return 0.0
+        return len(self.nods) / self.observed_time * 60.0
+
+    def clear(self):
+        """
+        清除所有样本和事件
+        """
+        self.frames.clear()
+        self.blinks.clear()
+        self.yawns.clear()
+        self.nods.clear()
+        self.observed_time = self.closed_time = self.blink_duration_sum = 0.0
+
+
+class RollingStats:
+    """
+    滑动窗口统计类
+    同时维护多个长度的时间窗口，由FatigueDetector逐帧喂入样本和事件
+    """
+
+    def __init__(self, windows=None):
+        """
+        初始化滑动窗口统计
+
+        Args:
+            windows: 窗口长度列表（秒，默认config.ROLLING_WINDOWS）
+        """
+        lengths = config.ROLLING_WINDOWS if windows is None else windows
+        self.windows = {length: TimeWindow(length) for length in lengths}
+
+    def add_frame(self, timestamp, interval, eyes_closed):
+        """
+        向所有窗口添加一帧样本
+
+        Args:
+            timestamp: 帧时间戳（秒）
+            interval: 该帧覆盖的时长（秒）
+            eyes_closed: 该帧是否闭眼
+        """
+        for window in self.windows.values():
+            window.add_frame(timestamp, interval, eyes_closed)
+
+    def add_blink(self, timestamp, duration):
+        """
+        向所有窗口添加一次眨眼
+
+        Args:
+            timestamp: 眨眼结束的时间戳（秒）
+            duration: 眨眼时长（秒）
+        """
+        for window in self.windows.values():
+            window.add_blink(timestamp, duration)
+
+    def add_yawn(self, timestamp):
+        """
+        向所有窗口添加一次打哈欠
+
+        Args:
+            timestamp: 打哈欠的时间戳（秒）
+        """
+        for window in self.windows.values():
+            window.add_yawn(timestamp)
+
+    def add_nod(self, timestamp):
+        """
+        向所有窗口添加一次点头
+
+        Args:
+            timestamp: 点头的时间戳（秒）
+        """
+        for window in self.windows.values():
+            window.add_nod(timestamp)
+
+    def window(self, length=None):
+        """
+        获取指定长度的窗口
+
+        Args:
+            length: 窗口长度（秒，默认config.FATIGUE_STATS_WINDOW）
+
+        Returns:
+            window: TimeWindow实例
+        """
+        return self.windows[config.FATIGUE_STATS_WINDOW if length is None else length]
+
+    def get_stats(self, length=None):
+        """
+        获取指定窗口的全部统计量
+
+        Args:
+            length: 窗口长度（秒，默认config.FATIGUE_STATS_WINDOW）
+
+        Returns:
+            stats: {'window', 'perclos', 'blink_rate', 'mean_blink_duration', 'yawn_rate', 'nod_rate'}
+        """
+        window = self.window(length)
+        return {
+            'window': window.length,
+            'perclos': window.perclos(),
+            'blink_rate': window.blink_rate(),
+            'mean_blink_duration': window.mean_blink_duration(),
+            'yawn_rate': window.yawn_rate(),
+            'nod_rate': window.nod_rate()
+        }
+
+    def get_all_stats(self):
+        """
+        获取所有窗口的统计量
+
+        Returns:
+            stats: {窗口长度: get_stats()的返回值}
+        """
+        return {length: self.get_stats(length) for length in self.windows}
+
+    def reset(self):
+        """
+        清除所有窗口
+        """
+        for window in self.windows.values():
+            window.clear()
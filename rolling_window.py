@@ -0,0 +1,285 @@
+"""
+滑动窗口模块
+基于NumPy环形缓冲区的数值序列，按帧数或秒数窗口查询平均值、趋势、最小值和最大值
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+# 缓冲区的初始长度，写满后加倍直到capacity
+_INITIAL_SIZE = 64
+
+
+class _WindowState:
+    """
+    已注册窗口的增量状态（内部类）
+    窗口起点只向前移动，最小/最大值用单调队列维护，新样本在查询时补充处理，
+    每个样本只进出一次，查询均摊O(1)
+    """
+
+    __slots__ = ('start', 'previous_start', 'processed', 'max_queue', 'min_queue')
+
+    def __init__(self):
+        self.start = 0            # 窗口内第一个样本的序号
+        self.previous_start = 0   # 前一个等长窗口（时间窗口）第一个样本的序号
+        self.processed = 0        # 单调队列已处理到的样本序号
+        self.max_queue = deque()  # (序号, 值)，值单调递减
+        self.min_queue = deque()  # (序号, 值)，值单调递增
+
+
+class RollingWindow:
+    """
+    滑动窗口类
+    样本值和时间戳写入环形缓冲区，同时保存每个样本之前的累计和（前缀和），
+    任意帧数窗口的和为两个前缀和之差；构造时注册的窗口另外维护起点指针和单调队列。
+    缓冲区按实际写入的样本数加倍增长，达到capacity后才开始覆盖最早的样本，
+    写入较少（短时轨迹、增量评分）时不占用capacity对应的全部内存
+    """
+
+    def __init__(self, capacity, frame_windows=(), time_windows=()):
+        """
+        初始化滑动窗口
+
+        Args:
+            capacity: 最多保留的样本数，更早的样本被覆盖
+            frame_windows: 注册的帧数窗口（最小/最大值均摊O(1)）
+            time_windows: 注册的时间窗口（秒，起点、最小/最大值均摊O(1)）
+        """
+        self.capacity = capacity
+        self._size = min(capacity, _INITIAL_SIZE)  # 当前缓冲区长度
+        self.values = np.zeros(self._size)
+        self.timestamps = np.zeros(self._size)
+        self._prefix = np.zeros(self._size)  # 第k个样本之前所有样本的和，存放在 k % self._size
+        self.count = 0                     # 累计写入的样本数
+        self.total = 0.0                   # 累计写入的样本和
+        self._windows = {('frames', int(n)): _WindowState() for n in frame_windows}
+        self._windows.update({('seconds', float(s)): _WindowState() for s in time_windows})
+
+    def __len__(self):
+        """
+        当前保留的样本数
+        """
+        return min(self.count, self.capacity)
+
+    def append(self, value, timestamp=0.0):
+        """
+        追加一个样本
+
+        Args:
+            value: 样本值
+            timestamp: 样本时间戳（秒，使用时间窗口时必须单调不减）
+        """
+        if self.count == self._size < self.capacity:
+            self._grow()
+        slot = self.count % self._size
+        self._prefix[slot] = self.total
+        self.values[slot] = value
+        self.timestamps[slot] = timestamp
+        self.total += value
+        self.count += 1
+
+    def _grow(self):
+        """
+        把缓冲区长度加倍（内部方法，不超过capacity）
+
+        只在缓冲区写满且尚未覆盖任何样本时调用，此时第k个样本位于k，复制后位置不变
+        """
+        size = min(2 * self._size, self.capacity)
+        for name in ('values', 'timestamps', '_prefix'):
+            array = np.zeros(size)
+            array[:self._size] = getattr(self, name)
+            setattr(self, name, array)
+        self._size = size
+
+    def _oldest(self):
+        """
+        仍在缓冲区中的最早样本序号（内部方法）
+        """
+        return self.count - len(self)
+
+    def _first_after(self, cutoff, start):
+        """
+        从start开始查找第一个时间戳晚于cutoff的样本序号（内部方法，二分查找）
+
+        Args:
+            cutoff: 时间戳下限（不含）
+            start: 查找起点序号
+
+        Returns:
+            index: 样本序号，没有时为self.count
+        """
+        low, high = start, self.count
+        timestamps = self.timestamps
+        size = self._size
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[middle % size] <= cutoff:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _advance(self, index, cutoff):
+        """
+        把起点序号向前移动到第一个时间戳晚于cutoff的样本（内部方法）
+
+        Args:
+            index: 当前起点序号
+            cutoff: 时间戳下限（不含）
+
+        Returns:
+            index: 新的起点序号
+        """
+        index = max(index, self._oldest())
+        timestamps = self.timestamps
+        size = self._size
+        count = self.count
+        while index < count and timestamps[index % size] <= cutoff:
+            index += 1
+        return index
+
+    def _bounds(self, frames, seconds):
+        """
+        计算窗口及其前一个等长窗口的起点（内部方法）
+
+        Args:
+            frames: 窗口帧数
+            seconds: 窗口秒数（frames为None时使用）
+
+        Returns:
+            start: 窗口第一个样本的序号
+            previous_start: 前一个窗口第一个样本的序号，缓冲区不足以覆盖前一个完整窗口时为None
+            state: 注册窗口的状态，未注册时为None
+        """
+        oldest = self._oldest()
+        if frames is not None:
+            state = self._windows.get(('frames', frames))
+            start = max(self.count - frames, oldest)
+            previous_start = self.count - 2 * frames
+            return start, (previous_start if previous_start >= oldest else None), state
+
+        state = self._windows.get(('seconds', float(seconds)))
+        now = self.timestamps[(self.count - 1) % self._size] if self.count else 0.0
+        if state is not None:
+            state.start = start = self._advance(state.start, now - seconds)
+            state.previous_start = previous_start = self._advance(state.previous_start, now - 2 * seconds)
+        else:
+            start = self._first_after(now - seconds, oldest)
+            previous_start = self._first_after(now - 2 * seconds, oldest)
+        # 最早的样本晚于前一个窗口的起点，说明历史不足以覆盖前一个完整窗口
+        if not self.count or self.timestamps[oldest % self._size] > now - 2 * seconds:
+            previous_start = None
+        return start, previous_start, state
+
+    def _sum(self, start, end):
+        """
+        序号 [start, end) 范围内样本的和（内部方法）
+        """
+        if start >= end:
+            return 0.0
+        end_prefix = self.total if end == self.count else self._prefix[end % self._size]
+        return end_prefix - self._prefix[start % self._size]
+
+    def mean(self, frames=None, seconds=None):
+        """
+        获取窗口平均值
+
+        Args:
+            frames: 窗口帧数
+            seconds: 窗口秒数（frames为None时使用）
+
+        Returns:
+            mean: 窗口内样本的平均值，没有样本时为0
+        """
+        start, _, _ = self._bounds(frames, seconds)
+        size = self.count - start
+        return self._sum(start, self.count) / size if size else 0.0
+
+    def trend(self, frames=None, seconds=None):
+        """
+        获取趋势（窗口平均值减去前一个等长窗口的平均值）
+
+        Args:
+            frames: 窗口帧数
+            seconds: 窗口秒数（frames为None时使用）
+
+        Returns:
+            delta: 平均值之差，历史不足两个窗口时为None
+        """
+        start, previous_start, _ = self._bounds(frames, seconds)
+        if previous_start is None or previous_start >= start or start >= self.count:
+            return None
+        current = self._sum(start, self.count) / (self.count - start)
+        previous = self._sum(previous_start, start) / (start - previous_start)
+        return current - previous
+
+    def extremes(self, frames=None, seconds=None):
+        """
+        获取窗口最小值和最大值
+
+        注册窗口用单调队列增量维护，未注册的窗口直接在窗口切片上计算
+
+        Args:
+            frames: 窗口帧数
+            seconds: 窗口秒数（frames为None时使用）
+
+        Returns:
+            minimum: 窗口最小值，没有样本时为0
+            maximum: 窗口最大值，没有样本时为0
+        """
+        start, _, state = self._bounds(frames, seconds)
+        if start >= self.count:
+            return 0.0, 0.0
+        if state is None:
+            window = self.to_array(start)
+            return float(window.min()), float(window.max())
+
+        max_queue = state.max_queue
+        min_queue = state.min_queue
+        values = self.values
+        size = self._size
+        for index in range(max(state.processed, self._oldest()), self.count):
+            value = values[index % size]
+            while max_queue and max_queue[-1][1] <= value:
+                max_queue.pop()
+            max_queue.append((index, value))
+            while min_queue and min_queue[-1][1] >= value:
+                min_queue.pop()
+            min_queue.append((index, value))
+        state.processed = self.count
+        while max_queue[0][0] < start:
+            max_queue.popleft()
+        while min_queue[0][0] < start:
+            min_queue.popleft()
+        return float(min_queue[0][1]), float(max_queue[0][1])
+
+    def to_array(self, start=None):
+        """
+        按时间顺序复制样本值
+
+        Args:
+            start: 起始样本序号（默认最早保留的样本）
+
+        Returns:
+            values: 样本值数组
+        """
+        start = self._oldest() if start is None else max(start, self._oldest())
+        slots = np.arange(start, self.count) % self._size
+        return self.values[slots]
+
+    def reset(self):
+        """
+        清除所有样本和窗口状态
+        """
+        self.count = 0
+        self.total = 0.0
+        if self._size > _INITIAL_SIZE:
+            # 释放增长出的缓冲区
+            self._size = min(self.capacity, _INITIAL_SIZE)
+            self.values = np.zeros(self._size)
+            self.timestamps = np.zeros(self._size)
+            self._prefix = np.zeros(self._size)
+        for key in self._windows:
+            self._windows[key] = _WindowState()
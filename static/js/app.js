@@ -78,7 +78,10 @@ class FatigueDetectionApp {
         document.getElementById('total-blinks').textContent = data.total_blinks;
         document.getElementById('yawn-count').textContent = data.yawn_count;
         document.getElementById('blink-rate').textContent = `${data.blink_rate.toFixed(1)} /min`;
+        document.getElementById('perclos').textContent = `${(data.perclos * 100).toFixed(1)}%`;
         document.getElementById('eye-closed').textContent = `${data.eye_closed_duration.toFixed(1)}s`;
+        document.getElementById('nod-count').textContent = data.nod_count;
+        document.getElementById('head-pitch').textContent = data.head_pose ? `${data.head_pose[0].toFixed(0)}°` : '--';
         document.getElementById('runtime').textContent = data.runtime;
         document.getElementById('fps').textContent = data.fps;
     }
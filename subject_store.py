@@ -0,0 +1,231 @@
+"""
+多对象状态存储模块
+以结构数组（每个字段一个NumPy数组）保存大量对象（如集中评分的多辆车）的疲劳检测状态，
+检测和评分对一批对象一次向量化完成
+"""
+
+import numpy as np
+
+import config
+from fatigue_level import FatigueLevelCalculator
+from utils import calculate_ratios_batch
+
+
+class SubjectStore:
+    """
+    多对象状态存储类
+    与 FatigueDetector + FatigueLevelCalculator 的逐对象逻辑一致（眨眼、闭眼、打哈欠按帧时间戳计时），
+    滑动窗口统计按时间桶近似，每个对象约1.6KB（目标见config.SUBJECT_MEMORY_TARGET）
+    """
+
+    def __init__(self, capacity, window=None):
+        """
+        初始化多对象状态存储
+
+        Args:
+            capacity: 对象数量，对象编号为 0 ~ capacity-1
+            window: 统计窗口长度（秒，默认config.FATIGUE_STATS_WINDOW）
+        """
+        self.capacity = capacity
+        self.window = config.FATIGUE_STATS_WINDOW if window is None else window
+        self.num_buckets = config.SUBJECT_STATS_BUCKETS
+        self.bucket_length = self.window / self.num_buckets
+        self.min_observed = min(self.window / 2.0, config.ROLLING_MIN_OBSERVED)
+        self.epoch = None  # 时间基准，内部时间戳均相对该值保存
+        self.calculator = FatigueLevelCalculator()  # 提供评分权重和分段表
+
+        n = capacity
+        # 当前指标和计数
+        self.current_ear = np.zeros(n, dtype=np.float32)
+        self.current_mar = np.zeros(n, dtype=np.float32)
+        self.frames = np.zeros(n, dtype=np.int32)
+        self.total_blinks = np.zeros(n, dtype=np.int32)
+        self.yawn_counter = np.zeros(n, dtype=np.int32)
+        self.is_fatigued = np.zeros(n, dtype=bool)
+        self.is_yawning = np.zeros(n, dtype=bool)
+        self.fatigue_level = np.zeros(n, dtype=np.int8)
+        self.fatigue_score = np.zeros(n, dtype=np.int16)
+
+        # 计时状态（秒，NaN表示没有进行中的闭眼/张嘴）
+        self.last_timestamp = np.full(n, np.nan)
+        self.eye_closed_start = np.full(n, np.nan)
+        self.eye_closed_duration = np.zeros(n)
+        self.yawn_start = np.full(n, np.nan)
+        self.yawn_duration = np.zeros(n)
+
+        # 环形缓冲区，写入位置分别由 frames、total_blinks、yawn_counter 对长度取模得到
+        self.ear_history = np.zeros((n, config.EAR_HISTORY_LEN), dtype=np.float32)
+        self.mar_history = np.zeros((n, config.MAR_HISTORY_LEN), dtype=np.float32)
+        self.blink_times = np.full((n, config.SUBJECT_BLINK_RING_LEN), -np.inf, dtype=np.float32)
+        self.blink_durations = np.zeros((n, config.SUBJECT_BLINK_RING_LEN), dtype=np.float32)
+        self.yawn_times = np.full((n, config.SUBJECT_YAWN_RING_LEN), -np.inf, dtype=np.float32)
+
+        # 统计窗口时间桶：桶序号及桶内观测时长、闭眼时长
+        self.bucket_ids = np.full((n, self.num_buckets), -1, dtype=np.int32)
+        self.observed_time = np.zeros((n, self.num_buckets), dtype=np.float32)
+        self.closed_time = np.zeros((n, self.num_buckets), dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        """
+        所有状态数组占用的字节数
+        """
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def detect(self, ids, landmarks, timestamps):
+        """
+        对一批对象执行检测
+
+        Args:
+            ids: (F,) 对象编号（同一批内不能重复）
+            landmarks: (F, N, 2) 特征点坐标
+            timestamps: (F,) 帧时间戳（秒）
+        """
+        ear_left, ear_right, mar = calculate_ratios_batch(landmarks)
+        self.update(ids, (ear_left + ear_right) / 2.0, mar, timestamps)
+
+    def update(self, ids, ear, mar, timestamps):
+        """
+        用已计算的EAR/MAR更新一批对象的状态
+
+        Args:
+            ids: (F,) 对象编号（同一批内不能重复）
+            ear: (F,) 双眼平均纵横比
+            mar: (F,) 嘴部纵横比
+            timestamps: (F,) 帧时间戳（秒）
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        ear = np.asarray(ear, dtype=np.float32)
+        mar = np.asarray(mar, dtype=np.float32)
+        t = np.asarray(timestamps, dtype=np.float64)
+        if self.epoch is None:
+            self.epoch = float(t.min()) if t.size else 0.0
+        t = t - self.epoch
+
+        # 帧间隔；间隔过长时放弃进行中的计时（比较NaN为False，首帧间隔为0）
+        elapsed = t - self.last_timestamp[ids]
+        gap = elapsed > config.DETECTION_MAX_GAP
+        interval = np.where(elapsed <= config.DETECTION_MAX_GAP, np.maximum(elapsed, 0.0), 0.0)
+        self.last_timestamp[ids] = t
+
+        self.current_ear[ids] = ear
+        self.current_mar[ids] = mar
+        position = self.frames[ids] % self.ear_history.shape[1]
+        self.ear_history[ids, position] = ear
+        self.mar_history[ids, position % self.mar_history.shape[1]] = mar
+        self.frames[ids] += 1
+
+        # 眨眼检测
+        closed = ear < config.EAR_THRESHOLD
+        start = np.where(gap, np.nan, self.eye_closed_start[ids])
+        duration = np.where(gap, 0.0, self.eye_closed_duration[ids])
+        blink = ~closed & ~np.isnan(start) & (duration < config.EYE_CLOSED_DURATION)
+        if blink.any():
+            blink_ids = ids[blink]
+            slot = self.total_blinks[blink_ids] % self.blink_times.shape[1]
+            self.blink_times[blink_ids, slot] = t[blink]
+            self.blink_durations[blink_ids, slot] = duration[blink]
+            self.total_blinks[blink_ids] += 1
+        start = np.where(closed, np.where(np.isnan(start), t, start), np.nan)
+        duration = np.where(closed, t - start + interval, 0.0)
+        self.eye_closed_start[ids] = start
+        self.eye_closed_duration[ids] = duration
+        self.is_fatigued[ids] = duration >= config.EYE_CLOSED_DURATION
+
+        # 打哈欠检测
+        opened = mar > config.MOUTH_AR_THRESHOLD
+        start = np.where(gap, np.nan, self.yawn_start[ids])
+        duration = np.where(gap, 0.0, self.yawn_duration[ids])
+        yawn = ~opened & ~np.isnan(start) & (duration >= config.YAWN_DURATION)
+        if yawn.any():
+            yawn_ids = ids[yawn]
+            slot = self.yawn_counter[yawn_ids] % self.yawn_times.shape[1]
+            self.yawn_times[yawn_ids, slot] = t[yawn]
+            self.yawn_counter[yawn_ids] += 1
+        start = np.where(opened, np.where(np.isnan(start), t, start), np.nan)
+        duration = np.where(opened, t - start + interval, 0.0)
+        self.yawn_start[ids] = start
+        self.yawn_duration[ids] = duration
+        self.is_yawning[ids] = duration >= config.YAWN_DURATION
+
+        # 累加到当前时间桶，桶序号变化时先清空该桶的旧数据
+        bucket = np.floor(t / self.bucket_length).astype(np.int32)
+        slot = bucket % self.num_buckets
+        stale = self.bucket_ids[ids, slot] != bucket
+        self.observed_time[ids[stale], slot[stale]] = 0.0
+        self.closed_time[ids[stale], slot[stale]] = 0.0
+        self.bucket_ids[ids, slot] = bucket
+        self.observed_time[ids, slot] += interval
+        self.closed_time[ids, slot] += np.where(closed, interval, 0.0)
+
+    def get_stats(self, ids=None):
+        """
+        获取一批对象统计窗口内的统计量
+
+        Args:
+            ids: 对象编号数组（默认全部对象）
+
+        Returns:
+            stats: {'perclos', 'blink_rate', 'mean_blink_duration', 'yawn_rate'}，每项为 (F,) 数组
+        """
+        ids = np.arange(self.capacity) if ids is None else np.asarray(ids, dtype=np.intp)
+        now = self.last_timestamp[ids]
+        valid = self.bucket_ids[ids] > (np.floor(now / self.bucket_length) - self.num_buckets)[:, None]
+        observed = np.where(valid, self.observed_time[ids], 0.0).sum(axis=1)
+        closed = np.where(valid, self.closed_time[ids], 0.0).sum(axis=1)
+
+        window_start = (now - self.window)[:, None]
+        blinks = self.blink_times[ids] > window_start
+        blink_count = blinks.sum(axis=1)
+        yawn_count = (self.yawn_times[ids] > window_start).sum(axis=1)
+        blink_duration = np.where(blinks, self.blink_durations[ids], 0.0).sum(axis=1)
+
+        ready = observed >= self.min_observed
+        safe_observed = np.maximum(observed, 1e-9)
+        return {
+            'perclos': np.where(observed > 0, np.clip(closed / safe_observed, 0.0, 1.0), 0.0),
+            'blink_rate': np.where(ready, blink_count / safe_observed * 60.0, 0.0),
+            'mean_blink_duration': np.where(blink_count > 0, blink_duration / np.maximum(blink_count, 1), 0.0),
+            'yawn_rate': np.where(ready, yawn_count / safe_observed * 60.0, 0.0)
+        }
+
+    def score(self, ids=None):
+        """
+        计算一批对象的疲劳等级和评分（与FatigueLevelCalculator.calculate()的规则一致）
+
+        Args:
+            ids: 对象编号数组（默认全部对象）
+
+        Returns:
+            fatigue_level: (F,) 疲劳等级（FatigueLevel的整数值）
+            fatigue_score: (F,) 疲劳评分（0-100）
+        """
+        ids = np.arange(self.capacity) if ids is None else np.asarray(ids, dtype=np.intp)
+        stats = self.get_stats(ids)
+        # 没有头部姿态输入，头部姿态得分为0
+        fatigue_level, fatigue_score = self.calculator.score_batch(
+            stats['blink_rate'], self.yawn_counter[ids], self.eye_closed_duration[ids], stats['perclos'])
+
+        self.fatigue_score[ids] = fatigue_score
+        self.fatigue_level[ids] = fatigue_level
+        return fatigue_level, fatigue_score
+
+    def reset(self, ids=None):
+        """
+        重置对象状态（如对象编号分配给新的车辆时）
+
+        Args:
+            ids: 对象编号数组（默认全部对象）
+        """
+        ids = slice(None) if ids is None else np.asarray(ids, dtype=np.intp)
+        for name, value in vars(self).items():
+            if not isinstance(value, np.ndarray):
+                continue
+            if name in ('last_timestamp', 'eye_closed_start', 'yawn_start'):
+                value[ids] = np.nan
+            elif name in ('blink_times', 'yawn_times'):
+                value[ids] = -np.inf
+            elif name == 'bucket_ids':
+                value[ids] = -1
+            else:
+                value[ids] = 0
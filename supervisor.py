@@ -0,0 +1,429 @@
+"""
+多路检测监控模块
+一个监控进程管理N个检测工作进程，每个进程独立处理一路摄像头或视频
+"""
+
+import os
+import sys
+import csv
+import time
+import queue
+import argparse
+import traceback
+import multiprocessing as mp
+
+import config
+from pipeline import DetectionPipeline, FrameResult
+
+
+# 线程池大小由这些环境变量在库导入时确定
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                    'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS')
+
+
+def _set_thread_env(num_threads):
+    """
+    设置线程数环境变量
+
+    工作进程导入本模块时已经加载了cv2/numpy，因此由监控进程在启动工作进程之前设置，
+    工作进程启动时继承
+
+    Args:
+        num_threads: 每个工作进程允许使用的线程数
+    """
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(num_threads)
+
+
+def _pin_threads(worker_id, num_threads):
+    """
+    绑定工作进程的CPU核心，避免多进程争抢核心
+
+    Args:
+        worker_id: 工作进程编号
+        num_threads: 每个工作进程允许使用的线程数
+    """
+    # 按编号为每个工作进程分配互不重叠的核心（仅Linux支持）
+    if hasattr(os, 'sched_setaffinity'):
+        cpu_count = os.cpu_count() or 1
+        first = (worker_id * num_threads) % cpu_count
+        cores = {(first + i) % cpu_count for i in range(num_threads)}
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            pass
+
+
+def _is_camera(source):
+    """
+    判断输入源是否为摄像头
+
+    Args:
+        source: 摄像头编号（数字字符串）或视频/图片路径
+
+    Returns:
+        is_camera: 是否为摄像头
+    """
+    return source.isdigit()
+
+
+def _iter_source_frames(source, stop_event):
+    """
+    逐帧读取工作进程的输入源
+
+    Args:
+        source: 摄像头编号（数字字符串）或视频/图片路径
+        stop_event: 停止事件
+
+    Yields:
+        img: 帧图像（BGR格式）
+        timestamp: 帧时间戳（秒）
+    """
+    if not _is_camera(source):
+        from replay import iter_input_frames
+        yield from iter_input_frames(source)
+        return
+
+    import cv2
+    from capture import CaptureThread
+
+    cap = cv2.VideoCapture(int(source))
+    cap.set(3, config.CAMERA_WIDTH)
+    cap.set(4, config.CAMERA_HEIGHT)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, config.CAPTURE_BUFFER_SIZE)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open camera {source}")
+
+    capture = CaptureThread(cap)
+    capture.start()
+    try:
+        while not stop_event.is_set():
+            frame = capture.read(timeout=config.CAPTURE_READ_TIMEOUT)
+            if frame is None:
+                continue
+            yield cv2.flip(frame.image, 1), frame.timestamp
+    finally:
+        capture.stop()
+        cap.release()
+
+
+def _worker_main(worker_id, source, result_queue, stop_event, num_threads, resume_from):
+    """
+    工作进程入口
+
+    每个工作进程拥有独立的 FaceDetector / FatigueDetector / FatigueLevelCalculator，
+    按批次把紧凑的逐帧结果发送给监控进程
+
+    Args:
+        worker_id: 工作进程编号（同时作为流编号）
+        source: 输入源
+        result_queue: 结果队列
+        stop_event: 停止事件
+        num_threads: 线程数上限
+        resume_from: 上次已处理的帧数。帧编号从此处继续；视频/图片输入同时跳过这些帧，
+                     摄像头输入直接从当前实时画面开始
+    """
+    _pin_threads(worker_id, num_threads)
+
+    try:
+        import cv2
+        cv2.setNumThreads(num_threads)
+
+        pipeline = DetectionPipeline()
+        pipeline.frame_count = resume_from
+        batch = []
+        last_flush = time.perf_counter()
+        # 摄像头重启期间的画面已经错过，不能再跳过后续的实时帧
+        skip = 0 if _is_camera(source) else resume_from
+        skipped = 0
+
+        for img, timestamp in _iter_source_frames(source, stop_event):
+            if stop_event.is_set():
+                break
+            if skipped < skip:
+                skipped += 1
+                continue
+
+            batch.append(pipeline.process(img, timestamp).to_tuple())
+
+            now = time.perf_counter()
+            if len(batch) >= config.SUPERVISOR_RESULT_BATCH or \
+               now - last_flush > config.SUPERVISOR_FLUSH_INTERVAL:
+                result_queue.put(('results', worker_id, batch))
+                batch = []
+                last_flush = now
+
+        if batch:
+            result_queue.put(('results', worker_id, batch))
+        result_queue.put(('done', worker_id, pipeline.frame_count))
+    except Exception:
+        result_queue.put(('error', worker_id, traceback.format_exc()))
+        raise
+
+
+class StreamState:
+    """
+    单路流的监控状态
+    """
+
+    def __init__(self, stream_id, source):
+        """
+        初始化流状态
+
+        Args:
+            stream_id: 流编号
+            source: 输入源
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.process = None
+        self.restarts = 0
+        self.frames = 0
+        self.last_result = None
+        self.done = False
+        self.failed = False
+        self.restart_at = None
+
+
+class StreamSupervisor:
+    """
+    多路检测监控类
+    启动工作进程池、汇总结果，并自动重启崩溃的工作进程
+    """
+
+    def __init__(self, sources, threads_per_worker=None, max_restarts=None, on_result=None):
+        """
+        初始化监控器
+
+        Args:
+            sources: 输入源列表（摄像头编号或视频/图片路径）
+            threads_per_worker: 每个工作进程的线程数
+            max_restarts: 单路流最多重启次数
+            on_result: 结果回调 on_result(stream_id, FrameResult)
+        """
+        self.ctx = mp.get_context('spawn')
+        self.streams = [StreamState(i, src) for i, src in enumerate(sources)]
+        self.threads_per_worker = threads_per_worker or config.SUPERVISOR_THREADS_PER_WORKER
+        self.max_restarts = config.SUPERVISOR_MAX_RESTARTS if max_restarts is None else max_restarts
+        self.on_result = on_result
+        self.result_queue = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.start_time = 0
+
+    def start(self):
+        """
+        启动所有工作进程
+        """
+        self.start_time = time.perf_counter()
+        for stream in self.streams:
+            self._spawn(stream)
+
+    def stop(self, timeout=5.0):
+        """
+        停止所有工作进程
+
+        Args:
+            timeout: 等待每个进程退出的最长时间（秒）
+        """
+        self.stop_event.set()
+        for stream in self.streams:
+            if stream.process is None:
+                continue
+            # 进程退出前需要把队列中的数据取走，否则可能阻塞
+            deadline = time.perf_counter() + timeout
+            while stream.process.is_alive() and time.perf_counter() < deadline:
+                self._drain(0.05)
+            if stream.process.is_alive():
+                stream.process.terminate()
+            stream.process.join()
+
+    def run(self):
+        """
+        运行监控循环，直到所有流处理完毕或被中断
+        """
+        self.start()
+        try:
+            while not all(s.done or s.failed for s in self.streams):
+                self._drain(0.1)
+                self._check_workers()
+        except KeyboardInterrupt:
+            print("\nSupervisor interrupted by user")
+        finally:
+            self.stop()
+            self._print_summary()
+
+    def _spawn(self, stream):
+        """
+        启动（或重启）单路流的工作进程
+
+        Args:
+            stream: StreamState实例
+        """
+        _set_thread_env(self.threads_per_worker)
+        stream.process = self.ctx.Process(
+            target=_worker_main,
+            args=(stream.stream_id, stream.source, self.result_queue,
+                  self.stop_event, self.threads_per_worker, stream.frames),
+            name=f"FatigueWorker-{stream.stream_id}",
+            daemon=True
+        )
+        stream.process.start()
+        stream.restart_at = None
+        print(f"Worker {stream.stream_id} started (pid {stream.process.pid}): {stream.source}")
+
+    def _drain(self, timeout):
+        """
+        读取结果队列中的所有消息
+
+        Args:
+            timeout: 首条消息的等待时间（秒）
+        """
+        try:
+            message = self.result_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+
+        while True:
+            self._handle(message)
+            try:
+                message = self.result_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _handle(self, message):
+        """
+        处理工作进程消息
+
+        Args:
+            message: (类型, 流编号, 数据) 元组
+        """
+        kind, stream_id, payload = message
+        stream = self.streams[stream_id]
+
+        if kind == 'results':
+            for values in payload:
+                result = FrameResult.from_tuple(values)
+                stream.frames = result.frame_index
+                stream.last_result = result
+                if self.on_result is not None:
+                    self.on_result(stream_id, result)
+        elif kind == 'done':
+            stream.done = True
+            print(f"Worker {stream_id} finished: {payload} frames")
+        elif kind == 'error':
+            print(f"Worker {stream_id} crashed:\n{payload}")
+
+    def _check_workers(self):
+        """
+        检查工作进程状态，按退避延迟重启异常退出的进程
+        """
+        now = time.perf_counter()
+        for stream in self.streams:
+            if stream.done or stream.failed or stream.process.is_alive():
+                continue
+
+            if stream.restart_at is None:
+                # 进程退出时可能还有消息未读取，先把它们取完
+                self._drain(0)
+                if stream.done:
+                    continue
+                if stream.restarts >= self.max_restarts:
+                    stream.failed = True
+                    print(f"Worker {stream.stream_id} exceeded {self.max_restarts} restarts, giving up")
+                    continue
+                delay = config.SUPERVISOR_RESTART_DELAY * (2 ** stream.restarts)
+                stream.restart_at = now + delay
+                print(f"Worker {stream.stream_id} exited with code {stream.process.exitcode}, "
+                      f"restarting in {delay:.1f}s")
+            elif now >= stream.restart_at:
+                stream.restarts += 1
+                self._spawn(stream)
+
+    def _print_summary(self):
+        """
+        输出各路流的处理统计
+        """
+        elapsed = time.perf_counter() - self.start_time
+        total = sum(s.frames for s in self.streams)
+        print("\nSupervisor summary")
+        print("=" * 50)
+        for stream in self.streams:
+            status = 'done' if stream.done else ('failed' if stream.failed else 'stopped')
+            print(f"Stream {stream.stream_id} [{status}] {stream.source}: "
+                  f"{stream.frames} frames, {stream.restarts} restarts")
+        if elapsed > 0:
+            print(f"Total: {total} frames in {elapsed:.1f}s ({total / elapsed:.1f} frames/s)")
+        print("=" * 50)
+
+
+class CsvResultWriter:
+    """
+    按流写出逐帧结果的CSV写入器
+    """
+
+    def __init__(self, output_dir, num_streams):
+        """
+        初始化写入器
+
+        Args:
+            output_dir: 输出目录
+            num_streams: 流数量
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.files = []
+        self.writers = []
+        for stream_id in range(num_streams):
+            f = open(os.path.join(output_dir, f"stream_{stream_id}.csv"), 'w', newline='')
+            writer = csv.writer(f)
+            writer.writerow(FrameResult.FIELDS)
+            self.files.append(f)
+            self.writers.append(writer)
+
+    def __call__(self, stream_id, result):
+        """
+        写出一帧结果
+
+        Args:
+            stream_id: 流编号
+            result: FrameResult实例
+        """
+        self.writers[stream_id].writerow(result.to_row())
+
+    def close(self):
+        """
+        关闭所有输出文件
+        """
+        for f in self.files:
+            f.close()
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description='疲劳检测系统 - 多路检测监控')
+    parser.add_argument('sources', nargs='+',
+                       help='输入源：摄像头编号（如 0）或视频文件、图片目录、通配符')
+    parser.add_argument('--threads', type=int, default=config.SUPERVISOR_THREADS_PER_WORKER,
+                       help=f'每个工作进程的线程数（默认：{config.SUPERVISOR_THREADS_PER_WORKER}）')
+    parser.add_argument('--max-restarts', type=int, default=config.SUPERVISOR_MAX_RESTARTS,
+                       help=f'单路流最多重启次数（默认：{config.SUPERVISOR_MAX_RESTARTS}）')
+    parser.add_argument('--output-dir', type=str, default=None,
+                       help='逐帧结果输出目录（每路流一个CSV文件）')
+
+    args = parser.parse_args()
+
+    writer = CsvResultWriter(args.output_dir, len(args.sources)) if args.output_dir else None
+    supervisor = StreamSupervisor(args.sources, args.threads, args.max_restarts, on_result=writer)
+    try:
+        supervisor.run()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if any(s.failed for s in supervisor.streams):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+流水线追踪模块
+记录各处理阶段的耗时区间，支持导出Chrome trace格式并统计分位数
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+import config
+
+
+class _NullSpan:
+    """
+    追踪关闭时使用的空区间，不做任何事情
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    追踪区间，退出时把耗时写入追踪器
+    """
+
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Tracer:
+    """
+    流水线追踪器类
+    区间写入固定大小的环形缓冲区，关闭时几乎没有开销
+    """
+
+    def __init__(self, capacity=None, stats_window=None):
+        """
+        初始化追踪器
+
+        Args:
+            capacity: 环形缓冲区容量（区间数）
+            stats_window: 每个阶段用于统计分位数的最近样本数
+        """
+        self.enabled = False
+        self.capacity = capacity or config.TRACE_CAPACITY
+        self.stats_window = stats_window or config.TRACE_STATS_WINDOW
+        self._events = [None] * self.capacity
+        self._count = 0
+        self._durations = {}
+        self._thread_names = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        """
+        启用追踪
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        禁用追踪
+        """
+        self.enabled = False
+
+    def span(self, name):
+        """
+        创建追踪区间，用于with语句
+
+        Args:
+            name: 阶段名称
+
+        Returns:
+            span: 上下文管理器（追踪关闭时为共享的空区间）
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        """
+        记录一个已完成的区间
+
+        Args:
+            name: 阶段名称
+            start: 开始时间（time.perf_counter()）
+            end: 结束时间（time.perf_counter()）
+        """
+        thread = threading.current_thread()
+        duration = end - start
+        with self._lock:
+            self._events[self._count % self.capacity] = (name, start, duration, thread.ident)
+            self._count += 1
+            if thread.ident not in self._thread_names:
+                self._thread_names[thread.ident] = thread.name
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.stats_window)
+            durations.append(duration)
+
+    def get_events(self):
+        """
+        获取环形缓冲区中的区间（按时间顺序）
+
+        Returns:
+            events: (名称, 开始时间, 耗时, 线程ID) 列表
+        """
+        with self._lock:
+            if self._count <= self.capacity:
+                return self._events[:self._count]
+            head = self._count % self.capacity
+            return self._events[head:] + self._events[:head]
+
+    def get_stage_stats(self):
+        """
+        获取各阶段最近样本的耗时分位数
+
+        Returns:
+            stats: {阶段名称: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'}}
+        """
+        with self._lock:
+            snapshot = {name: np.array(values) for name, values in self._durations.items()}
+
+        stats = {}
+        for name, values in snapshot.items():
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99)) * 1000
+            stats[name] = {
+                'count': len(values),
+                'mean_ms': float(values.mean() * 1000),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99)
+            }
+        return stats
+
+    def to_chrome_trace(self):
+        """
+        转换为Chrome trace-event格式（可在chrome://tracing或Perfetto中打开）
+
+        Returns:
+            trace: trace-event字典
+        """
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            thread_names = dict(self._thread_names)
+        for tid, thread_name in thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+        for name, start, duration, tid in self.get_events():
+            events.append({
+                'name': name,
+                'ph': 'X',
+                'pid': pid,
+                'tid': tid,
+                'ts': (start - self._origin) * 1e6,
+                'dur': duration * 1e6
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """
+        导出Chrome trace-event JSON文件
+
+        Args:
+            path: 输出文件路径
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+        print(f"Trace exported to {path}")
+
+    def print_stage_stats(self):
+        """
+        输出各阶段耗时统计
+        """
+        stats = self.get_stage_stats()
+        if not stats:
+            return
+        print(f"{'stage':<28} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]['p50_ms']):
+            print(f"{name:<28} {s['count']:>7} {s['p50_ms']:>8.2f} "
+                  f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+
+    def reset(self):
+        """
+        清空所有记录
+        """
+        with self._lock:
+            self._events = [None] * self.capacity
+            self._count = 0
+            self._durations.clear()
+
+
+tracer = Tracer()
@@ -138,15 +138,13 @@ class UIDrawer:
                     (bar_x + bar_w, bar_y + bar_h), 
                     config.COLOR_PANEL_BORDER, 1)
     
-    def draw_status_panel(self, img, fatigue_detector, fatigue_level, fatigue_score):
+    def draw_status_panel(self, img, metrics):
         """
         绘制状态面板
         
         Args:
             img: 输入图像
-            fatigue_detector: 疲劳检测器实例
-            fatigue_level: 疲劳等级
-            fatigue_score: 疲劳评分（0-100）
+            metrics: 本帧的FrameMetrics快照
         """
         # 绘制面板背景
         cv2.rectangle(img, 
@@ -162,78 +160,110 @@ class UIDrawer:
         y_offset = config.PANEL_Y + 30
         
         # 疲劳状态
-        fatigue_color = config.COLOR_WARNING if fatigue_detector.is_fatigued else config.COLOR_NORMAL
-        fatigue_text = "FATIGUE DETECTED!" if fatigue_detector.is_fatigued else "Normal"
+        fatigue_color = config.COLOR_WARNING if metrics.is_fatigued else config.COLOR_NORMAL
+        fatigue_text = "FATIGUE DETECTED!" if metrics.is_fatigued else "Normal"
         cv2.putText(img, f"Status: {fatigue_text}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, fatigue_color, 2)
         y_offset += config.LINE_HEIGHT
         
         # 眨眼统计
-        cv2.putText(img, f"Total Blinks: {fatigue_detector.total_blinks}", 
+        cv2.putText(img, f"Total Blinks: {metrics.total_blinks}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
         y_offset += config.LINE_HEIGHT
         
         # 打哈欠统计
-        yawn_color = config.COLOR_WARNING if fatigue_detector.is_yawning else config.COLOR_PANEL_BORDER
-        cv2.putText(img, f"Yawns: {fatigue_detector.yawn_counter}", 
+        yawn_color = config.COLOR_WARNING if metrics.is_yawning else config.COLOR_PANEL_BORDER
+        cv2.putText(img, f"Yawns: {metrics.yawn_count}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, yawn_color, 1)
         y_offset += config.LINE_HEIGHT
         
         # 眨眼频率（每分钟）
-        blink_rate = fatigue_detector.get_blink_rate()
-        cv2.putText(img, f"Blink Rate: {blink_rate:.1f}/min", 
+        cv2.putText(img, f"Blink Rate: {metrics.blink_rate:.1f}/min", 
+                   (config.PANEL_X + 10, y_offset),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
+        y_offset += config.LINE_HEIGHT
+        
+        # PERCLOS（统计窗口内闭眼时间占比）
+        cv2.putText(img, f"PERCLOS: {metrics.perclos:.1%}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
         y_offset += config.LINE_HEIGHT
         
         # 闭眼时长
-        close_duration = fatigue_detector.get_eye_closed_duration()
-        if close_duration > 0:
-            cv2.putText(img, f"Eyes Closed: {close_duration:.1f}s", 
+        if metrics.eye_closed_duration > 0:
+            cv2.putText(img, f"Eyes Closed: {metrics.eye_closed_duration:.1f}s", 
                        (config.PANEL_X + 10, y_offset),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
             y_offset += config.LINE_HEIGHT
         
+        # 头部姿态
+        if metrics.head_pose is not None:
+            pitch, yaw, roll = metrics.head_pose
+            head_color = config.COLOR_WARNING if metrics.is_head_down else config.COLOR_PANEL_BORDER
+            cv2.putText(img, f"Head: P{pitch:+.0f} Y{yaw:+.0f} R{roll:+.0f} Nods: {metrics.nod_count}", 
+                       (config.PANEL_X + 10, y_offset),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, head_color, 1)
+            y_offset += config.LINE_HEIGHT
+        
         # 当前指标
-        cv2.putText(img, f"EAR: {fatigue_detector.current_ear:.3f}", 
+        cv2.putText(img, f"EAR: {metrics.ear:.3f}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
         y_offset += config.LINE_HEIGHT
         
-        cv2.putText(img, f"MAR: {fatigue_detector.current_mar:.3f}", 
+        cv2.putText(img, f"MAR: {metrics.mar:.3f}", 
                    (config.PANEL_X + 10, y_offset),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, config.COLOR_PANEL_BORDER, 1)
     
-    def draw_all(self, img, landmarks, fatigue_detector, fatigue_level=None, fatigue_score=0, draw_ui=True):
+    def draw_track_label(self, img, box, track_id, fatigue_level=None, fatigue_score=0):
         """
-        绘制所有UI元素
+        在人脸上方绘制跟踪编号和疲劳评分（多人脸时区分不同人员）
         
         Args:
             img: 输入图像
-            landmarks: 面部特征点坐标数组
-            fatigue_detector: 疲劳检测器实例
+            box: 人脸包围框 (x0, y0, x1, y1)
+            track_id: 跟踪编号
             fatigue_level: 疲劳等级（可选）
             fatigue_score: 疲劳评分（可选）
+        """
+        color = fatigue_level.get_color() if fatigue_level is not None else config.COLOR_NORMAL
+        x0, y0 = int(box[0]), int(box[1])
+        cv2.putText(img, f"Face #{track_id}  Score: {fatigue_score}", 
+                   (x0, max(y0 - 40, 20)),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    
+    def draw_all(self, img, landmarks, metrics, draw_ui=True, draw_panel=True):
+        """
+        绘制所有UI元素
+        
+        Args:
+            img: 输入图像
+            landmarks: 面部特征点坐标数组
+            metrics: 本帧的FrameMetrics快照
             draw_ui: 是否绘制UI（默认True）
+            draw_panel: 是否绘制疲劳等级和状态面板（多人脸时只为一张人脸绘制）
         """
         if draw_ui:
             # 绘制眼睛区域
             left_eye_landmarks, right_eye_landmarks = get_eye_landmarks(landmarks)
             self.draw_eye_region(img, landmarks, config.LEFT_EYE_INDICES, 
-                              fatigue_detector.current_ear, "Left")
+                              metrics.ear, "Left")
             self.draw_eye_region(img, landmarks, config.RIGHT_EYE_INDICES, 
-                              fatigue_detector.current_ear, "Right")
+                              metrics.ear, "Right")
             
             # 绘制嘴部区域
             self.draw_mouth_region(img, landmarks, config.MOUTH_INDICES, 
-                               fatigue_detector.current_mar)
+                               metrics.mar)
+            
+            if not draw_panel:
+                return
             
             # 绘制疲劳等级
-            if fatigue_level is not None:
-                self.draw_fatigue_level(img, fatigue_level, fatigue_score)
+            if metrics.fatigue_level is not None:
+                self.draw_fatigue_level(img, metrics.fatigue_level, metrics.fatigue_score)
             
             # 绘制状态面板
-            self.draw_status_panel(img, fatigue_detector, fatigue_level, fatigue_score)
+            self.draw_status_panel(img, metrics)
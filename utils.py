@@ -5,7 +5,106 @@
 
 import numpy as np
 import math
-from config import LEFT_EYE_INDICES, RIGHT_EYE_INDICES, MOUTH_INDICES
+from config import LEFT_EYE_INDICES, RIGHT_EYE_INDICES, MOUTH_INDICES, LANDMARK_SUBSET_INDICES
+
+
+# 各比值的端点对在首次使用时转换为索引数组并缓存：索引元组 -> (起点索引, 终点索引)
+_EAR_TABLES = {}
+_MAR_TABLES = {}
+
+
+def _ear_table(eye_indices):
+    """
+    获取EAR端点索引数组（内部函数）
+    
+    EAR = (|p1 - p5| + |p2 - p4|) / (2 * |p0 - p3|)
+    
+    Args:
+        eye_indices: 眼睛特征点索引列表（6个点），或多只眼睛的索引列表的列表
+    
+    Returns:
+        start: 三段距离的起点索引（多只眼睛时依次拼接）
+        end: 三段距离的终点索引
+    """
+    multiple = isinstance(eye_indices[0], (list, tuple))
+    key = tuple(map(tuple, eye_indices)) if multiple else tuple(eye_indices)
+    table = _EAR_TABLES.get(key)
+    if table is None:
+        eyes = key if multiple else (key,)
+        table = (np.array([[eye[1], eye[2], eye[0]] for eye in eyes]).ravel(),
+                 np.array([[eye[5], eye[4], eye[3]] for eye in eyes]).ravel())
+        _EAR_TABLES[key] = table
+    return table
+
+
+def _mar_table(mouth_indices):
+    """
+    获取MAR端点索引数组（内部函数）
+    
+    MAR = |上唇 - 下唇| / |左嘴角 - 右嘴角|
+    
+    Args:
+        mouth_indices: 嘴部特征点索引列表（上唇、下唇、左嘴角、右嘴角）
+    
+    Returns:
+        start: 两段距离的起点索引
+        end: 两段距离的终点索引
+    """
+    key = tuple(mouth_indices)
+    table = _MAR_TABLES.get(key)
+    if table is None:
+        table = (np.array([key[0], key[2]]), np.array([key[1], key[3]]))
+        _MAR_TABLES[key] = table
+    return table
+
+
+def _distances(landmarks, start, end):
+    """
+    批量计算端点对之间的距离（内部函数）
+    
+    Args:
+        landmarks: (..., N, 2) 特征点坐标
+        start: 起点索引数组
+        end: 终点索引数组
+    
+    Returns:
+        distances: (..., len(start)) 距离
+    """
+    diff = landmarks[..., start, :] - landmarks[..., end, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def calculate_ear_batch(eye_indices, landmarks):
+    """
+    批量计算眼睛纵横比
+    
+    Args:
+        eye_indices: 眼睛特征点索引列表，或多只眼睛的索引列表的列表（如 [LEFT_EYE_INDICES, RIGHT_EYE_INDICES]，
+                     一次取出所有端点）
+        landmarks: (..., N, 2) 特征点坐标，如 (T, N, 2) 的逐帧序列或 (F, N, 2) 的多张人脸
+    
+    Returns:
+        ear: (...) 眼睛纵横比，多只眼睛时为 (..., K)
+    """
+    distances = _distances(landmarks, *_ear_table(eye_indices))
+    if len(distances.shape) and distances.shape[-1] > 3:
+        distances = distances.reshape(distances.shape[:-1] + (-1, 3))
+    return (distances[..., 0] + distances[..., 1]) / (2.0 * distances[..., 2])
+
+
+def calculate_mar_batch(mouth_indices, landmarks):
+    """
+    批量计算嘴部纵横比
+    
+    Args:
+        mouth_indices: 嘴部特征点索引列表
+        landmarks: (..., N, 2) 特征点坐标
+    
+    Returns:
+        mar: (...) 嘴部纵横比
+    """
+    distances = _distances(landmarks, *_mar_table(mouth_indices))
+    return distances[..., 0] / distances[..., 1]
 
 
 def calculate_ear(eye_indices, landmarks):
@@ -19,18 +118,7 @@ def calculate_ear(eye_indices, landmarks):
     Returns:
         ear: 眼睛纵横比
     """
-    eye_points = np.array(eye_indices)
-    
-    # 计算垂直距离
-    vertical1 = np.linalg.norm(landmarks[eye_points[1]] - landmarks[eye_points[5]])
-    vertical2 = np.linalg.norm(landmarks[eye_points[2]] - landmarks[eye_points[4]])
-    
-    # 计算水平距离
-    horizontal = np.linalg.norm(landmarks[eye_points[0]] - landmarks[eye_points[3]])
-    
-    # 计算眼睛纵横比
-    ear = (vertical1 + vertical2) / (2.0 * horizontal)
-    return ear
+    return float(calculate_ear_batch(eye_indices, landmarks))
 
 
 def calculate_mar(mouth_indices, landmarks):
@@ -44,17 +132,56 @@ def calculate_mar(mouth_indices, landmarks):
     Returns:
         mar: 嘴部纵横比
     """
-    mouth_points = np.array(mouth_indices)
+    return float(calculate_mar_batch(mouth_indices, landmarks))
+
+
+# 一次计算左右眼EAR和MAR的端点：左眼三段距离、右眼三段距离、嘴部两段距离
+_RATIO_START = np.concatenate([_ear_table(LEFT_EYE_INDICES)[0], _ear_table(RIGHT_EYE_INDICES)[0],
+                               _mar_table(MOUTH_INDICES)[0]])
+_RATIO_END = np.concatenate([_ear_table(LEFT_EYE_INDICES)[1], _ear_table(RIGHT_EYE_INDICES)[1],
+                             _mar_table(MOUTH_INDICES)[1]])
+
+# 紧凑布局（只保存LANDMARK_SUBSET_INDICES中的点）下的端点位置
+_COMPACT_RATIO_START = np.searchsorted(LANDMARK_SUBSET_INDICES, _RATIO_START)
+_COMPACT_RATIO_END = np.searchsorted(LANDMARK_SUBSET_INDICES, _RATIO_END)
+
+
+def compact_landmarks(landmarks):
+    """
+    只保留检测用到的特征点，用于长时间录制数据的存储和批量重算
+    
+    Args:
+        landmarks: (..., N, 2) 特征点坐标
+    
+    Returns:
+        compact: (..., K, 2) 按config.LANDMARK_SUBSET_INDICES顺序排列的特征点
+    """
+    return landmarks[..., LANDMARK_SUBSET_INDICES, :]
+
+
+def calculate_ratios_batch(landmarks, compact=False):
+    """
+    批量计算左眼EAR、右眼EAR和MAR
     
-    # 计算垂直距离（上嘴唇到下嘴唇）
-    vertical = np.linalg.norm(landmarks[mouth_points[0]] - landmarks[mouth_points[1]])
+    一次取出所有需要的端点并计算距离，适用于逐帧序列 (T, N, 2) 或同一帧的多张人脸 (F, N, 2)
     
-    # 计算水平距离（左嘴角到右嘴角）
-    horizontal = np.linalg.norm(landmarks[mouth_points[2]] - landmarks[mouth_points[3]])
+    Args:
+        landmarks: (..., N, 2) 特征点坐标张量
+        compact: 输入是否为compact_landmarks()得到的紧凑布局
     
-    # 计算嘴部纵横比
-    mar = vertical / horizontal
-    return mar
+    Returns:
+        ear_left: (...) 左眼纵横比
+        ear_right: (...) 右眼纵横比
+        mar: (...) 嘴部纵横比
+    """
+    if compact:
+        distances = _distances(landmarks, _COMPACT_RATIO_START, _COMPACT_RATIO_END)
+    else:
+        distances = _distances(landmarks, _RATIO_START, _RATIO_END)
+    ear_left = (distances[..., 0] + distances[..., 1]) / (2.0 * distances[..., 2])
+    ear_right = (distances[..., 3] + distances[..., 4]) / (2.0 * distances[..., 5])
+    mar = distances[..., 6] / distances[..., 7]
+    return ear_left, ear_right, mar
 
 
 def get_eye_landmarks(landmarks):
@@ -5,13 +5,192 @@ Web服务器模块
 
 from flask import Flask, render_template, Response, jsonify
 import cv2
+import numpy as np
 import base64
 import threading
 import time
 import json
+from collections import deque
+
+import config
+from capture import CapturedFrame, LatestFrameSlot
+from metrics import FrameMetrics
+from tracer import tracer
+from buffer_pool import frame_pool
 
 app = Flask(__name__)
 
+
+def encode_frame(frame, quality=85):
+    """
+    将帧编码为JPEG
+
+    Args:
+        frame: 图像（BGR格式）
+        quality: JPEG质量（0-100）
+
+    Returns:
+        jpeg: JPEG字节串，编码失败返回None
+    """
+    ret, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    if not ret:
+        return None
+    return buffer.tobytes()
+
+
+class MJPEGBroadcaster:
+    """
+    MJPEG广播类
+    新画面写入单槽缓冲区，由独立的编码线程每帧只编码一次并附上序号；
+    观看者在条件变量上等待比自己已发送的序号更新的画面，处理慢的观看者直接跳到最新画面，
+    编码开销与观看者数量无关，没有观看者时不编码
+    """
+
+    def __init__(self, pool=None, quality=None):
+        """
+        初始化MJPEG广播
+
+        Args:
+            pool: 帧缓冲池（可选），编码完成或被覆盖的画面归还到池中
+            quality: JPEG质量（默认config.MJPEG_QUALITY）
+        """
+        self.pool = pool
+        self.quality = config.MJPEG_QUALITY if quality is None else quality
+        self.slot = LatestFrameSlot(pool)
+        self._cond = threading.Condition()
+        self.seq = 0          # 已编码画面的序号
+        self.chunk = None     # 已编码画面的multipart分段
+        self.clients = 0      # 当前观看者数量
+        self.running = False
+        self.thread = None
+
+        # 统计计数
+        self.submitted = 0
+        self.encoded = 0
+        self.sent = 0
+        self.skipped = 0      # 观看者跳过的已编码画面数
+
+    def submit(self, frame):
+        """
+        提交新画面（没有观看者时直接归还）
+
+        Args:
+            frame: 图像（BGR格式），归广播所有，编码后归还到缓冲池
+        """
+        if not self.clients:
+            if self.pool is not None:
+                self.pool.release(frame)
+            return
+        self.submitted += 1
+        self.slot.put(CapturedFrame(frame, time.time(), self.submitted))
+
+    def start(self):
+        """
+        启动编码线程
+        """
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='MJPEGBroadcaster')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """
+        停止编码线程并唤醒所有观看者
+
+        Args:
+            timeout: 等待线程退出的最长时间（秒）
+        """
+        self.running = False
+        self.slot.close()
+        with self._cond:
+            self._cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def wait(self, last_seq, timeout=None):
+        """
+        等待比last_seq更新的已编码画面
+
+        Args:
+            last_seq: 观看者已发送的画面序号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            seq: 最新画面序号，超时或已停止时为last_seq
+            chunk: 最新画面的multipart分段，超时或已停止时为None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > last_seq or not self.running, timeout)
+            if self.seq <= last_seq:
+                return last_seq, None
+            return self.seq, self.chunk
+
+    def stream(self):
+        """
+        单个观看者的multipart流生成器
+
+        Yields:
+            chunk: 一个画面的multipart分段
+        """
+        with self._cond:
+            self.clients += 1
+            last_seq = self.seq
+        try:
+            while self.running:
+                seq, chunk = self.wait(last_seq, config.MJPEG_WAIT_TIMEOUT)
+                if chunk is None:
+                    continue
+                with self._cond:
+                    self.skipped += seq - last_seq - 1
+                    self.sent += 1
+                last_seq = seq
+                yield chunk
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def get_stats(self):
+        """
+        获取广播统计信息
+
+        Returns:
+            stats: 统计字典（观看者数、提交/编码/发送的画面数、编码前被覆盖和观看者跳过的画面数）
+        """
+        return {
+            'clients': self.clients,
+            'submitted': self.submitted,
+            'encoded': self.encoded,
+            'sent': self.sent,
+            'dropped': self.slot.dropped,
+            'skipped': self.skipped
+        }
+
+    def _run(self):
+        """
+        编码循环（内部方法）
+        """
+        while self.running:
+            frame = self.slot.get(config.MJPEG_WAIT_TIMEOUT)
+            if frame is None:
+                continue
+            with tracer.span('web.imencode'):
+                jpeg = encode_frame(frame.image, self.quality)
+            if self.pool is not None:
+                self.pool.release(frame.image)
+            if jpeg is None:
+                continue
+            chunk = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+            with self._cond:
+                self.seq += 1
+                self.chunk = chunk
+                self.encoded += 1
+                self._cond.notify_all()
+
+
 class WebServer:
     """
     Web服务器类
@@ -28,21 +207,11 @@ class WebServer:
         """
         self.host = host
         self.port = port
-        self.current_frame = None
-        self.fatigue_data = {
-            'fatigue_level': 'Normal',
-            'fatigue_score': 0,
-            'total_blinks': 0,
-            'yawn_count': 0,
-            'is_fatigued': False,
-            'is_yawning': False,
-            'blink_rate': 0.0,
-            'eye_closed_duration': 0.0,
-            'ear': 0.0,
-            'mar': 0.0,
-            'runtime': '00:00:00',
-            'fps': 0
-        }
+        self.broadcaster = MJPEGBroadcaster(frame_pool)
+        self.metrics = FrameMetrics()  # 主要人脸最新的帧指标快照
+        self.events = deque(maxlen=config.EVENT_HISTORY_LEN)  # 订阅得到的最近事件（字典）
+        self.event_count = 0  # 累计收到的事件数（事件列表的版本）
+        self._events_list = (0, [])  # (事件版本, 事件列表副本)
         self.running = False
         self.server_thread = None
         self.start_time = None
@@ -52,28 +221,50 @@ class WebServer:
         """
         更新当前帧
         
+        有观看者时帧被复制到缓冲池中的缓冲区并提交给MJPEG广播，调用方随后可以立即复用自己的帧
+        
         Args:
             frame: 当前帧图像
         """
-        self.current_frame = frame
+        if not self.broadcaster.clients:
+            return
+        buf = frame_pool.acquire(frame.shape, frame.dtype)
+        np.copyto(buf, frame)
+        self.broadcaster.submit(buf)
     
-    def update_fatigue_data(self, fatigue_detector, fatigue_level, fatigue_score):
+    def handle_event(self, event):
         """
-        更新疲劳数据
+        事件总线回调：保存最近的事件供Web界面读取
         
         Args:
-            fatigue_detector: 疲劳检测器实例
-            fatigue_level: 疲劳等级
-            fatigue_score: 疲劳评分
+            event: FatigueEvent实例
+        """
+        self.events.append(event.to_dict())
+        self.event_count += 1
+    
+    def update_metrics(self, metrics):
         """
-        level_name = fatigue_level.get_name() if fatigue_level else 'Normal'
+        更新疲劳数据（每帧只保存快照引用，序列化在Web接口请求时进行）
         
-        # 计算运行时间
+        Args:
+            metrics: FrameMetrics实例
+        """
         if self.start_time is None:
             self.start_time = time.time()
         self.frame_count += 1
+        self.metrics = metrics
+    
+    def get_fatigue_json(self):
+        """
+        生成Web接口返回的疲劳数据JSON
+        
+        指标部分复制快照缓存的字典，事件列表按事件版本缓存，加上运行时间和FPS后一次序列化
         
-        elapsed = time.time() - self.start_time
+        Returns:
+            text: JSON对象字符串
+        """
+        # 计算运行时间
+        elapsed = time.time() - self.start_time if self.start_time is not None else 0.0
         hours = int(elapsed // 3600)
         minutes = int((elapsed % 3600) // 60)
         seconds = int(elapsed % 60)
@@ -85,20 +276,18 @@ class WebServer:
         else:
             fps = 0
         
-        self.fatigue_data = {
-            'fatigue_level': level_name,
-            'fatigue_score': fatigue_score,
-            'total_blinks': fatigue_detector.total_blinks,
-            'yawn_count': fatigue_detector.yawn_counter,
-            'is_fatigued': fatigue_detector.is_fatigued,
-            'is_yawning': fatigue_detector.is_yawning,
-            'blink_rate': fatigue_detector.get_blink_rate(),
-            'eye_closed_duration': fatigue_detector.get_eye_closed_duration(),
-            'ear': fatigue_detector.current_ear,
-            'mar': fatigue_detector.current_mar,
-            'runtime': runtime,
-            'fps': round(fps, 1)
-        }
+        version, events = self._events_list
+        if version != self.event_count:
+            version = self.event_count
+            events = list(self.events)
+            self._events_list = (version, events)
+        
+        # 快照缓存的字典不能修改，浅复制后加上本次请求的字段
+        data = dict(self.metrics.to_dict())
+        data['runtime'] = runtime
+        data['fps'] = round(fps, 1)
+        data['events'] = events
+        return json.dumps(data)
     
     def start(self):
         """
@@ -108,6 +297,7 @@ class WebServer:
             return
         
         self.running = True
+        self.broadcaster.start()
         self.server_thread = threading.Thread(target=self._run_server)
         self.server_thread.daemon = True
         self.server_thread.start()
@@ -119,6 +309,7 @@ class WebServer:
         停止Web服务器
         """
         self.running = False
+        self.broadcaster.stop()
     
     def _run_server(self):
         """
@@ -140,18 +331,8 @@ def video_feed():
     """
     视频流路由
     """
-    def generate():
-        while True:
-            if web_server.current_frame is not None:
-                ret, buffer = cv2.imencode('.jpg', web_server.current_frame, 
-                                          [int(cv2.IMWRITE_JPEG_QUALITY), 85])
-                if ret:
-                    frame = buffer.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            time.sleep(0.033)
-    
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # 所有观看者共享广播线程的编码结果
+    return Response(web_server.broadcaster.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
 @app.route('/api/fatigue_data')
@@ -159,7 +340,23 @@ def get_fatigue_data():
     """
     获取疲劳数据API
     """
-    return jsonify(web_server.fatigue_data)
+    return Response(web_server.get_fatigue_json(), mimetype='application/json')
+
+
+@app.route('/api/trace')
+def get_trace():
+    """
+    导出流水线追踪数据API（Chrome trace-event格式）
+    """
+    return jsonify(tracer.to_chrome_trace())
+
+
+@app.route('/api/trace/stats')
+def get_trace_stats():
+    """
+    获取各阶段耗时分位数API
+    """
+    return jsonify(tracer.get_stage_stats())
 
 
 web_server = WebServer()